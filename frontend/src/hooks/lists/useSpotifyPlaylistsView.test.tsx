@@ -101,5 +101,41 @@ describe("useSpotifyPlaylistsView", () => {
       expect(result.current.playlistTracksData?.tracks?.[0]?.id).toBe("t1");
     });
   });
-});
 
+  it("passes the listed snapshot_id when fetching playlist tracks", async () => {
+    const fetchMock = vi.fn((url: string) => {
+      if (url.includes("/tracks/")) {
+        return Promise.resolve(makeJsonResponse({ id: "p1", tracks: [] }));
+      }
+      return Promise.resolve(
+        makeJsonResponse({ playlists: [{ id: "p1", name: "Playlist 1", snapshot_id: "snap/1" }] }),
+      );
+    });
+    const authFetch = asAuthFetch(fetchMock);
+
+    const { result } = renderHook(() =>
+      useSpotifyPlaylistsView({
+        API_BASE,
+        accessToken: "jwt",
+        spotifyToken: "spotify-token",
+        viewListId: "spotify-playlists",
+        authFetch,
+      }),
+    );
+
+    await waitFor(() => {
+      expect(result.current.spotifyPlaylists).toHaveLength(1);
+    });
+    act(() => {
+      result.current.setSelectedPlaylistId("p1");
+    });
+
+    await waitFor(() => {
+      expect(result.current.playlistTracksData?.id).toBe("p1");
+    });
+    expect(fetchMock).toHaveBeenCalledWith(
+      `${API_BASE}/api/spotify/playlists/p1/tracks/?snapshot_id=snap%2F1`,
+      expect.anything(),
+    );
+  });
+});
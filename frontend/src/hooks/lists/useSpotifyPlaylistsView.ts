@@ -2,7 +2,13 @@ import { useEffect, useRef, useState } from "react";
 import type { AuthFetchFn } from "../../services/especiallyLikedApi";
 import type { PlaylistTracksData } from "../../types/musicDbSlices";
 
-type SpotifyPlaylistRow = { id: string; name: string; owner?: string; [key: string]: unknown };
+type SpotifyPlaylistRow = {
+  id: string;
+  name: string;
+  owner?: string;
+  snapshot_id?: string | null;
+  [key: string]: unknown;
+};
 
 /**
  * When the user selects the Spotify playlists pseudo-list (`viewListId === "spotify-playlists"`),
@@ -74,8 +80,11 @@ export function useSpotifyPlaylistsView({
     }
     const startId = setTimeout(() => setPlaylistTracksLoading(true), 0);
     let cancelled = false;
+    // The backend caches track lists per snapshot; passing it lets unchanged playlists skip Spotify.
+    const snapshotId = spotifyPlaylists.find((p) => p.id === selectedPlaylistId)?.snapshot_id;
+    const query = snapshotId ? `?snapshot_id=${encodeURIComponent(snapshotId)}` : "";
     authFetchRef
-      .current(`${API_BASE}/api/spotify/playlists/${selectedPlaylistId}/tracks/`, {
+      .current(`${API_BASE}/api/spotify/playlists/${selectedPlaylistId}/tracks/${query}`, {
         headers: { Authorization: `Bearer ${spotifyToken}` },
       })
       .then((res) => {
@@ -95,7 +104,7 @@ export function useSpotifyPlaylistsView({
       clearTimeout(startId);
       cancelled = true;
     };
-  }, [selectedPlaylistId, spotifyToken, accessToken, viewListId, API_BASE]);
+  }, [selectedPlaylistId, spotifyPlaylists, spotifyToken, accessToken, viewListId, API_BASE]);
 
   return {
     spotifyPlaylists,
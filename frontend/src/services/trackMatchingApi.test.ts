@@ -88,5 +88,24 @@ describe("matchTracksToSpotifyApi", () => {
     expect(errorSpy).toHaveBeenCalled();
     errorSpy.mockRestore();
   });
-});
 
+  it("sends ISRCs only for tracks that have one", async () => {
+    const authFetch = vi.fn().mockResolvedValueOnce({
+      ok: true,
+      json: async () => ({ matches: [] }),
+    });
+
+    await matchTracksToSpotifyApi({
+      authFetch,
+      API_BASE,
+      tracklist: [{ title: "Track A", isrc: "USRC17600001" }, { title: "Track B" }],
+      artists: [{ name: "Artist" }],
+    });
+
+    const body = JSON.parse(authFetch.mock.calls[0][1].body);
+    expect(body.tracks).toEqual([
+      { title: "Track A", artists: ["Artist"], isrc: "USRC17600001" },
+      { title: "Track B", artists: ["Artist"] },
+    ]);
+  });
+});
@@ -3,7 +3,7 @@ import { catalogOrDiscogsTitle } from "../utils/spotifyTrackMatch";
 import type { SpotifyArtist, SpotifyMatchRow } from "../types/musicDbSlices";
 import type { AuthFetchFn } from "./especiallyLikedApi";
 
-type CatalogTrackish = { title?: string };
+type CatalogTrackish = { title?: string; isrc?: unknown };
 type MatchRow = SpotifyMatchRow;
 
 // Catalog tracklist → server-side Spotify matching,
@@ -27,6 +27,8 @@ export async function matchTracksToSpotifyApi({
   const tracks = tracklist.map((track) => ({
     title: track.title,
     artists: artists.map((a) => a.name),
+    // MusicBrainz ISRC lets the server do an exact Spotify lookup before fuzzy matching
+    ...(typeof track.isrc === "string" && track.isrc ? { isrc: track.isrc } : {}),
   }));
 
   const res = await authFetch(`${API_BASE}/api/spotify/match-tracks/`, {
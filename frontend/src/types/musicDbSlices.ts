@@ -22,6 +22,7 @@ export type CatalogTrack = {
   title: string;
   position?: string;
   duration?: string;
+  isrc?: string;
   state?: number;
   [key: string]: unknown;
 };
@@ -175,6 +176,7 @@ export type PlaylistTracksData = {
   images?: Array<{ url?: string; [key: string]: unknown }>;
   owner?: string;
   description?: string;
+  snapshot_id?: string | null;
   tracks?: PlaylistTrackRow[];
   [key: string]: unknown;
 };
@@ -3,3 +3,15 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = "accounts"
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+
+        from .authentication import invalidate_cached_user_on_change
+
+        user_model = get_user_model()
+        post_save.connect(invalidate_cached_user_on_change, sender=user_model, dispatch_uid="accounts_auth_user_save")
+        post_delete.connect(
+            invalidate_cached_user_on_change, sender=user_model, dispatch_uid="accounts_auth_user_delete"
+        )
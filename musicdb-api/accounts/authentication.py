@@ -0,0 +1,118 @@
+"""
+JWT authentication that resolves the user from cache instead of the database.
+
+JWTAuthentication loads the user row on every request, which is the only query on endpoints
+like search and the pickers. CachedJWTAuthentication keeps resolved users for
+AUTH_USER_CACHE_TTL seconds in two tiers: a small in-process map and the Django cache. Both are
+keyed by (user_id, version), where version is a per-user token in the Django cache that is
+replaced whenever the user is saved or deleted (deactivation, password change, ...). Writes
+that skip signals (QuerySet.update()) are picked up when the TTL runs out.
+
+The Django cache is only shared between workers when CACHE_URL configures a shared backend
+(see settings.CACHES). Then every worker drops its copy at once; with the default per-process
+cache only the worker that saved the user does, and the others catch up within the TTL.
+
+Cached users go through the same checks as fresh ones: is_active and, when
+CHECK_REVOKE_TOKEN is on, the token's password hash.
+"""
+import copy
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFAULT_AUTH_USER_CACHE_TTL = 60
+# The in-process tier is cleared when it grows past this many users.
+LOCAL_MAX_USERS = 1024
+
+# user_id -> (version, expires_at, user)
+_local_users = {}
+
+
+def _cache_ttl():
+    return getattr(settings, "AUTH_USER_CACHE_TTL", DEFAULT_AUTH_USER_CACHE_TTL)
+
+
+def _version_key(user_id):
+    return f"accounts:auth_user_version:{user_id}"
+
+
+def _user_key(user_id, version):
+    return f"accounts:auth_user:{user_id}:{version}"
+
+
+def _user_version(user_id):
+    """The user's current cache version, creating one if the shared cache has none."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key) or version
+    return version
+
+
+def get_cached_user(user_id):
+    """The cached user (a copy per call), or None when neither tier has a current entry."""
+    version = _user_version(user_id)
+    entry = _local_users.get(user_id)
+    if entry and entry[0] == version and entry[1] > time.monotonic():
+        return copy.copy(entry[2])
+    user = cache.get(_user_key(user_id, version))
+    if user is not None:
+        _remember_locally(user_id, version, user)
+    return user
+
+
+def cache_user(user_id, user):
+    version = _user_version(user_id)
+    cache.set(_user_key(user_id, version), user, timeout=_cache_ttl())
+    _remember_locally(user_id, version, copy.copy(user))
+
+
+def _remember_locally(user_id, version, user):
+    if len(_local_users) >= LOCAL_MAX_USERS:
+        _local_users.clear()
+    _local_users[user_id] = (version, time.monotonic() + _cache_ttl(), user)
+
+
+def invalidate_cached_user(user_id):
+    """Give the user a new version, orphaning every cached copy in every process."""
+    cache.set(_version_key(user_id), uuid.uuid4().hex, timeout=None)
+    _local_users.pop(user_id, None)
+
+
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    """post_save / post_delete receiver for the user model."""
+    user_id = instance.pk  # read now: delete() clears the pk before on_commit callbacks run
+    invalidate_cached_user(user_id)
+    # Again once the write is visible: a request that read the old row before the commit may
+    # have cached it under the new version.
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        user = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user_id, user)
+            return user
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,98 @@
+"""Tests for the cached JWT user resolution."""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import authentication
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authentication._local_users.clear()
+        self.user = User.objects.create_user(username="cached", email="cached@example.com", password="pw-123456")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def _get(self):
+        return self.client.get("/api/search/lists/")
+
+    def _user_queries(self, ctx):
+        return [q for q in ctx.captured_queries if "accounts_customuser" in q["sql"]]
+
+    def test_user_row_is_loaded_once(self):
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self._get().status_code, 200)
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self._get().status_code, 200)
+        self.assertEqual(len(self._user_queries(first)), 1)
+        self.assertEqual(self._user_queries(second), [])
+
+    def test_shared_cache_serves_other_processes(self):
+        self._get()
+        authentication._local_users.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._get().status_code, 200)
+        self.assertEqual(self._user_queries(ctx), [])
+
+    def test_deactivation_takes_effect_immediately(self):
+        self._get()
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self._get().status_code, 401)
+
+    def test_cached_inactive_user_is_rejected(self):
+        self._get()
+        # Only the cached copy is inactive, so the rejection comes from the cached path.
+        user = authentication.get_cached_user(self.user.pk)
+        user.is_active = False
+        authentication.cache_user(self.user.pk, user)
+        self.assertEqual(self._get().status_code, 401)
+
+    def test_profile_changes_refresh_the_cached_user(self):
+        self._get()
+        self.user.email = "changed@example.com"
+        self.user.save()
+        self._get()
+        self.assertEqual(authentication.get_cached_user(self.user.pk).email, "changed@example.com")
+
+    def test_password_change_invalidates_cached_user(self):
+        self._get()
+        self.user.set_password("new-pw-654321")
+        self.user.save()
+        self.assertIsNone(authentication.get_cached_user(self.user.pk))
+
+    def test_deleted_user_is_rejected(self):
+        self._get()
+        self.user.delete()
+        self.assertEqual(self._get().status_code, 401)
+
+    def test_cached_users_are_copies(self):
+        self._get()
+        first = authentication.get_cached_user(self.user.pk)
+        first.username = "mutated"
+        self.assertEqual(authentication.get_cached_user(self.user.pk).username, "cached")
+
+    def test_user_cached_before_commit_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save(update_fields=["is_active"])
+            # Another request caches a row under the new version before the save commits.
+            authentication.cache_user(self.user.pk, User.objects.get(pk=self.user.pk))
+            self.assertIsNotNone(authentication.get_cached_user(self.user.pk))
+        self.assertIsNone(authentication.get_cached_user(self.user.pk))
+
+    def test_delete_invalidates_on_commit(self):
+        user_id = self.user.pk
+        self._get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+            authentication.cache_user(user_id, User(pk=user_id, username="stale"))
+        self.assertIsNone(authentication.get_cached_user(user_id))
@@ -18,6 +18,7 @@ env = environ.Env(
     MUSICBRAINZ_USER_AGENT=(str, "SoulTrustMusicDB/1.0"),
     SPOTIFY_CLIENT_ID=(str, ""),
     SPOTIFY_CLIENT_SECRET=(str, ""),
+    SPOTIFY_MARKET=(str, "US"),
     LASTFM_API_KEY=(str, ""),
 )
 # Load environment variables from .env file
@@ -134,7 +135,7 @@ CORS_ALLOW_ALL_ORIGINS = env.bool('CORS_ALLOW_ALL_ORIGINS', default=DEBUG and no
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
@@ -146,6 +147,15 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
+# Seconds an authenticated user is served from cache (accounts.authentication); saving or
+# deleting the user invalidates it immediately.
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '60'))
+
+# Library sync (musicdb.services.library_changes): only changes older than the settle window are
+# served, so rows from transactions still in flight are not skipped; changes older than the
+# retention window are removed by `manage.py prune_library_changes`.
+LIBRARY_SYNC_SETTLE_SECONDS = int(os.getenv('LIBRARY_SYNC_SETTLE_SECONDS', '2'))
+LIBRARY_CHANGE_RETENTION_DAYS = int(os.getenv('LIBRARY_CHANGE_RETENTION_DAYS', '90'))
 
 # Required for Django admin
 TEMPLATES = [
@@ -170,6 +180,18 @@ DATABASES = {
     'default': env.db('DATABASE_URL', default=f'sqlite:///{BASE_DIR / "db.sqlite3"}')
 }
 
+# Cache: per-process memory unless CACHE_URL is set. The Discogs rate-limit state, the shared
+# tier of the JWT user cache and the library state behind search annotations are only shared
+# between gunicorn workers with a shared backend, e.g.
+# CACHE_URL=filecache:///var/tmp/musicdb-cache (workers on one host) or redis://... (needs the
+# redis package).
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+# Seconds a user's library state (musicdb.services.library_state) is cached. Writes clear it in
+# the shared cache; without one, other workers can serve a stale copy this long.
+LIBRARY_STATE_TTL = int(os.getenv('LIBRARY_STATE_TTL', '3600' if os.getenv('CACHE_URL') else '60'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -200,6 +222,8 @@ MUSICBRAINZ_USER_AGENT = env("MUSICBRAINZ_USER_AGENT")
 # Spotify API
 SPOTIFY_CLIENT_ID = env("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = env("SPOTIFY_CLIENT_SECRET")
+# Market for app-token track lookups; without one Spotify does no track relinking.
+SPOTIFY_MARKET = env("SPOTIFY_MARKET")
 
 # Last.fm API
 LASTFM_API_KEY = env("LASTFM_API_KEY")
@@ -1,9 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from musicdb.views import LibrarySnapshotView, LibrarySyncView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("accounts.urls")),
     path("api/search/", include("musicdb.urls")),
     path("api/spotify/", include("spotify.urls")),
+    path("api/library/snapshot/", LibrarySnapshotView.as_view(), name="library-snapshot"),
+    path("api/sync/", LibrarySyncView.as_view(), name="library-sync"),
 ]
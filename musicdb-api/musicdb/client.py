@@ -1,9 +1,34 @@
 """
 Discogs API client. Start with get_api_root() to verify credentials.
+
+Requests share one keep-alive session. Discogs reports the caller's moving one-minute budget in
+X-Discogs-Ratelimit-* response headers; the latest reading is kept in the Django cache and
+callers are slowed down as the budget runs low instead of running into 429s. Workers only share
+that reading when CACHE_URL points at a shared backend (see settings.CACHES); with the default
+per-process cache each worker throttles on its own. Artist, release and master lookups are cached.
 """
-import requests
+import time
 
+import requests
 from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TIMEOUT = 10
+
+# Discogs' rate limit is a moving 60-second window.
+RATE_LIMIT_WINDOW = 60
+# Start pacing requests once less than this fraction of the budget is left.
+RATE_LIMIT_SLOWDOWN_FRACTION = 0.25
+# Never block a caller longer than this; past it the request goes out (and may 429).
+DEFAULT_MAX_THROTTLE_WAIT = 5
+_RATE_LIMIT_CACHE_KEY = "discogs:ratelimit"
+
+DEFAULT_RESPONSE_CACHE_TTL = 60 * 60 * 6
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 
 def _headers():
@@ -14,40 +39,117 @@ def _headers():
     return headers
 
 
+def _url(path):
+    return f"{settings.DISCOGS_API_BASE_URL.rstrip('/')}/{path}"
+
+
+def _record_rate_limit(response):
+    """Remember the budget Discogs reported; a 429 means nothing is left."""
+    try:
+        limit = int(response.headers.get("X-Discogs-Ratelimit", 60))
+        if response.status_code == 429:
+            remaining = 0
+        elif "X-Discogs-Ratelimit-Remaining" in response.headers:
+            remaining = int(response.headers["X-Discogs-Ratelimit-Remaining"])
+        elif "X-Discogs-Ratelimit-Used" in response.headers:
+            remaining = limit - int(response.headers["X-Discogs-Ratelimit-Used"])
+        else:
+            return
+    except (TypeError, ValueError):
+        return
+    cache.set(
+        _RATE_LIMIT_CACHE_KEY,
+        {"limit": max(1, limit), "remaining": max(0, remaining), "at": time.time()},
+        timeout=RATE_LIMIT_WINDOW,
+    )
+
+
+def throttle_delay():
+    """
+    Seconds to wait before the next Discogs request, from the last reported budget.
+    Plenty left: 0. Running low: pace at the sustained rate (window / limit). Exhausted:
+    wait for the window to roll over.
+    """
+    state = cache.get(_RATE_LIMIT_CACHE_KEY)
+    if not state:
+        return 0
+    elapsed = time.time() - state["at"]
+    if elapsed >= RATE_LIMIT_WINDOW:
+        return 0
+    if state["remaining"] <= 0:
+        return RATE_LIMIT_WINDOW - elapsed
+    if state["remaining"] < state["limit"] * RATE_LIMIT_SLOWDOWN_FRACTION:
+        return RATE_LIMIT_WINDOW / state["limit"]
+    return 0
+
+
+def _get(path, params=None):
+    delay = min(throttle_delay(), getattr(settings, "DISCOGS_MAX_THROTTLE_WAIT", DEFAULT_MAX_THROTTLE_WAIT))
+    if delay > 0:
+        time.sleep(delay)
+    response = _session.get(_url(path), headers=_headers(), params=params, timeout=DEFAULT_TIMEOUT)
+    _record_rate_limit(response)
+    return response
+
+
+def _response_from_cache(entry):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = entry["content"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.url = entry["url"]
+    response.encoding = "utf-8"
+    return response
+
+
+def _cached_get(path):
+    """GET with successful responses cached for DISCOGS_RESPONSE_CACHE_TTL seconds."""
+    key = f"discogs:response:{path}"
+    entry = cache.get(key)
+    if entry is not None:
+        return _response_from_cache(entry)
+    response = _get(path)
+    if response.status_code == 200:
+        cache.set(
+            key,
+            {
+                "content": response.content,
+                "headers": {"Content-Type": response.headers.get("Content-Type", "application/json")},
+                "url": response.url,
+            },
+            timeout=getattr(settings, "DISCOGS_RESPONSE_CACHE_TTL", DEFAULT_RESPONSE_CACHE_TTL),
+        )
+    return response
+
+
 def get_api_root():
     """GET api.discogs.com/ — use to verify client and credentials work."""
-    url = f"{settings.DISCOGS_API_BASE_URL.rstrip('/')}/"
-    return requests.get(url, headers=_headers())
+    return _get("")
 
 
 def search(q, per_page=20, page=1, resource_type=None):
     """GET /database/search — search releases, artists, labels. q is required."""
-    url = f"{settings.DISCOGS_API_BASE_URL.rstrip('/')}/database/search"
     params = {"q": q, "per_page": per_page, "page": page}
     if resource_type is not None:
         params["type"] = resource_type
-    return requests.get(url, headers=_headers(), params=params)
+    return _get("database/search", params=params)
 
 
 def get_release(release_id):
     """GET /releases/{id} — get full release details including tracklist."""
-    url = f"{settings.DISCOGS_API_BASE_URL.rstrip('/')}/releases/{release_id}"
-    return requests.get(url, headers=_headers())
+    return _cached_get(f"releases/{release_id}")
 
 
 def get_master(master_id):
     """GET /masters/{id} — get master release details (title, artists, tracklist, main_release, etc.)."""
-    url = f"{settings.DISCOGS_API_BASE_URL.rstrip('/')}/masters/{master_id}"
-    return requests.get(url, headers=_headers())
+    return _cached_get(f"masters/{master_id}")
 
 
 def get_artist(artist_id):
     """GET /artists/{id} — get full artist details."""
-    url = f"{settings.DISCOGS_API_BASE_URL.rstrip('/')}/artists/{artist_id}"
-    return requests.get(url, headers=_headers())
+    return _cached_get(f"artists/{artist_id}")
 
 
 def get_label(label_id):
     """GET /labels/{id} — get full label details."""
-    url = f"{settings.DISCOGS_API_BASE_URL.rstrip('/')}/labels/{label_id}"
-    return requests.get(url, headers=_headers())
+    return _get(f"labels/{label_id}")
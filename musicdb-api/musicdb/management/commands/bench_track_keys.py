@@ -0,0 +1,32 @@
+"""
+python manage.py bench_track_keys [--rows N] [--upserts U] [--seed S] [--table T]
+
+Offline index-size and upsert-throughput comparison of the old composite unique indexes and
+the hashed track_key design for TrackSpotifyLink and TrackEspeciallyLiked (in-memory SQLite).
+"""
+from django.core.management.base import BaseCommand
+
+from musicdb.track_key_bench import TABLES, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmark composite vs hashed track-key indexes (index size and upsert throughput)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Rows loaded per table")
+        parser.add_argument("--upserts", type=int, default=50_000, help="Upserts timed per design")
+        parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+        parser.add_argument("--table", action="append", choices=list(TABLES), help="Limit to a table")
+
+    def handle(self, *args, **options):
+        rows = run_benchmark(
+            rows=options["rows"], upserts=options["upserts"], seed=options["seed"], tables=options["table"]
+        )
+        self.stdout.write(
+            f"{'table':<22}{'design':<11}{'rows':>10}{'index MB':>10}{'build s':>9}{'upserts/s':>11}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['table']:<22}{row['design']:<11}{row['rows']:>10}{row['index_bytes'] / 1e6:>10.1f}"
+                f"{row['build_s']:>9.2f}{row['upserts_per_s']:>11.0f}"
+            )
@@ -0,0 +1,18 @@
+"""
+python manage.py prune_library_changes
+
+Delete library change log rows older than LIBRARY_CHANGE_RETENTION_DAYS, keeping each user's
+newest change so the library version never goes back. Clients whose sync cursor predates the
+pruned range get a reset from GET /api/sync/ and do a full load.
+"""
+from django.core.management.base import BaseCommand
+
+from musicdb.services.library_changes import prune_library_changes
+
+
+class Command(BaseCommand):
+    help = "Delete library sync changes older than the retention window."
+
+    def handle(self, *args, **options):
+        deleted = prune_library_changes()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} library changes"))
@@ -0,0 +1,63 @@
+"""
+python manage.py revalidate_spotify_links [--checkpoint PATH] [--only tracks|artists|albums ...]
+
+Refresh stored Spotify track links and Spotify image URLs via batch endpoints.
+With --checkpoint, progress is written after every batch and a rerun resumes from it;
+the file is removed once every selected target has finished.
+"""
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from musicdb.services.spotify_link_revalidation import (
+    REVALIDATION_TARGETS,
+    revalidate_spotify_links,
+)
+
+
+class Command(BaseCommand):
+    help = "Revalidate stored Spotify links and image URLs using Spotify's multi-ID endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checkpoint", help="JSON file used to resume an interrupted run")
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            choices=[target[0] for target in REVALIDATION_TARGETS],
+            help="Limit to some link types",
+        )
+
+    def handle(self, *args, **options):
+        path = options.get("checkpoint")
+        checkpoint = {}
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                checkpoint = json.load(fh)
+            self.stdout.write(f"Resuming from {path}: {checkpoint}")
+
+        def on_progress(name, stats, current):
+            self.stdout.write(
+                f"{name}: {stats['checked']}/{stats['total']} checked, "
+                f"{stats['updated']} updated, {stats['missing']} missing"
+            )
+            if path:
+                with open(path, "w") as fh:
+                    json.dump(current, fh)
+
+        try:
+            results = revalidate_spotify_links(
+                checkpoint=checkpoint, targets=options.get("only"), on_progress=on_progress
+            )
+        except ValueError as e:
+            hint = f"; rerun with --checkpoint {path} to resume" if path else ""
+            raise CommandError(f"Revalidation stopped: {e}{hint}")
+
+        if path and os.path.exists(path):
+            os.remove(path)
+        for name, stats in results.items():
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{name}: done — {stats['updated']} updated, {stats['missing']} missing of {stats['total']}"
+                )
+            )
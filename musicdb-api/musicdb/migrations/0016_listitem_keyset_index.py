@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musicdb', '0015_consumed_backfill_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listitem',
+            index=models.Index(fields=['list', '-added_at', '-id'], name='listitem_list_added_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-19 08:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musicdb', '0017_library_change'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='artistspotifyimagelink',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='consumedalbum',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='list',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='listitem',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='releasegroupimagelink',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='trackespeciallyliked',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='trackspotifylink',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='consumedalbum',
+            index=models.Index(condition=models.Q(('consumed', True)), fields=['user', '-id'], name='consumed_user_true_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='list',
+            index=models.Index(fields=['user', '-updated_at'], name='list_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listitem',
+            index=models.Index(fields=['type', 'discogs_id'], name='listitem_type_discogs_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from musicdb.track_keys import track_identity_key
+
+FILL_BATCH_SIZE = 2000
+
+TRACK_KEY_FIELDS = {
+    "trackspotifylink": ("release_id", "track_title"),
+    "trackespeciallyliked": ("item_type", "item_id", "track_position", "track_title"),
+}
+
+
+def fill_track_keys(apps, schema_editor):
+    """Compute track_key for existing rows, batch by batch."""
+    for model_name, fields in TRACK_KEY_FIELDS.items():
+        model = apps.get_model("musicdb", model_name)
+        batch = []
+        for row in model.objects.only("id", *fields).order_by("pk").iterator(chunk_size=FILL_BATCH_SIZE):
+            row.track_key = track_identity_key(*(getattr(row, name) for name in fields))
+            batch.append(row)
+            if len(batch) >= FILL_BATCH_SIZE:
+                model.objects.bulk_update(batch, ["track_key"])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ["track_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musicdb', '0018_index_audit'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trackespeciallyliked',
+            name='track_key',
+            field=models.BigIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='trackspotifylink',
+            name='track_key',
+            field=models.BigIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_track_keys, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='trackespeciallyliked',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='trackspotifylink',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='trackespeciallyliked',
+            index=models.Index(fields=['user', 'item_type', 'item_id'], name='trackliked_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackspotifylink',
+            index=models.Index(fields=['user', 'release_id'], name='trackspotifylink_release_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='trackespeciallyliked',
+            constraint=models.UniqueConstraint(fields=('user', 'track_key'), name='trackespeciallyliked_user_key_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='trackspotifylink',
+            constraint=models.UniqueConstraint(fields=('user', 'track_key'), name='trackspotifylink_user_key_uniq'),
+        ),
+        migrations.AlterField(
+            model_name='trackespeciallyliked',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='especially_liked_tracks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='trackspotifylink',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='track_spotify_links', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musicdb', '0019_track_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='librarychange',
+            index=models.Index(fields=['created_at'], name='librarychange_created_idx'),
+        ),
+    ]
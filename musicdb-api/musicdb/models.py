@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.db import models
 
+from .track_keys import TrackKeyModel
+
 
 class ConsumedAlbum(models.Model):
     """
@@ -20,8 +22,17 @@ class ConsumedAlbum(models.Model):
     consumed = models.BooleanField(default=True)
 
     class Meta:
+        # No default ordering: it would add an ORDER BY to every query; callers order explicitly.
+        # unique_together also serves point lookups by (user, type, discogs_id).
         unique_together = ("user", "type", "discogs_id")
-        ordering = ["-id"]
+        indexes = [
+            # The consumed list / titles / library state read only consumed rows, newest first.
+            models.Index(
+                fields=["user", "-id"],
+                condition=models.Q(consumed=True),
+                name="consumed_user_true_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.type}-{self.discogs_id}: consumed={self.consumed}"
@@ -54,7 +65,10 @@ class List(models.Model):
 
     class Meta:
         unique_together = ("user", "list_type", "name")
-        ordering = ["-updated_at"]
+        indexes = [
+            # ListsView: a user's lists, most recently updated first.
+            models.Index(fields=["user", "-updated_at"], name="list_user_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.name} ({self.list_type})"
@@ -76,21 +90,30 @@ class ListItem(models.Model):
 
     class Meta:
         unique_together = ("list", "type", "discogs_id")
-        ordering = ["-added_at"]
+        indexes = [
+            # Keyset pagination of a list's items (ListDetailView): newest first, id tiebreak.
+            models.Index(fields=["list", "-added_at", "-id"], name="listitem_list_added_idx"),
+            # Membership checks start from the catalog item, whatever the number of lists.
+            models.Index(fields=["type", "discogs_id"], name="listitem_type_discogs_idx"),
+        ]
 
     def __str__(self):
         return f"{self.list.name} - {self.type}-{self.discogs_id}"
 
 
-class TrackSpotifyLink(models.Model):
+class TrackSpotifyLink(TrackKeyModel):
     """
     User's manual link: catalog track (release + title) → Spotify track.
     When present, overrides the automatic match for this track on this release.
+    Unique per user on track_key, the hashed (release_id, track_title).
     """
+    TRACK_KEY_FIELDS = ("release_id", "track_title")
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="track_spotify_links",
+        db_index=False,  # (user, track_key) leads with user
     )
     release_id = models.CharField(max_length=64)  # MusicBrainz release MBID or similar
     track_title = models.CharField(max_length=512)
@@ -101,8 +124,13 @@ class TrackSpotifyLink(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ("user", "release_id", "track_title")
-        ordering = ["release_id", "track_title"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "track_key"], name="trackspotifylink_user_key_uniq"),
+        ]
+        indexes = [
+            # ManualSpotifyMatchesView: a release's links.
+            models.Index(fields=["user", "release_id"], name="trackspotifylink_release_idx"),
+        ]
 
     def __str__(self):
         return f"{self.release_id} / {self.track_title} → {self.spotify_track_id}"
@@ -127,7 +155,6 @@ class ArtistSpotifyImageLink(models.Model):
 
     class Meta:
         unique_together = ("user", "musicbrainz_artist_id")
-        ordering = ["musicbrainz_artist_id"]
 
     def __str__(self):
         return f"{self.musicbrainz_artist_id} → {self.image_url[:48]}…"
@@ -152,20 +179,23 @@ class ReleaseGroupImageLink(models.Model):
 
     class Meta:
         unique_together = ("user", "musicbrainz_release_group_id")
-        ordering = ["musicbrainz_release_group_id"]
 
     def __str__(self):
         return f"{self.musicbrainz_release_group_id} → {self.image_url[:48]}…"
 
 
-class TrackEspeciallyLiked(models.Model):
+class TrackEspeciallyLiked(TrackKeyModel):
     """
     User's "especially liked" track preference (state 2) for a specific item track.
+    Unique per user on track_key, the hashed (item_type, item_id, track_position, track_title).
     """
+    TRACK_KEY_FIELDS = ("item_type", "item_id", "track_position", "track_title")
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="especially_liked_tracks",
+        db_index=False,  # (user, track_key) leads with user
     )
     item_type = models.CharField(max_length=20)  # 'release' | 'master' | 'album'
     item_id = models.CharField(max_length=64)
@@ -174,9 +204,84 @@ class TrackEspeciallyLiked(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ("user", "item_type", "item_id", "track_position", "track_title")
-        ordering = ["item_type", "item_id", "track_position", "track_title"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "track_key"], name="trackespeciallyliked_user_key_uniq"),
+        ]
+        indexes = [
+            # Liked tracks for one or many albums.
+            models.Index(fields=["user", "item_type", "item_id"], name="trackliked_item_idx"),
+        ]
 
     def __str__(self):
         pos = f"{self.track_position} - " if self.track_position else ""
-        return f"{self.item_type}/{self.item_id}: {pos}{self.track_title}"
\ No newline at end of file
+        return f"{self.item_type}/{self.item_id}: {pos}{self.track_title}"
+
+
+class ConsumedBackfillJob(models.Model):
+    """
+    Per-user progress of the consumed-album title backfill (catalog 'Artist - Album' titles).
+    last_consumed_id is the checkpoint: rows are processed in pk order, so a failed or
+    interrupted job resumes after it.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="consumed_backfill_job",
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    last_consumed_id = models.BigIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"ConsumedBackfillJob({self.user_id}): {self.status} {self.processed}/{self.total}"
+
+
+class LibraryChange(models.Model):
+    """
+    Append-only per-user change log for incremental sync (GET /api/sync/?since=).
+    ids are monotonic, so a client's cursor is the last id it has applied (plus the time its
+    unread changes start, see services.library_changes). Rows past the retention window are
+    deleted by the prune_library_changes command.
+    key identifies the changed entity within its kind (e.g. "release:123" for consumed albums).
+    """
+    OP_UPSERT = "upsert"
+    OP_DELETE = "delete"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="library_changes",
+    )
+    kind = models.CharField(max_length=32)  # consumed, list, list_item, especially_liked, track_link, ...
+    key = models.CharField(max_length=1024)
+    op = models.CharField(max_length=10, default=OP_UPSERT)
+    data = models.JSONField(null=True, blank=True)  # entity state for upserts
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="librarychange_user_id_idx"),
+            # prune_library_changes deletes by age.
+            models.Index(fields=["created_at"], name="librarychange_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} #{self.id} {self.op} {self.kind}:{self.key}"
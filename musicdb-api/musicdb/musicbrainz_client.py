@@ -104,7 +104,10 @@ def search(query, search_type="album", limit=20, offset=0, year=None, year_from=
                 frontend_type = "song"
             else:
                 frontend_type = "artist"
-            results.append({"type": frontend_type, "id": mb_id, "title": title or mb_id})
+            result = {"type": frontend_type, "id": mb_id, "title": title or mb_id}
+            if entity == "release":
+                result["release_group_id"] = (it.get("release-group") or {}).get("id") or None
+            results.append(result)
 
     return resp, results
 
@@ -157,12 +160,12 @@ def browse_release_groups_by_artist(artist_mbid, limit=100):
 
 
 def get_release(mbid):
-    """GET release/{mbid} with recordings and artist-credits for tracklist."""
+    """GET release/{mbid} with recordings, artist-credits and recording ISRCs for tracklist."""
     url = f"{MUSICBRAINZ_API_BASE}/release/{mbid}"
     return requests.get(
         url,
         headers=_headers(),
-        params={"fmt": "json", "inc": "recordings+artist-credits"},
+        params={"fmt": "json", "inc": "recordings+artist-credits+isrcs"},
         timeout=15,
     )
 
@@ -188,7 +191,7 @@ def browse_releases_by_release_group(rg_mbid, limit=1):
             "release-group": rg_mbid,
             "fmt": "json",
             "limit": min(int(limit), 100),
-            "inc": "recordings+artist-credits",
+            "inc": "recordings+artist-credits+isrcs",
         },
         timeout=15,
     )
@@ -21,7 +21,34 @@ class ListItemsWriteSerializer(serializers.Serializer):
     type = serializers.ChoiceField(choices=["release", "master", "album"])
     id = serializers.CharField()
     list_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
-    title = serializers.CharField(required=False, allow_blank=True, default="")
+    title = serializers.CharField(required=False, allow_blank=True, default="", max_length=512)  # ListItem.title
+
+
+class ListMembershipEntrySerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=["release", "master", "album"])
+    id = serializers.CharField()
+    list_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
+    title = serializers.CharField(required=False, allow_blank=True, default="", max_length=512)  # ListItem.title
+
+
+class ListItemsBulkWriteSerializer(serializers.Serializer):
+    mode = serializers.ChoiceField(choices=["set", "add"], default="set")
+    items = serializers.ListField(child=ListMembershipEntrySerializer(), allow_empty=False, max_length=500)
+
+
+class LibraryItemRefSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=["release", "master", "album"])
+    id = serializers.CharField()
+
+    def validate_id(self, value):
+        iid = (value or "").strip()
+        if not iid:
+            raise serializers.ValidationError("This field may not be blank.")
+        return iid
+
+
+class LibraryCheckSerializer(serializers.Serializer):
+    items = serializers.ListField(child=LibraryItemRefSerializer(), allow_empty=False, max_length=500)
 
 
 class SpotifyTrackNestedSerializer(serializers.Serializer):
@@ -129,3 +156,7 @@ class EspeciallyLikedTrackWriteSerializer(serializers.Serializer):
         if not title:
             raise serializers.ValidationError("This field may not be blank.")
         return title
+
+
+class EspeciallyLikedBatchWriteSerializer(serializers.Serializer):
+    tracks = serializers.ListField(child=EspeciallyLikedTrackWriteSerializer(), allow_empty=False, max_length=500)
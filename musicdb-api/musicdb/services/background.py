@@ -0,0 +1,56 @@
+"""
+Minimal in-process background work: run a callable on a small thread pool once the current
+transaction commits, so slow upstream calls never sit inside a request's write path.
+
+Tasks are best-effort (lost on process restart), so only use this for work that can be redone,
+such as enriching a row that is already valid without it. Set BACKGROUND_TASKS_EAGER = True to
+run tasks inline (tests, management commands).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "BACKGROUND_TASK_WORKERS", DEFAULT_WORKERS),
+            thread_name_prefix="musicdb-background",
+        )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, "__name__", func))
+
+
+def _run_in_worker(func, args, kwargs):
+    try:
+        _run(func, args, kwargs)
+    finally:
+        # Worker threads get their own DB connections; don't leave them open between tasks.
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Schedule func(*args, **kwargs) to run after the current transaction commits."""
+
+    def submit():
+        if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+            _run(func, args, kwargs)
+        else:
+            _get_executor().submit(_run_in_worker, func, args, kwargs)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,131 @@
+"""
+Background, resumable backfill of catalog titles ('Artist - Album') for consumed albums.
+
+A user's job walks their consumed rows in pk order, one chunk at a time: catalog lookups for a
+chunk run concurrently (the Discogs client paces them to the rate budget), changed titles are
+written with one bulk_update, then the checkpoint and counters are saved. A job that failed or
+whose worker died resumes from its checkpoint when started again.
+
+Only "the catalog has no title" counts as failed. A rate limit, server error or timeout stops
+the job without moving the checkpoint past its chunk, so resuming retries those rows.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ConsumedAlbum, ConsumedBackfillJob
+from .background import run_in_background
+from .library_changes import consumed_change, record_library_changes
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_SIZE = 25
+BACKFILL_WORKERS = 4
+# A running job that has not saved progress for this long is assumed dead and may be resumed.
+STALE_AFTER = timedelta(minutes=5)
+
+
+def backfill_status(job):
+    """JSON-ready progress for the status endpoint."""
+    if job is None:
+        return {"status": None, "total": 0, "processed": 0, "updated": 0, "failed": 0}
+    return {
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "updated": job.updated,
+        "failed": job.failed,
+        "error": job.error or None,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _needs_title(title):
+    title = (title or "").strip()
+    return not title or " - " not in title
+
+
+def start_backfill(user):
+    """
+    Start (or resume) the user's backfill and return the job. A job that is already running
+    is returned as-is; a finished job starts over from the first row.
+    """
+    with transaction.atomic():
+        job, _ = ConsumedBackfillJob.objects.select_for_update().get_or_create(user=user)
+        if job.status == ConsumedBackfillJob.STATUS_RUNNING and timezone.now() - job.updated_at < STALE_AFTER:
+            return job
+        if job.status == ConsumedBackfillJob.STATUS_DONE:
+            job.last_consumed_id = 0
+            job.processed = job.updated = job.failed = 0
+            job.finished_at = None
+        job.status = ConsumedBackfillJob.STATUS_RUNNING
+        job.error = ""
+        job.total = ConsumedAlbum.objects.filter(user=user, consumed=True).count()
+        job.processed = ConsumedAlbum.objects.filter(
+            user=user, consumed=True, pk__lte=job.last_consumed_id
+        ).count()
+        job.started_at = timezone.now()
+        job.save()
+        run_in_background(run_backfill, job.pk)
+    return job
+
+
+def run_backfill(job_id, chunk_size=None):
+    """Process the job's remaining rows chunk by chunk, saving the checkpoint after each chunk."""
+    # Imported here: the views package imports this module.
+    from ..views.common import CatalogUnavailable, _catalog_display_title
+
+    def fetch(row):
+        try:
+            return _catalog_display_title(row.type, row.discogs_id)
+        except CatalogUnavailable as e:
+            return e
+
+    chunk_size = chunk_size or BACKFILL_CHUNK_SIZE
+    job = ConsumedBackfillJob.objects.get(pk=job_id)
+    base_qs = ConsumedAlbum.objects.filter(user_id=job.user_id, consumed=True).order_by("pk")
+    try:
+        with ThreadPoolExecutor(max_workers=BACKFILL_WORKERS) as pool:
+            while True:
+                rows = list(base_qs.filter(pk__gt=job.last_consumed_id)[:chunk_size])
+                if not rows:
+                    break
+                # Only rows without an "Artist - Album" title spend Discogs requests (and can fail).
+                pending = [row for row in rows if _needs_title(row.title)]
+                changed = []
+                failed = 0
+                unavailable = None
+                for row, fetched in zip(pending, pool.map(fetch, pending)):
+                    if isinstance(fetched, CatalogUnavailable):
+                        unavailable = fetched
+                    elif not fetched:
+                        failed += 1
+                    else:
+                        row.title = fetched[:512]
+                        changed.append(row)
+                # Titles already fetched are kept; the rows that have them are skipped on resume.
+                if changed:
+                    ConsumedAlbum.objects.bulk_update(changed, ["title"])
+                    record_library_changes(consumed_change(row) for row in changed)
+                job.updated += len(changed)
+                if unavailable is not None:
+                    # Checkpoint and the other counters stay put, so resuming redoes this chunk.
+                    raise unavailable
+                job.failed += failed
+                job.processed += len(rows)
+                job.last_consumed_id = rows[-1].pk
+                job.save(update_fields=["last_consumed_id", "processed", "updated", "failed", "updated_at"])
+    except Exception as e:
+        logger.exception("Consumed title backfill %s failed", job_id)
+        job.status = ConsumedBackfillJob.STATUS_FAILED
+        job.error = str(e)[:1000]
+        job.save(update_fields=["status", "error", "updated", "updated_at"])
+        return job
+    job.status = ConsumedBackfillJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "updated_at"])
+    return job
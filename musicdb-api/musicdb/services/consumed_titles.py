@@ -0,0 +1,23 @@
+"""Catalog title enrichment for ConsumedAlbum rows (run off the request path)."""
+from ..models import ConsumedAlbum
+from .library_changes import consumed_change, record_library_change
+
+
+def enrich_consumed_title(record_id):
+    """
+    Replace a consumed album's client-supplied title with the catalog 'Artist - Album' title.
+    Returns True if the row was updated. Rows unmarked since the task was queued are skipped.
+    """
+    # Imported here: the views package imports this module.
+    from ..views.common import _fetch_display_title_from_catalog
+
+    record = ConsumedAlbum.objects.filter(pk=record_id, consumed=True).first()
+    if record is None:
+        return False
+    title = _fetch_display_title_from_catalog(record.type, record.discogs_id)
+    if not title or title == record.title:
+        return False
+    record.title = title[:512]
+    ConsumedAlbum.objects.filter(pk=record_id).update(title=record.title)
+    record_library_change(consumed_change(record))
+    return True
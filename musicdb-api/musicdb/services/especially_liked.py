@@ -0,0 +1,71 @@
+"""
+Especially-liked track reads and writes for many albums at once: one query to read any number
+of items, and a constant number of queries (read current rows, bulk insert, bulk delete,
+change log) to toggle any number of tracks.
+"""
+from django.db import transaction
+
+from ..models import TrackEspeciallyLiked
+from ..track_keys import TrackKeyCollision
+from .library_changes import especially_liked_change, record_library_changes
+
+
+def liked_tracks_by_item(user, item_type, item_ids):
+    """{item_id: [{"track_title", "track_position"}, ...]} for every requested id (empty if none)."""
+    tracks = {item_id: [] for item_id in item_ids}
+    rows = (
+        TrackEspeciallyLiked.objects.filter(user=user, item_type=item_type, item_id__in=tracks)
+        .order_by("item_id", "track_position", "track_title")
+        .values_list("item_id", "track_title", "track_position")
+    )
+    for item_id, track_title, track_position in rows:
+        tracks[item_id].append({"track_title": track_title, "track_position": track_position})
+    return tracks
+
+
+def _track_key(entry):
+    return (
+        entry["item_type"],
+        str(entry["item_id"]).strip(),
+        str(entry.get("track_position") or "").strip()[:32],
+        entry["track_title"][:512],
+    )
+
+
+def apply_especially_liked(user, entries):
+    """
+    entries: [{"item_type", "item_id", "track_title", "track_position", "especially_liked"}];
+    a repeated track uses its last entry. Returns {"liked": count, "unliked": count} of rows
+    actually created and deleted. Raises TrackKeyCollision, before writing anything, if a
+    track shares its track_key with a different stored or requested track.
+    """
+    desired = {_track_key(entry): bool(entry.get("especially_liked")) for entry in entries}
+    identities = {TrackEspeciallyLiked.key_for(*key): key for key in desired}
+    if len(identities) < len(desired):
+        raise TrackKeyCollision("Two requested tracks share a track_key")
+    with transaction.atomic():
+        current = {}
+        for row in TrackEspeciallyLiked.objects.filter(user=user, track_key__in=identities).only(
+            "id", "user_id", "track_key", "item_type", "item_id", "track_position", "track_title"
+        ):
+            key = (row.item_type, row.item_id, row.track_position, row.track_title)
+            if identities[row.track_key] != key:
+                raise TrackKeyCollision(f"track_key {row.track_key} already belongs to {key!r}")
+            current[key] = row
+        to_create = [
+            TrackEspeciallyLiked(
+                user=user, item_type=item_type, item_id=item_id, track_position=position, track_title=title
+            )
+            for (item_type, item_id, position, title), liked in desired.items()
+            if liked and (item_type, item_id, position, title) not in current
+        ]
+        to_delete = [current[key] for key, liked in desired.items() if not liked and key in current]
+        if to_create:
+            TrackEspeciallyLiked.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_delete:
+            TrackEspeciallyLiked.objects.filter(pk__in=[row.pk for row in to_delete]).delete()
+        record_library_changes(
+            [especially_liked_change(row) for row in to_create]
+            + [especially_liked_change(row, deleted=True) for row in to_delete]
+        )
+    return {"liked": len(to_create), "unliked": len(to_delete)}
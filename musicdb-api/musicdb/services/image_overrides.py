@@ -0,0 +1,91 @@
+"""
+User image overrides (manual album covers and artist images) for whole grids of rows.
+
+ImageOverrideMap is a per-request identity map: each id is looked up at most once per request,
+and every batch of unseen ids costs one musicbrainz_release_group_id__in (or
+musicbrainz_artist_id__in) query, so a page of albums, members or list items is one query per
+kind, not one per row. Misses are remembered too. Views get the request's map with
+ImageOverrideMap.for_request().
+"""
+from ..models import ArtistSpotifyImageLink, ReleaseGroupImageLink
+
+ALBUM_FLAG = "manual_album_image"
+ARTIST_FLAG = "manual_spotify_artist_image"
+
+
+class ImageOverrideMap:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._album_urls = {}  # release-group MBID -> image_url, or None when the user has no override
+        self._artist_urls = {}  # artist MBID -> image_url, or None
+
+    @classmethod
+    def for_request(cls, request):
+        """The map shared by everything that handles this request."""
+        overrides = getattr(request, "_image_overrides", None)
+        if overrides is None or overrides.user_id != request.user.id:
+            overrides = cls(request.user.id)
+            request._image_overrides = overrides
+        return overrides
+
+    def _lookup(self, urls, model, field, ids):
+        ids = [i for i in ids if i]
+        missing = {i for i in ids if i not in urls}
+        if missing:
+            found = dict(
+                model.objects.filter(user_id=self.user_id, **{f"{field}__in": missing}).values_list(
+                    field, "image_url"
+                )
+            )
+            for i in missing:
+                urls[i] = found.get(i)
+        return {i: urls[i] for i in ids if urls[i]}
+
+    def album_images(self, release_group_ids):
+        """{release_group_id: image_url} for the ids the user has a manual cover for."""
+        return self._lookup(
+            self._album_urls, ReleaseGroupImageLink, "musicbrainz_release_group_id", release_group_ids
+        )
+
+    def artist_images(self, artist_ids):
+        """{musicbrainz_artist_id: image_url} for the ids the user has a manual image for."""
+        return self._lookup(self._artist_urls, ArtistSpotifyImageLink, "musicbrainz_artist_id", artist_ids)
+
+    @staticmethod
+    def _apply(rows, images, id_key, flag, mark_missing):
+        for row in rows:
+            url = images.get(row.get(id_key) or "")
+            if url:
+                row["thumb"] = url
+                row["images"] = [{"uri": url}]
+                row[flag] = True
+            elif mark_missing:
+                row[flag] = False
+        return rows
+
+    def apply_album_images(self, rows, id_key="id", mark_missing=False):
+        """
+        Replace thumb/images with the user's cover on each row whose id_key is an overridden
+        release group, and set manual_album_image. Other rows are left alone unless
+        mark_missing, which sets the flag to False on them.
+        """
+        images = self.album_images(row.get(id_key) for row in rows)
+        return self._apply(rows, images, id_key, ALBUM_FLAG, mark_missing)
+
+    def apply_artist_images(self, rows, id_key="id", mark_missing=False):
+        """Like apply_album_images(), for artist rows and manual_spotify_artist_image."""
+        images = self.artist_images(row.get(id_key) for row in rows)
+        return self._apply(rows, images, id_key, ARTIST_FLAG, mark_missing)
+
+    def apply_to_items(self, items):
+        """
+        Library rows ({"type", "id", ...}): artist rows get artist images, the rest album covers.
+        Album rows only match when their stored id is a release group (as on artist discographies).
+        """
+        artists = [item for item in items if item.get("type") == "artist"]
+        albums = [item for item in items if item.get("type") != "artist"]
+        if artists:
+            self.apply_artist_images(artists)
+        if albums:
+            self.apply_album_images(albums)
+        return items
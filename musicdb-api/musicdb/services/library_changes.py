@@ -0,0 +1,211 @@
+"""
+Per-user library change log behind incremental sync (GET /api/sync/?since=).
+
+Every view or service that writes consumed albums, lists, list items, especially-liked tracks,
+manual Spotify matches or manual images records a LibraryChange per affected entity right after
+the write. Each entity is identified by (kind, key); an upsert carries the
+entity as the client's full-load endpoints render it, a delete carries no data. Recording a
+change also drops the user's cached library state.
+
+Ids are handed out at insert but become visible at commit, so a change with a lower id can show
+up after a higher one was read. Sync therefore only serves changes older than
+LIBRARY_SYNC_SETTLE_SECONDS, which covers the short request transactions that write the log.
+Changes older than LIBRARY_CHANGE_RETENTION_DAYS are deleted by prune_library_changes; a sync
+position remembers when its unread changes start, so a position from before the pruned range
+is known to be expired.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from ..models import LibraryChange
+from .library_state import invalidate_library_state
+
+DEFAULT_SYNC_SETTLE_SECONDS = 2
+DEFAULT_CHANGE_RETENTION_DAYS = 90
+
+KIND_CONSUMED = "consumed"
+KIND_LIST = "list"
+KIND_LIST_ITEM = "list_item"
+KIND_ESPECIALLY_LIKED = "especially_liked"
+KIND_TRACK_LINK = "track_link"
+KIND_ARTIST_IMAGE = "artist_image"
+KIND_ALBUM_IMAGE = "album_image"
+
+
+def _change(user_id, kind, key, data=None):
+    op = LibraryChange.OP_DELETE if data is None else LibraryChange.OP_UPSERT
+    return LibraryChange(user_id=user_id, kind=kind, key=key[:1024], op=op, data=data)
+
+
+def consumed_change(record):
+    """Unmarked albums leave the consumed list, so they sync as deletes."""
+    key = f"{record.type}:{record.discogs_id}"
+    if not record.consumed:
+        return _change(record.user_id, KIND_CONSUMED, key)
+    return _change(
+        record.user_id,
+        KIND_CONSUMED,
+        key,
+        {"type": record.type, "id": record.discogs_id, "title": record.title or ""},
+    )
+
+
+def list_change(list_obj, deleted=False):
+    data = None if deleted else {"id": list_obj.id, "list_type": list_obj.list_type, "name": list_obj.name}
+    return _change(list_obj.user_id, KIND_LIST, str(list_obj.id), data)
+
+
+def list_item_change(user_id, item, deleted=False):
+    data = None if deleted else {
+        "list_id": item.list_id,
+        "type": item.type,
+        "id": item.discogs_id,
+        "title": item.title or "",
+    }
+    return _change(user_id, KIND_LIST_ITEM, f"{item.list_id}:{item.type}:{item.discogs_id}", data)
+
+
+def especially_liked_change(row, deleted=False):
+    data = None if deleted else {
+        "item_type": row.item_type,
+        "item_id": row.item_id,
+        "track_title": row.track_title,
+        "track_position": row.track_position,
+    }
+    key = f"{row.item_type}:{row.item_id}:{row.track_position}:{row.track_title}"
+    return _change(row.user_id, KIND_ESPECIALLY_LIKED, key, data)
+
+
+def track_link_change(link, deleted=False):
+    data = None if deleted else {
+        "release_id": link.release_id,
+        "track_title": link.track_title,
+        "spotify_track": {
+            "id": link.spotify_track_id,
+            "uri": link.spotify_uri,
+            "name": link.spotify_name,
+            "artists": link.spotify_artists or [],
+        },
+    }
+    return _change(link.user_id, KIND_TRACK_LINK, f"{link.release_id}:{link.track_title}", data)
+
+
+def artist_image_change(link, deleted=False):
+    data = None if deleted else {
+        "musicbrainz_artist_id": link.musicbrainz_artist_id,
+        "image_url": link.image_url,
+        "spotify_artist_id": link.spotify_artist_id or None,
+        "discogs_artist_id": link.discogs_artist_id or None,
+    }
+    return _change(link.user_id, KIND_ARTIST_IMAGE, link.musicbrainz_artist_id, data)
+
+
+def album_image_change(link, deleted=False):
+    data = None if deleted else {
+        "musicbrainz_release_group_id": link.musicbrainz_release_group_id,
+        "image_url": link.image_url,
+        "spotify_album_id": link.spotify_album_id or None,
+        "discogs_release_id": link.discogs_release_id or None,
+    }
+    return _change(link.user_id, KIND_ALBUM_IMAGE, link.musicbrainz_release_group_id, data)
+
+
+def record_library_changes(changes):
+    """Save unsaved LibraryChange rows (any users) with one insert and invalidate their library state."""
+    changes = list(changes)
+    if not changes:
+        return
+    LibraryChange.objects.bulk_create(changes)
+    user_ids = {change.user_id for change in changes}
+    for user_id in user_ids:
+        invalidate_library_state(user_id)
+
+    def invalidate_after_commit():
+        # Again once the writes are visible: a search that read the old rows before the commit
+        # may have cached them.
+        for user_id in user_ids:
+            invalidate_library_state(user_id)
+
+    transaction.on_commit(invalidate_after_commit)
+
+
+def record_library_change(change):
+    record_library_changes([change])
+
+
+def latest_change_id(user_id):
+    """The id of the user's newest change, or 0 (the library version)."""
+    last = LibraryChange.objects.filter(user_id=user_id).order_by("-id").values_list("id", flat=True).first()
+    return last or 0
+
+
+def _settled_before():
+    seconds = getattr(settings, "LIBRARY_SYNC_SETTLE_SECONDS", DEFAULT_SYNC_SETTLE_SECONDS)
+    return timezone.now() - timedelta(seconds=seconds)
+
+
+def _retained_since():
+    days = getattr(settings, "LIBRARY_CHANGE_RETENTION_DAYS", DEFAULT_CHANGE_RETENTION_DAYS)
+    return timezone.now() - timedelta(days=days)
+
+
+def sync_position(user_id):
+    """
+    (last_id, unread_since) for a client that is about to do a full load: the user's newest
+    settled change and the time every change after it was made at or after.
+    """
+    settled_before = _settled_before()
+    last = (
+        LibraryChange.objects.filter(user_id=user_id, created_at__lte=settled_before)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    return last or 0, int(settled_before.timestamp())
+
+
+def position_expired(unread_since):
+    """True when changes after a sync position may already have been pruned."""
+    return unread_since < _retained_since().timestamp()
+
+
+def changes_since(user_id, since_id, limit):
+    """
+    Up to `limit` settled log rows after since_id, collapsed to the newest change per (kind, key).
+    Returns (changes, last_id, unread_since, has_more); changes are ordered by when they last
+    changed and (last_id, unread_since) is the position to continue from.
+    """
+    settled_before = _settled_before()
+    rows = list(
+        LibraryChange.objects.filter(user_id=user_id, id__gt=since_id, created_at__lte=settled_before)
+        .order_by("id")
+        .values("id", "kind", "key", "op", "data", "created_at")[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    unread_since = rows[limit]["created_at"] if has_more else settled_before
+    rows = rows[:limit]
+    latest = {}
+    for row in rows:
+        latest.pop((row["kind"], row["key"]), None)
+        latest[(row["kind"], row["key"])] = row
+    changes = [
+        {"kind": row["kind"], "key": row["key"], "op": row["op"], "data": row["data"]}
+        for row in latest.values()
+    ]
+    return changes, (rows[-1]["id"] if rows else since_id), int(unread_since.timestamp()), has_more
+
+
+def prune_library_changes():
+    """
+    Delete changes older than the retention window, except each user's newest change: its id is
+    the library version (snapshot ETag), which must never go back. Returns the rows deleted.
+    """
+    newest = LibraryChange.objects.values("user_id").annotate(newest_id=Max("id")).values("newest_id")
+    deleted, _ = (
+        LibraryChange.objects.filter(created_at__lt=_retained_since()).exclude(id__in=newest).delete()
+    )
+    return deleted
@@ -0,0 +1,94 @@
+"""
+Boot snapshot of a user's library (GET /api/library/snapshot/) in columnar form.
+
+Each section is a dict of parallel arrays rather than a list of dicts, so field names are sent
+once per section. Entity types are dictionary-encoded as indexes into the top-level "types"
+array, and purely numeric catalog ids are sent as numbers. The snapshot's version is the id
+of the user's newest library change, so it changes exactly when the library does.
+"""
+from ..models import (
+    ArtistSpotifyImageLink,
+    ConsumedAlbum,
+    List,
+    ListItem,
+    ReleaseGroupImageLink,
+    TrackEspeciallyLiked,
+    TrackSpotifyLink,
+)
+
+
+def _compact_id(value):
+    """Numeric ids as ints when that round-trips and stays within JavaScript's safe integer range."""
+    if value.isascii() and value.isdigit() and len(value) < 16 and str(int(value)) == value:
+        return int(value)
+    return value
+
+
+def _columns(rows, names, encoders=None):
+    """Transpose value tuples into {name: [values]}, applying per-column encoders."""
+    encoders = encoders or {}
+    columns = {name: [] for name in names}
+    for row in rows:
+        for name, value in zip(names, row):
+            encode = encoders.get(name)
+            columns[name].append(encode(value) if encode else value)
+    return columns
+
+
+def build_library_snapshot(user_id):
+    """The user's lists, list memberships, consumed ids, especially-liked keys and manual-link keys."""
+    types = []
+    type_index = {}
+
+    def encode_type(value):
+        if value not in type_index:
+            type_index[value] = len(types)
+            types.append(value)
+        return type_index[value]
+
+    id_encoders = {"type": encode_type, "id": _compact_id}
+    snapshot = {
+        "lists": _columns(
+            List.objects.filter(user_id=user_id).order_by("id").values_list("id", "list_type", "name"),
+            ("id", "list_type", "name"),
+        ),
+        "list_items": _columns(
+            ListItem.objects.filter(list__user_id=user_id)
+            .order_by("list_id", "id")
+            .values_list("list_id", "type", "discogs_id"),
+            ("list_id", "type", "id"),
+            id_encoders,
+        ),
+        "consumed": _columns(
+            ConsumedAlbum.objects.filter(user_id=user_id, consumed=True)
+            .order_by("id")
+            .values_list("type", "discogs_id"),
+            ("type", "id"),
+            id_encoders,
+        ),
+        "especially_liked": _columns(
+            TrackEspeciallyLiked.objects.filter(user_id=user_id)
+            .order_by("id")
+            .values_list("item_type", "item_id", "track_position", "track_title"),
+            ("item_type", "item_id", "track_position", "track_title"),
+            {"item_type": encode_type, "item_id": _compact_id},
+        ),
+        "track_links": _columns(
+            TrackSpotifyLink.objects.filter(user_id=user_id)
+            .order_by("id")
+            .values_list("release_id", "track_title"),
+            ("release_id", "track_title"),
+        ),
+        "artist_images": list(
+            ArtistSpotifyImageLink.objects.filter(user_id=user_id)
+            .order_by("id")
+            .values_list("musicbrainz_artist_id", flat=True)
+        ),
+        "album_images": list(
+            ReleaseGroupImageLink.objects.filter(user_id=user_id)
+            .order_by("id")
+            .values_list("musicbrainz_release_group_id", flat=True)
+        ),
+    }
+    snapshot["types"] = types
+    return snapshot
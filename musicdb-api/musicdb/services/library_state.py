@@ -0,0 +1,95 @@
+"""
+Compact per-user library state (consumed / listed ids, consumed titles, manual image ids) used
+to annotate search results server-side, instead of shipping every consumed title to the client.
+
+The state is built with a handful of value queries and cached per user; every view or service
+that changes consumed albums, list items or manual images records a library change, which calls
+invalidate_library_state() (again on commit). Only workers that share the cache see the
+invalidation, so LIBRARY_STATE_TTL is short unless CACHE_URL configures a shared backend.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import ArtistSpotifyImageLink, ConsumedAlbum, ListItem, ReleaseGroupImageLink
+
+DEFAULT_LIBRARY_STATE_TTL = 60
+
+# Search results use frontend types; stored rows may use catalog entity names for the same id.
+_TYPE_ALIASES = {
+    "album": ("album", "release", "master"),
+    "release": ("release", "album"),
+    "master": ("master", "album"),
+}
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_title(title):
+    """Case- and whitespace-insensitive form of an 'Artist - Album' title."""
+    return _WS_RE.sub(" ", (title or "").strip()).casefold()
+
+
+def _state_key(user_id):
+    return f"musicdb:library_state:{user_id}"
+
+
+def _build_library_state(user_id):
+    consumed_rows = ConsumedAlbum.objects.filter(user_id=user_id, consumed=True).values_list(
+        "type", "discogs_id", "title"
+    )
+    return {
+        "consumed": frozenset((t, i) for t, i, _title in consumed_rows),
+        "consumed_titles": frozenset(normalize_title(title) for _t, _i, title in consumed_rows if title),
+        "listed": frozenset(
+            ListItem.objects.filter(list__user_id=user_id).values_list("type", "discogs_id").distinct()
+        ),
+        "album_covers": frozenset(
+            ReleaseGroupImageLink.objects.filter(user_id=user_id).values_list(
+                "musicbrainz_release_group_id", flat=True
+            )
+        ),
+        "artist_images": frozenset(
+            ArtistSpotifyImageLink.objects.filter(user_id=user_id).values_list("musicbrainz_artist_id", flat=True)
+        ),
+    }
+
+
+def get_library_state(user_id):
+    """The user's library state, from cache when possible."""
+    key = _state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = _build_library_state(user_id)
+        cache.set(key, state, timeout=getattr(settings, "LIBRARY_STATE_TTL", DEFAULT_LIBRARY_STATE_TTL))
+    return state
+
+
+def invalidate_library_state(user_id):
+    cache.delete(_state_key(user_id))
+
+
+def annotate_search_results(user_id, results):
+    """
+    Add {"library": {"consumed", "in_list", "manual_cover"}} to each search result in place.
+    consumed matches the result id or, failing that, its normalized title.
+    """
+    state = get_library_state(user_id)
+    for result in results:
+        result_type = result.get("type") or ""
+        result_id = str(result.get("id") or "")
+        keys = [(t, result_id) for t in _TYPE_ALIASES.get(result_type, (result_type,))]
+        if result_type == "artist":
+            manual_cover = result_id in state["artist_images"]
+        else:
+            manual_cover = (result.get("release_group_id") or "") in state["album_covers"]
+        consumed = any(k in state["consumed"] for k in keys) or (
+            result_type != "artist" and normalize_title(result.get("title")) in state["consumed_titles"]
+        )
+        result["library"] = {
+            "consumed": consumed,
+            "in_list": any(k in state["listed"] for k in keys),
+            "manual_cover": manual_cover,
+        }
+    return results
@@ -0,0 +1,102 @@
+"""
+Album-list membership writes: many (item, list_ids) pairs in one transaction and a constant
+number of queries (read lists, read current rows, bulk insert, read back inserted rows, bulk
+delete, bulk title update).
+"""
+from django.db import transaction
+
+from ..models import List, ListItem
+from .library_changes import list_item_change, record_library_changes
+
+MODE_SET = "set"  # each item ends up in exactly its list_ids (among the user's album lists)
+MODE_ADD = "add"  # each item is added to its list_ids; existing memberships are kept
+
+
+class InvalidListIds(ValueError):
+    """Some list_ids are not album lists owned by the user."""
+
+    def __init__(self, ids):
+        super().__init__(f"One or more lists not found or are not album lists: {set(ids)}")
+        self.ids = set(ids)
+
+
+def apply_list_memberships(user, entries, mode=MODE_SET):
+    """
+    entries: [{"type", "id", "title", "list_ids"}]; a repeated (type, id) uses its last entry.
+    Titles only fill items whose stored title is empty.
+    Returns {"added": [(list_id, type, id)], "removed": [...], "retitled": count}.
+    Raises InvalidListIds before writing anything.
+    """
+    desired = {}
+    for entry in entries:
+        key = (entry["type"], str(entry["id"]).strip())
+        desired[key] = (str(entry.get("title") or "").strip(), set(entry["list_ids"]))
+
+    with transaction.atomic():
+        user_list_ids = set(
+            List.objects.filter(user=user, list_type=List.LIST_TYPE_RELEASE).values_list("id", flat=True)
+        )
+        requested = set().union(*(list_ids for _title, list_ids in desired.values())) if desired else set()
+        if requested - user_list_ids:
+            raise InvalidListIds(requested - user_list_ids)
+
+        # One query for every current membership of the affected items; the type/id filters
+        # can over-match across pairs, so narrow to exact (type, id) keys in Python.
+        current = {
+            (item.list_id, item.type, item.discogs_id): item
+            for item in ListItem.objects.filter(
+                list_id__in=user_list_ids,
+                type__in={t for t, _ in desired},
+                discogs_id__in={i for _, i in desired},
+            ).only("id", "list_id", "type", "discogs_id", "title")
+            if (item.type, item.discogs_id) in desired
+        }
+
+        to_create = []
+        to_retitle = []
+        for (item_type, item_id), (title, list_ids) in desired.items():
+            for list_id in sorted(list_ids):
+                existing = current.get((list_id, item_type, item_id))
+                if existing is None:
+                    to_create.append(ListItem(list_id=list_id, type=item_type, discogs_id=item_id, title=title))
+                elif title and not existing.title:
+                    existing.title = title
+                    to_retitle.append(existing)
+        to_delete = []
+        if mode == MODE_SET:
+            to_delete = [
+                (key, item)
+                for key, item in current.items()
+                if key[0] not in desired[(key[1], key[2])][1]
+            ]
+
+        added = []
+        if to_create:
+            ListItem.objects.bulk_create(to_create, ignore_conflicts=True)
+            # ignore_conflicts skips rows a concurrent request inserted first, without saying
+            # which. Read the keys back: a row is ours when it carries the added_at we assigned.
+            ours = {(item.list_id, item.type, item.discogs_id): item.added_at for item in to_create}
+            added = [
+                item
+                for item in ListItem.objects.filter(
+                    list_id__in={key[0] for key in ours},
+                    type__in={key[1] for key in ours},
+                    discogs_id__in={key[2] for key in ours},
+                    added_at__gte=min(ours.values()),
+                ).only("id", "list_id", "type", "discogs_id", "title", "added_at")
+                if ours.get((item.list_id, item.type, item.discogs_id)) == item.added_at
+            ]
+        if to_delete:
+            ListItem.objects.filter(pk__in=[item.pk for _key, item in to_delete]).delete()
+        if to_retitle:
+            ListItem.objects.bulk_update(to_retitle, ["title"])
+        record_library_changes(
+            [list_item_change(user.id, item) for item in added + to_retitle]
+            + [list_item_change(user.id, item, deleted=True) for _key, item in to_delete]
+        )
+
+    return {
+        "added": [(item.list_id, item.type, item.discogs_id) for item in added],
+        "removed": [key for key, _item in to_delete],
+        "retitled": len(to_retitle),
+    }
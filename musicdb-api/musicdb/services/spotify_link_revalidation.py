@@ -0,0 +1,157 @@
+"""
+Refresh stored Spotify links (track matches, artist images, album covers) using
+Spotify's multi-ID endpoints, so thousands of rows cost a few dozen API calls.
+
+Progress is tracked as a checkpoint dict {target: last processed pk}; pass the
+same dict back in to resume after a failure or interruption.
+"""
+import logging
+from urllib.parse import urlparse
+
+from django.utils import timezone
+
+from spotify.client import (
+    SPOTIFY_BATCH_LIMITS,
+    get_spotify_albums,
+    get_spotify_artists,
+    get_spotify_tracks,
+)
+
+from ..models import ArtistSpotifyImageLink, ReleaseGroupImageLink, TrackSpotifyLink
+from .library_changes import (
+    album_image_change,
+    artist_image_change,
+    record_library_changes,
+    track_link_change,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _refresh_track_link(link, track):
+    """
+    Copy current Spotify track metadata onto the link. Returns True if anything changed.
+    A relinked track (linked_from set) carries the playable substitute's id and uri, which
+    replace the stored ones.
+    """
+    fresh = {
+        "spotify_track_id": (track.get("id") or link.spotify_track_id)[:64],
+        "spotify_uri": (track.get("uri") or "")[:128],
+        "spotify_name": (track.get("name") or "")[:512],
+        "spotify_artists": [
+            {"name": str(a.get("name", "")).strip()}
+            for a in track.get("artists") or []
+            if isinstance(a, dict)
+        ],
+    }
+    changed = False
+    for field, value in fresh.items():
+        if getattr(link, field) != value:
+            setattr(link, field, value)
+            changed = True
+    return changed
+
+
+def _is_spotify_cdn_url(url):
+    host = (urlparse(url or "").netloc or "").lower()
+    return host == "scdn.co" or host.endswith(".scdn.co")
+
+
+def _refresh_image_link(link, obj):
+    """
+    Replace a rotated Spotify CDN image URL with the entity's current largest image.
+    URLs from other sources (Discogs picks) are left alone.
+    """
+    urls = [
+        (img.get("url") or "").strip()
+        for img in obj.get("images") or []
+        if isinstance(img, dict) and (img.get("url") or "").strip()
+    ]
+    if not urls or link.image_url in urls or not _is_spotify_cdn_url(link.image_url):
+        return False
+    link.image_url = urls[0]
+    return True
+
+
+# name, model, Spotify ID field, batch fetcher, refresh function, fields written back, change-log entry.
+# Fetchers are wrapped so the client functions are looked up at call time (patchable in tests).
+REVALIDATION_TARGETS = (
+    (
+        "tracks",
+        TrackSpotifyLink,
+        "spotify_track_id",
+        lambda ids: get_spotify_tracks(ids),
+        _refresh_track_link,
+        ["spotify_track_id", "spotify_uri", "spotify_name", "spotify_artists", "updated_at"],
+        track_link_change,
+    ),
+    (
+        "artists",
+        ArtistSpotifyImageLink,
+        "spotify_artist_id",
+        lambda ids: get_spotify_artists(ids),
+        _refresh_image_link,
+        ["image_url", "updated_at"],
+        artist_image_change,
+    ),
+    (
+        "albums",
+        ReleaseGroupImageLink,
+        "spotify_album_id",
+        lambda ids: get_spotify_albums(ids),
+        _refresh_image_link,
+        ["image_url", "updated_at"],
+        album_image_change,
+    ),
+)
+
+
+def revalidate_spotify_links(checkpoint=None, targets=None, on_progress=None):
+    """
+    Walk every stored link with a Spotify ID in pk order, one Spotify batch per DB batch.
+
+    checkpoint: {target: last pk done}, updated in place after each batch.
+    targets: optional subset of "tracks" / "artists" / "albums".
+    on_progress(target, stats, checkpoint): called after each batch (persist the checkpoint here).
+
+    Returns {target: {"total", "checked", "updated", "missing"}}. Spotify errors propagate
+    (ValueError) with the checkpoint pointing at the last completed batch.
+    """
+    checkpoint = checkpoint if checkpoint is not None else {}
+    results = {}
+    for name, model, id_field, fetch, refresh, fields, change in REVALIDATION_TARGETS:
+        if targets and name not in targets:
+            continue
+        base_qs = model.objects.exclude(**{id_field: ""}).order_by("pk")
+        stats = {
+            "total": base_qs.count(),
+            "checked": base_qs.filter(pk__lte=checkpoint.get(name, 0)).count(),
+            "updated": 0,
+            "missing": 0,
+        }
+        results[name] = stats
+        batch_size = SPOTIFY_BATCH_LIMITS[name]
+        while True:
+            rows = list(base_qs.filter(pk__gt=checkpoint.get(name, 0))[:batch_size])
+            if not rows:
+                break
+            objects = fetch([getattr(row, id_field) for row in rows])
+            now = timezone.now()
+            changed = []
+            for row in rows:
+                obj = objects.get(getattr(row, id_field))
+                if obj is None:
+                    stats["missing"] += 1
+                elif refresh(row, obj):
+                    row.updated_at = now
+                    changed.append(row)
+            if changed:
+                model.objects.bulk_update(changed, fields)
+                record_library_changes(change(row) for row in changed)
+            stats["checked"] += len(rows)
+            stats["updated"] += len(changed)
+            checkpoint[name] = rows[-1].pk
+            if on_progress:
+                on_progress(name, stats, checkpoint)
+        logger.info("Revalidated %s Spotify links: %s", name, stats)
+    return results
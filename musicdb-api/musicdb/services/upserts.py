@@ -0,0 +1,40 @@
+"""
+Single-statement upserts for the toggle endpoints.
+
+update_or_create() is a SELECT followed by an UPDATE or INSERT, and two fast clicks can both
+miss on the SELECT and race into an IntegrityError. upsert() issues one
+INSERT ... ON CONFLICT (lookup fields) DO UPDATE instead, which PostgreSQL and SQLite (3.24+)
+both support; other backends fall back to update_or_create().
+"""
+from django.db import connections, router
+
+
+def upsert(model, lookup, values, create_values=None):
+    """
+    Insert model(**lookup, **values, **create_values), or update `values` on the row matching
+    `lookup`, which must be the model's unique fields; create_values are only written on insert.
+    Returns the saved instance (with its pk); fields outside lookup and values hold their
+    insert-time values, not necessarily the stored row's.
+    """
+    create_values = create_values or {}
+    using = router.db_for_write(model)
+    features = connections[using].features
+    if not (features.supports_update_conflicts_with_target and values):
+        obj, _ = model.objects.using(using).update_or_create(
+            **lookup, defaults=values, create_defaults={**create_values, **values}
+        )
+        return obj
+
+    # auto_now fields are only refreshed by save(); include them so a conflict bumps them too.
+    update_fields = list(values) + [
+        f.name for f in model._meta.concrete_fields if getattr(f, "auto_now", False) and f.name not in values
+    ]
+    obj = model(**lookup, **create_values, **values)
+    model.objects.using(using).bulk_create(
+        [obj], update_conflicts=True, unique_fields=list(lookup), update_fields=update_fields
+    )
+    if obj.pk is None:
+        # Backends that cannot return rows from the insert.
+        obj.pk = model.objects.using(using).filter(**lookup).values_list("pk", flat=True).get()
+    return obj
+
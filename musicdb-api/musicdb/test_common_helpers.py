@@ -1,9 +1,12 @@
 """Tests for small helpers in views/common.py."""
 
+from unittest.mock import patch
+
 from django.test import SimpleTestCase
 
 from musicdb.views.common import (
     _format_duration_from_mb_length,
+    _normalize_mb_release,
     _parse_optional_int,
     _validate_choice,
 )
@@ -46,3 +49,23 @@ class ValidateChoiceTests(SimpleTestCase):
         res = _validate_choice("bad", ("album", "artist"), "type")
         self.assertIsNotNone(res)
         self.assertEqual(res.status_code, 400)
+
+
+class NormalizeMbReleaseIsrcTests(SimpleTestCase):
+    @patch("musicdb.views.common.mb.get_cover_art", return_value=None)
+    def test_tracklist_carries_first_recording_isrc(self, _mock_cover):
+        data = {
+            "id": "rel-1",
+            "title": "Album",
+            "media": [
+                {
+                    "tracks": [
+                        {"position": "1", "recording": {"title": "A", "isrcs": ["usrc17600001", "GBAYE0000001"]}},
+                        {"position": "2", "recording": {"title": "B", "isrcs": []}},
+                    ]
+                }
+            ],
+        }
+        tracklist = _normalize_mb_release(data)["tracklist"]
+        self.assertEqual(tracklist[0]["isrc"], "USRC17600001")
+        self.assertNotIn("isrc", tracklist[1])
@@ -0,0 +1,214 @@
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import ConsumedAlbum, ConsumedBackfillJob
+from .services.background import run_in_background
+from .services.consumed_backfill import start_backfill
+from .services.consumed_titles import enrich_consumed_title
+
+
+def _catalog_release(title="Kind of Blue", artist="Miles Davis"):
+    return Mock(status_code=200, json=lambda: {"title": title, "artists": [{"name": artist}]})
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class ConsumedAlbumToggleTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="consumeduser",
+            email="consumeduser@example.com",
+            password="password123",
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+
+    def _mark(self, consumed=True, title="client title"):
+        return self.client.post(
+            "/api/search/consumed/?type=release&id=123",
+            data={"consumed": consumed, "title": title},
+            format="json",
+        )
+
+    @patch("musicdb.views.common.get_release")
+    def test_write_commits_with_client_title_before_catalog_lookup(self, mock_get_release):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            res = self._mark()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"consumed": True})
+        self.assertEqual(ConsumedAlbum.objects.get(user=self.user).title, "client title")
+        mock_get_release.assert_not_called()
+        self.assertEqual(len(callbacks), 2)  # the title lookup and the library state invalidation
+
+    @patch("musicdb.views.common.get_release", return_value=_catalog_release())
+    def test_background_task_patches_catalog_title(self, mock_get_release):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._mark()
+        self.assertEqual(ConsumedAlbum.objects.get(user=self.user).title, "Miles Davis - Kind of Blue")
+        mock_get_release.assert_called_once_with(123)
+
+    @patch("musicdb.views.common.get_release")
+    def test_unmarking_queues_nothing(self, mock_get_release):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            res = self._mark(consumed=False)
+        self.assertEqual(res.json(), {"consumed": False})
+        self.assertEqual(len(callbacks), 1)  # only the library state invalidation
+        mock_get_release.assert_not_called()
+
+    @patch("musicdb.views.common.get_release", return_value=Mock(status_code=503))
+    def test_catalog_failure_keeps_client_title(self, _mock_get_release):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._mark()
+        self.assertEqual(ConsumedAlbum.objects.get(user=self.user).title, "client title")
+
+    def test_toggle_is_one_upsert_statement(self):
+        self._mark(title="first")
+        with CaptureQueriesContext(connection) as ctx:
+            self._mark(consumed=False, title="second")
+        writes = [q["sql"] for q in ctx.captured_queries if "musicdb_consumedalbum" in q["sql"]]
+        self.assertEqual(len(writes), 1)
+        self.assertIn("ON CONFLICT", writes[0])
+        record = ConsumedAlbum.objects.get(user=self.user)
+        self.assertEqual((record.consumed, record.title), (False, "second"))
+
+    def test_upsert_falls_back_without_conflict_target_support(self):
+        with patch.object(connection.features, "supports_update_conflicts_with_target", False):
+            self._mark(title="first")
+            res = self._mark(consumed=False, title="second")
+        self.assertEqual(res.json(), {"consumed": False})
+        self.assertEqual(ConsumedAlbum.objects.get(user=self.user).title, "second")
+
+
+class EnrichConsumedTitleTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="enrichuser", email="enrich@example.com", password="pw"
+        )
+
+    @patch("musicdb.views.common.get_release", return_value=_catalog_release())
+    def test_skips_rows_unmarked_since_queued(self, mock_get_release):
+        record = ConsumedAlbum.objects.create(
+            user=self.user, type="release", discogs_id="123", title="t", consumed=False
+        )
+        self.assertFalse(enrich_consumed_title(record.pk))
+        mock_get_release.assert_not_called()
+
+    @override_settings(BACKGROUND_TASKS_EAGER=True)
+    def test_failing_task_is_logged_not_raised(self):
+        def boom():
+            raise RuntimeError("boom")
+
+        with self.assertLogs("musicdb.services.background", level="ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                run_in_background(boom)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class ConsumedBackfillTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="backfilluser", email="backfill@example.com", password="pw"
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+
+    def _albums(self, count, title=""):
+        return [
+            ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id=str(i), title=title)
+            for i in range(1, count + 1)
+        ]
+
+    @patch("musicdb.views.common.get_release", return_value=_catalog_release())
+    def test_post_runs_job_and_get_reports_progress(self, _mock_get_release):
+        self._albums(30)
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="99", title="A - B")
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post("/api/search/consumed-backfill/")
+        self.assertEqual(res.status_code, 202)
+
+        body = self.client.get("/api/search/consumed-backfill/").json()
+        self.assertEqual(body["status"], ConsumedBackfillJob.STATUS_DONE)
+        self.assertEqual((body["total"], body["processed"], body["updated"], body["failed"]), (31, 31, 30, 0))
+        self.assertFalse(ConsumedAlbum.objects.exclude(title__contains=" - ").exists())
+        self.assertEqual(ConsumedAlbum.objects.get(discogs_id="99").title, "A - B")
+
+    def test_get_without_job(self):
+        self.assertEqual(self.client.get("/api/search/consumed-backfill/").json()["status"], None)
+
+    @patch("musicdb.services.consumed_backfill.BACKFILL_CHUNK_SIZE", 3)
+    @patch("musicdb.views.common.get_release", return_value=_catalog_release())
+    def test_failed_job_resumes_from_checkpoint(self, mock_get_release):
+        albums = self._albums(6)
+        with patch("musicdb.services.consumed_backfill.ConsumedAlbum.objects.bulk_update") as mock_bulk:
+            mock_bulk.side_effect = [None, RuntimeError("db down")]
+            with self.captureOnCommitCallbacks(execute=True):
+                start_backfill(self.user)
+        job = ConsumedBackfillJob.objects.get(user=self.user)
+        self.assertEqual(job.status, ConsumedBackfillJob.STATUS_FAILED)
+        self.assertEqual((job.processed, job.last_consumed_id), (3, albums[2].pk))
+
+        mock_get_release.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            start_backfill(self.user)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ConsumedBackfillJob.STATUS_DONE)
+        self.assertEqual(job.processed, 6)
+        self.assertEqual(mock_get_release.call_count, 3)
+
+    @patch("musicdb.views.common.get_release", return_value=Mock(status_code=404))
+    def test_lookup_misses_count_as_failed(self, _mock_get_release):
+        self._albums(3, title="client title")
+        with self.captureOnCommitCallbacks(execute=True):
+            start_backfill(self.user)
+        job = ConsumedBackfillJob.objects.get(user=self.user)
+        self.assertEqual((job.updated, job.failed), (0, 3))
+
+    @patch("musicdb.views.common.get_release", return_value=Mock(status_code=404))
+    def test_rows_with_titles_are_not_fetched(self, mock_get_release):
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="1", title="Artist - Album")
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="2", title="")
+        with self.captureOnCommitCallbacks(execute=True):
+            start_backfill(self.user)
+        job = ConsumedBackfillJob.objects.get(user=self.user)
+        self.assertEqual(mock_get_release.call_count, 1)
+        self.assertEqual((job.processed, job.updated, job.failed), (2, 0, 1))
+
+    @patch("musicdb.services.consumed_backfill.BACKFILL_CHUNK_SIZE", 3)
+    @patch("musicdb.views.common.get_release")
+    def test_rate_limited_rows_are_retried_on_resume(self, mock_get_release):
+        albums = self._albums(6)
+        # Chunk 1 succeeds; in chunk 2 the catalog rate-limits one row.
+        mock_get_release.side_effect = lambda release_id: (
+            Mock(status_code=429) if release_id == 5 else _catalog_release()
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            start_backfill(self.user)
+        job = ConsumedBackfillJob.objects.get(user=self.user)
+        self.assertEqual(job.status, ConsumedBackfillJob.STATUS_FAILED)
+        self.assertIn("429", job.error)
+        self.assertEqual((job.processed, job.updated, job.failed), (3, 5, 0))
+        self.assertEqual(job.last_consumed_id, albums[2].pk)
+
+        mock_get_release.reset_mock()
+        mock_get_release.side_effect = None
+        mock_get_release.return_value = _catalog_release()
+        with self.captureOnCommitCallbacks(execute=True):
+            start_backfill(self.user)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ConsumedBackfillJob.STATUS_DONE)
+        self.assertEqual((job.processed, job.updated, job.failed), (6, 6, 0))
+        # Only the rate-limited row is looked up again.
+        mock_get_release.assert_called_once_with(5)
+
+    def test_running_job_is_not_started_twice(self):
+        ConsumedBackfillJob.objects.create(user=self.user, status=ConsumedBackfillJob.STATUS_RUNNING)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.client.post("/api/search/consumed-backfill/")
+        self.assertEqual(len(callbacks), 0)
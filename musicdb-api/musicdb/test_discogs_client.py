@@ -0,0 +1,86 @@
+"""Tests for Discogs client throttling and response caching (HTTP mocked)."""
+
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from musicdb import client
+
+
+def _response(status_code=200, body=b'{"id": 1, "name": "Artist"}', remaining=None, limit=60):
+    headers = {"Content-Type": "application/json", "X-Discogs-Ratelimit": str(limit)}
+    if remaining is not None:
+        headers["X-Discogs-Ratelimit-Remaining"] = str(remaining)
+        headers["X-Discogs-Ratelimit-Used"] = str(limit - remaining)
+    return Mock(status_code=status_code, content=body, headers=headers, url="https://api.discogs.com/x")
+
+
+class DiscogsRateLimitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch("musicdb.client.time.sleep")
+    @patch("musicdb.client._session")
+    def test_plenty_of_budget_does_not_wait(self, mock_session, mock_sleep):
+        mock_session.get.return_value = _response(remaining=50)
+        client.search("a")
+        client.search("b")
+        mock_sleep.assert_not_called()
+
+    @patch("musicdb.client.time.sleep")
+    @patch("musicdb.client._session")
+    def test_low_budget_paces_requests(self, mock_session, mock_sleep):
+        mock_session.get.return_value = _response(remaining=5, limit=60)
+        client.search("a")
+        client.search("b")
+        mock_sleep.assert_called_once_with(1.0)
+
+    @patch("musicdb.client.time.sleep")
+    @patch("musicdb.client._session")
+    def test_429_waits_for_window_capped(self, mock_session, mock_sleep):
+        mock_session.get.return_value = _response(status_code=429)
+        client.search("a")
+        client.search("b")
+        self.assertEqual(mock_sleep.call_args.args[0], client.DEFAULT_MAX_THROTTLE_WAIT)
+
+    def test_used_header_alone_is_understood(self):
+        res = _response()
+        res.headers["X-Discogs-Ratelimit-Used"] = "59"
+        client._record_rate_limit(res)
+        self.assertGreater(client.throttle_delay(), 0)
+
+    @patch("musicdb.client._session")
+    def test_requests_use_timeout(self, mock_session):
+        mock_session.get.return_value = _response()
+        client.get_label(1)
+        self.assertEqual(mock_session.get.call_args.kwargs["timeout"], client.DEFAULT_TIMEOUT)
+
+
+class DiscogsResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch("musicdb.client._session")
+    def test_artist_lookup_cached(self, mock_session):
+        mock_session.get.return_value = _response()
+        client.get_artist(42)
+        cached = client.get_artist(42)
+        self.assertEqual(mock_session.get.call_count, 1)
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.json(), {"id": 1, "name": "Artist"})
+
+    @patch("musicdb.client._session")
+    def test_errors_not_cached(self, mock_session):
+        mock_session.get.return_value = _response(status_code=404, body=b"{}")
+        client.get_release(7)
+        client.get_release(7)
+        self.assertEqual(mock_session.get.call_count, 2)
+
+    @override_settings(DISCOGS_RESPONSE_CACHE_TTL=0)
+    @patch("musicdb.client._session")
+    def test_ttl_setting_respected(self, mock_session):
+        mock_session.get.return_value = _response()
+        client.get_master(3)
+        client.get_master(3)
+        self.assertEqual(mock_session.get.call_count, 2)
@@ -0,0 +1,145 @@
+"""Manual image overrides on album grids, artist members, list items and search results."""
+
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from musicdb.models import ArtistSpotifyImageLink, List, ListItem, ReleaseGroupImageLink
+from musicdb.services.image_overrides import ImageOverrideMap
+
+
+class ImageOverrideTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="covers", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        ReleaseGroupImageLink.objects.create(
+            user=self.user, musicbrainz_release_group_id="rg-1", image_url="https://img/rg-1.jpg"
+        )
+        ArtistSpotifyImageLink.objects.create(
+            user=self.user, musicbrainz_artist_id="ar-1", image_url="https://img/ar-1.jpg"
+        )
+        other = get_user_model().objects.create_user(username="other", password="testpass123")
+        ReleaseGroupImageLink.objects.create(
+            user=other, musicbrainz_release_group_id="rg-2", image_url="https://img/other.jpg"
+        )
+
+
+class ImageOverrideMapTests(ImageOverrideTestCase):
+    def test_ids_are_loaded_once_per_map(self):
+        overrides = ImageOverrideMap(self.user.id)
+        with CaptureQueriesContext(connection) as first:
+            images = overrides.album_images(["rg-1", "rg-2", "rg-3"])
+        self.assertEqual(images, {"rg-1": "https://img/rg-1.jpg"})
+        self.assertEqual(len(first), 1)
+        with CaptureQueriesContext(connection) as again:
+            self.assertEqual(overrides.album_images(["rg-1", "rg-2"]), {"rg-1": "https://img/rg-1.jpg"})
+        self.assertEqual(len(again), 0)
+
+    def test_apply_marks_only_overridden_rows(self):
+        rows = [{"id": "rg-1", "thumb": "caa"}, {"id": "rg-3", "thumb": "caa"}, {"id": None}]
+        ImageOverrideMap(self.user.id).apply_album_images(rows)
+        self.assertEqual(rows[0]["thumb"], "https://img/rg-1.jpg")
+        self.assertIs(rows[0]["manual_album_image"], True)
+        self.assertEqual(rows[1], {"id": "rg-3", "thumb": "caa"})
+        self.assertEqual(rows[2], {"id": None})
+
+    def test_for_request_reuses_the_map(self):
+        request = SimpleNamespace(user=self.user)
+        self.assertIs(ImageOverrideMap.for_request(request), ImageOverrideMap.for_request(request))
+
+
+class ImageOverrideEndpointTests(ImageOverrideTestCase):
+    def test_search_results_carry_manual_covers(self):
+        results = [
+            {"type": "album", "id": "rel-1", "title": "A", "release_group_id": "rg-1"},
+            {"type": "album", "id": "rel-2", "title": "B", "release_group_id": "rg-2"},
+        ]
+        with patch("musicdb.views.search_views.mb.search", return_value=(Mock(status_code=200), results)):
+            res = self.client.get("/api/search/", {"q": "a", "type": "album"})
+        body = res.json()["results"]
+        self.assertEqual(body[0]["thumb"], "https://img/rg-1.jpg")
+        self.assertIs(body[0]["manual_album_image"], True)
+        self.assertNotIn("thumb", body[1])
+
+    def test_artist_search_results_carry_manual_images(self):
+        results = [{"type": "artist", "id": "ar-1", "title": "X"}, {"type": "artist", "id": "ar-2", "title": "Y"}]
+        with patch("musicdb.views.search_views.mb.search", return_value=(Mock(status_code=200), results)):
+            res = self.client.get("/api/search/", {"q": "x", "type": "artist"})
+        body = res.json()["results"]
+        self.assertIs(body[0]["manual_spotify_artist_image"], True)
+        self.assertNotIn("manual_spotify_artist_image", body[1])
+
+    def test_artist_detail_albums_and_members_in_two_queries(self):
+        artist_res = Mock(status_code=200)
+        artist_res.json.return_value = {
+            "name": "The Band",
+            "id": "band-id",
+            "relations": [
+                {
+                    "type": "member of band",
+                    "direction": "backward",
+                    "artist": {"id": f"ar-{i}", "name": f"Member {i}"},
+                }
+                for i in range(1, 6)
+            ],
+        }
+        browse = Mock(status_code=200)
+        browse.json.return_value = {
+            "release-groups": [
+                {"id": f"rg-{i}", "title": f"Album {i}", "first-release-date": str(1990 + i)} for i in range(1, 11)
+            ]
+        }
+        with patch("musicdb.views.search_views.mb.get_artist", return_value=artist_res), patch(
+            "musicdb.views.search_views.mb.browse_release_groups_by_artist", return_value=browse
+        ), patch(
+            "musicdb.views.search_views.artist_image_url_for_musicbrainz_name", return_value=None
+        ), patch("musicdb.views.search_views.discogs_artist_image_url", return_value=None):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get("/api/search/detail/", {"type": "artist", "id": "band-id"})
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual(len(ctx), 2)
+        albums = {a["id"]: a for a in body["albums"]}
+        self.assertEqual(albums["rg-1"]["thumb"], "https://img/rg-1.jpg")
+        self.assertNotIn("thumb", albums["rg-2"])
+        members = {m["id"]: m for m in body["members"]}
+        self.assertIs(members["ar-1"]["manual_spotify_artist_image"], True)
+        self.assertNotIn("thumb", members["ar-2"])
+        self.assertIs(body["manual_spotify_artist_image"], False)
+
+    def test_artist_detail_manual_image_skips_fallbacks(self):
+        artist_res = Mock(status_code=200)
+        artist_res.json.return_value = {"name": "Solo", "id": "ar-1"}
+        with patch("musicdb.views.search_views.mb.get_artist", return_value=artist_res), patch(
+            "musicdb.views.search_views.mb.browse_release_groups_by_artist", return_value=Mock(status_code=404)
+        ), patch("musicdb.views.search_views.artist_image_url_for_musicbrainz_name") as spotify, patch(
+            "musicdb.views.search_views.discogs_artist_image_url"
+        ) as discogs:
+            res = self.client.get("/api/search/detail/", {"type": "artist", "id": "ar-1"})
+        self.assertEqual(res.json()["thumb"], "https://img/ar-1.jpg")
+        spotify.assert_not_called()
+        discogs.assert_not_called()
+
+    def test_list_detail_and_previews_carry_manual_images(self):
+        albums = List.objects.create(user=self.user, list_type=List.LIST_TYPE_RELEASE, name="Albums")
+        people = List.objects.create(user=self.user, list_type=List.LIST_TYPE_PERSON, name="People")
+        ListItem.objects.create(list=albums, type="album", discogs_id="rg-1")
+        ListItem.objects.create(list=albums, type="release", discogs_id="123")
+        ListItem.objects.create(list=people, type="artist", discogs_id="ar-1")
+
+        items = {i["id"]: i for i in self.client.get(f"/api/search/lists/{albums.id}/").json()["items"]}
+        self.assertIs(items["rg-1"]["manual_album_image"], True)
+        self.assertNotIn("thumb", items["123"])
+
+        res = self.client.get("/api/search/lists/", {"preview": "3"})
+        previews = {row["name"]: row["preview"] for row in res.json()["lists"]}
+        self.assertEqual(previews["People"][0]["thumb"], "https://img/ar-1.jpg")
+        self.assertEqual(previews["Albums"][0]["id"], "123")
+        self.assertNotIn("thumb", previews["Albums"][0])
+        self.assertEqual(previews["Albums"][1]["thumb"], "https://img/rg-1.jpg")
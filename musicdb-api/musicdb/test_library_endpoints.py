@@ -0,0 +1,302 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import ArtistSpotifyImageLink, ConsumedAlbum, LibraryChange, List, ListItem, ReleaseGroupImageLink
+from .services.library_changes import list_item_change, record_library_change
+from .services.library_state import get_library_state
+from .views.common import _encode_cursor
+
+
+class LibraryEndpointTestCase(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username="libraryuser",
+            email="libraryuser@example.com",
+            password="password123",
+        )
+        self.other_user = User.objects.create_user(
+            username="otherlibraryuser",
+            email="otherlibraryuser@example.com",
+            password="password123",
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+        self.list = List.objects.create(user=self.user, list_type=List.LIST_TYPE_RELEASE, name="Faves")
+
+
+class LibraryCheckTests(LibraryEndpointTestCase):
+    def _check(self, items):
+        return self.client.post("/api/search/library/check/", data={"items": items}, format="json")
+
+    def test_flags_consumed_and_list_membership(self):
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="1", title="A - B")
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="2", consumed=False)
+        ConsumedAlbum.objects.create(user=self.other_user, type="master", discogs_id="3")
+        ListItem.objects.create(list=self.list, type="master", discogs_id="3")
+        res = self._check([
+            {"type": "release", "id": "1"},
+            {"type": "release", "id": "2"},
+            {"type": "master", "id": "3"},
+            {"type": "master", "id": "1"},
+        ])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            res.json()["items"],
+            [
+                {"type": "release", "id": "1", "consumed": True, "list_ids": []},
+                {"type": "release", "id": "2", "consumed": False, "list_ids": []},
+                {"type": "master", "id": "3", "consumed": False, "list_ids": [self.list.id]},
+                {"type": "master", "id": "1", "consumed": False, "list_ids": []},
+            ],
+        )
+
+    def test_two_queries_for_a_full_page(self):
+        items = [{"type": "release", "id": str(i)} for i in range(300)]
+        with CaptureQueriesContext(connection) as queries:
+            res = self._check(items)
+        self.assertEqual(len(res.json()["items"]), 300)
+        data_queries = [q for q in queries if "musicdb_" in q["sql"]]
+        self.assertEqual(len(data_queries), 2)
+
+    def test_validation(self):
+        self.assertEqual(self._check([]).status_code, 400)
+        self.assertEqual(self._check([{"type": "vinyl", "id": "1"}]).status_code, 400)
+        too_many = [{"type": "release", "id": str(i)} for i in range(501)]
+        self.assertEqual(self._check(too_many).status_code, 400)
+
+
+class SearchAnnotationTests(LibraryEndpointTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.results = [
+            {"type": "album", "id": "rel-1", "title": "Artist - One", "release_group_id": "rg-1"},
+            {"type": "album", "id": "rel-2", "title": "artist  -  TWO", "release_group_id": "rg-2"},
+            {"type": "album", "id": "rel-3", "title": "Artist - Three", "release_group_id": None},
+            {"type": "artist", "id": "art-1", "title": "Artist"},
+        ]
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="rel-1", title="")
+        ConsumedAlbum.objects.create(user=self.user, type="master", discogs_id="999", title="Artist - Two")
+        ListItem.objects.create(list=self.list, type="album", discogs_id="rel-3")
+        ReleaseGroupImageLink.objects.create(user=self.user, musicbrainz_release_group_id="rg-2", image_url="x")
+        ArtistSpotifyImageLink.objects.create(user=self.user, musicbrainz_artist_id="art-1", image_url="y")
+
+    def _search(self, **params):
+        with patch("musicdb.views.search_views.mb.search") as mock_search:
+            mock_search.return_value = (Mock(status_code=200), [dict(r) for r in self.results])
+            return self.client.get("/api/search/", {"q": "artist", **params})
+
+    def test_annotate_flags(self):
+        res = self._search(annotate="1")
+        self.assertEqual(res.status_code, 200)
+        flags = [r["library"] for r in res.json()["results"]]
+        self.assertEqual(
+            flags,
+            [
+                {"consumed": True, "in_list": False, "manual_cover": False},
+                {"consumed": True, "in_list": False, "manual_cover": True},
+                {"consumed": False, "in_list": True, "manual_cover": False},
+                {"consumed": False, "in_list": False, "manual_cover": True},
+            ],
+        )
+
+    def test_not_annotated_by_default(self):
+        self.assertNotIn("library", self._search().json()["results"][0])
+
+    def test_state_is_cached_and_invalidated_on_writes(self):
+        self._search(annotate="1")
+        with CaptureQueriesContext(connection) as queries:
+            self._search(annotate="1")
+        # Only the per-response manual cover lookup; the library state comes from cache.
+        library_queries = [q["sql"] for q in queries if "musicdb_" in q["sql"]]
+        self.assertEqual(len(library_queries), 1)
+        self.assertIn("musicdb_releasegroupimagelink", library_queries[0])
+
+        self.client.post(
+            "/api/search/consumed/?type=release&id=rel-3", data={"consumed": True}, format="json"
+        )
+        self.assertTrue(self._search(annotate="1").json()["results"][2]["library"]["consumed"])
+
+    def test_state_cached_before_commit_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = ListItem.objects.create(list=self.list, type="album", discogs_id="rel-2")
+            record_library_change(list_item_change(self.user.id, item))
+            # A concurrent search caches the state before the write commits.
+            get_library_state(self.user.id)
+            self.assertIsNotNone(cache.get(f"musicdb:library_state:{self.user.id}"))
+        self.assertIsNone(cache.get(f"musicdb:library_state:{self.user.id}"))
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, LIBRARY_SYNC_SETTLE_SECONDS=0)
+class LibrarySyncTests(LibraryEndpointTestCase):
+    def _sync(self, since=None, **params):
+        if since is not None:
+            params["since"] = since
+        return self.client.get("/api/sync/", params)
+
+    def test_without_since_returns_reset_cursor(self):
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="1")
+        body = self._sync().json()
+        self.assertTrue(body["reset"])
+        self.assertEqual(body["changes"], [])
+        self.assertEqual(self._sync(body["cursor"]).json()["changes"], [])
+
+    @patch("musicdb.views.common.get_release", return_value=Mock(status_code=404))
+    def test_returns_only_changes_since_cursor(self, _mock_get_release):
+        cursor = self._sync().json()["cursor"]
+        self.client.post("/api/search/consumed/?type=release&id=5", {"title": "A - B"}, format="json")
+        self.client.post(
+            "/api/search/lists/items/",
+            {"type": "release", "id": "5", "title": "A - B", "list_ids": [self.list.id]},
+            format="json",
+        )
+        self.client.post(
+            "/api/search/especially-liked-track/",
+            {"item_type": "release", "item_id": "5", "track_title": "Song", "especially_liked": True},
+            format="json",
+        )
+        body = self._sync(cursor).json()
+        self.assertFalse(body["reset"])
+        self.assertFalse(body["has_more"])
+        self.assertEqual(
+            [(c["kind"], c["key"], c["op"]) for c in body["changes"]],
+            [
+                ("consumed", "release:5", "upsert"),
+                ("list_item", f"{self.list.id}:release:5", "upsert"),
+                ("especially_liked", "release:5::Song", "upsert"),
+            ],
+        )
+        self.assertEqual(body["changes"][0]["data"], {"type": "release", "id": "5", "title": "A - B"})
+        self.assertEqual(self._sync(body["cursor"]).json()["changes"], [])
+
+    def test_collapses_to_latest_change_per_entity(self):
+        cursor = self._sync().json()["cursor"]
+        self.client.post("/api/search/consumed/?type=release&id=5", {"consumed": True}, format="json")
+        self.client.post("/api/search/consumed/?type=release&id=5", {"consumed": False}, format="json")
+        changes = self._sync(cursor).json()["changes"]
+        self.assertEqual(changes, [{"kind": "consumed", "key": "release:5", "op": "delete", "data": None}])
+
+    def test_deletes_and_other_users(self):
+        ArtistSpotifyImageLink.objects.create(user=self.user, musicbrainz_artist_id="mb-1", image_url="u")
+        ConsumedAlbum.objects.create(user=self.other_user, type="release", discogs_id="1")
+        cursor = self._sync().json()["cursor"]
+        self.client.delete("/api/search/manual-spotify-artist-image/?musicbrainz_artist_id=mb-1")
+        self.client.delete("/api/search/manual-spotify-artist-image/?musicbrainz_artist_id=missing")
+        other = APIClient()
+        other.force_authenticate(self.other_user)
+        other.post("/api/search/consumed/?type=release&id=1", {"consumed": False}, format="json")
+        changes = self._sync(cursor).json()["changes"]
+        self.assertEqual([(c["kind"], c["key"], c["op"]) for c in changes], [("artist_image", "mb-1", "delete")])
+
+    def test_pages_with_limit(self):
+        cursor = self._sync().json()["cursor"]
+        for name in ("One", "Two", "Three"):
+            self.client.post("/api/search/lists/", {"name": name, "list_type": "release"}, format="json")
+        first = self._sync(cursor, limit=2).json()
+        self.assertTrue(first["has_more"])
+        self.assertEqual([c["data"]["name"] for c in first["changes"]], ["One", "Two"])
+        second = self._sync(first["cursor"], limit=2).json()
+        self.assertFalse(second["has_more"])
+        self.assertEqual([c["data"]["name"] for c in second["changes"]], ["Three"])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self._sync("not-a-cursor").status_code, 400)
+        self.assertEqual(self._sync(_encode_cursor([0])).status_code, 400)
+
+    def test_unsettled_changes_wait_for_the_settle_window(self):
+        cursor = self._sync().json()["cursor"]
+        with override_settings(LIBRARY_SYNC_SETTLE_SECONDS=60):
+            self.client.post("/api/search/lists/", {"name": "New", "list_type": "release"}, format="json")
+            body = self._sync(cursor).json()
+            self.assertEqual(body["changes"], [])
+            # A lower id may still commit, so the cursor must not move past the fresh change.
+            self.assertEqual(self._sync(body["cursor"]).json()["changes"], [])
+            LibraryChange.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+            changes = self._sync(body["cursor"]).json()["changes"]
+        self.assertEqual([c["data"]["name"] for c in changes], ["New"])
+
+    @override_settings(LIBRARY_CHANGE_RETENTION_DAYS=30)
+    def test_cursor_older_than_retention_gets_a_reset(self):
+        old = timezone.now() - timedelta(days=31)
+        body = self._sync(_encode_cursor([0, int(old.timestamp())])).json()
+        self.assertTrue(body["reset"])
+        self.assertEqual(body["changes"], [])
+        self.assertIn("expired", body["detail"])
+        self.assertFalse(self._sync(body["cursor"]).json()["reset"])
+
+
+@override_settings(LIBRARY_CHANGE_RETENTION_DAYS=30)
+class PruneLibraryChangesTests(LibraryEndpointTestCase):
+    def test_deletes_changes_past_retention(self):
+        self.client.post("/api/search/lists/", {"name": "Old", "list_type": "release"}, format="json")
+        LibraryChange.objects.update(created_at=timezone.now() - timedelta(days=31))
+        self.client.post("/api/search/lists/", {"name": "New", "list_type": "release"}, format="json")
+        out = StringIO()
+        call_command("prune_library_changes", stdout=out)
+        self.assertIn("Deleted 1 library changes", out.getvalue())
+        self.assertEqual([c.data["name"] for c in LibraryChange.objects.all()], ["New"])
+
+    def test_keeps_each_users_newest_change(self):
+        for name in ("One", "Two"):
+            self.client.post("/api/search/lists/", {"name": name, "list_type": "release"}, format="json")
+        LibraryChange.objects.update(created_at=timezone.now() - timedelta(days=31))
+        etag = self.client.get("/api/library/snapshot/")["ETag"]
+        call_command("prune_library_changes", stdout=StringIO())
+        self.assertEqual([c.data["name"] for c in LibraryChange.objects.all()], ["Two"])
+        self.assertEqual(self.client.get("/api/library/snapshot/")["ETag"], etag)
+
+
+class LibrarySnapshotTests(LibraryEndpointTestCase):
+    URL = "/api/library/snapshot/"
+
+    def test_columnar_payload(self):
+        ListItem.objects.create(list=self.list, type="release", discogs_id="10", title="A - B")
+        ConsumedAlbum.objects.create(user=self.user, type="master", discogs_id="20")
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="007", consumed=True)
+        ConsumedAlbum.objects.create(user=self.user, type="release", discogs_id="30", consumed=False)
+        ConsumedAlbum.objects.create(user=self.other_user, type="release", discogs_id="40")
+        ReleaseGroupImageLink.objects.create(user=self.user, musicbrainz_release_group_id="rg-1", image_url="u")
+
+        body = self.client.get(self.URL).json()
+        self.assertEqual(body["lists"], {"id": [self.list.id], "list_type": ["release"], "name": ["Faves"]})
+        types = body["types"]
+        self.assertEqual(body["list_items"]["id"], [10])
+        self.assertEqual([types[t] for t in body["consumed"]["type"]], ["master", "release"])
+        self.assertEqual(body["consumed"]["id"], [20, "007"])
+        self.assertEqual(body["album_images"], ["rg-1"])
+        self.assertEqual(body["artist_images"], [])
+        self.assertEqual(body["especially_liked"]["track_title"], [])
+
+    def test_etag_returns_304_until_library_changes(self):
+        first = self.client.get(self.URL)
+        etag = first["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)  # library version; the JWT user is cached
+
+        self.client.post("/api/search/lists/", {"name": "New", "list_type": "release"}, format="json")
+        changed = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(changed.json()["lists"]["name"], ["Faves", "New"])
+
+    @override_settings(LIBRARY_SYNC_SETTLE_SECONDS=0)
+    def test_cursor_continues_with_sync(self):
+        cursor = self.client.get(self.URL).json()["cursor"]
+        self.client.post("/api/search/lists/", {"name": "New", "list_type": "release"}, format="json")
+        changes = self.client.get("/api/sync/", {"since": cursor}).json()["changes"]
+        self.assertEqual([c["data"]["name"] for c in changes], ["New"])
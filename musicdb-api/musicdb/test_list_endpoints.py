@@ -1,9 +1,13 @@
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import List, ListItem
+from .models import LibraryChange, List, ListItem
 
 
 class ListEndpointsTests(TestCase):
@@ -136,3 +140,233 @@ class ListEndpointsTests(TestCase):
             format="json",
         )
         self.assertEqual(res.status_code, 400)
+
+
+class ListItemsBulkTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username="bulklistuser",
+            email="bulklistuser@example.com",
+            password="password123",
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+        self.lists = [
+            List.objects.create(user=self.user, list_type=List.LIST_TYPE_RELEASE, name=f"L{i}")
+            for i in range(3)
+        ]
+
+    def _post(self, items, mode="set"):
+        return self.client.post(
+            "/api/search/lists/items/bulk/", data={"mode": mode, "items": items}, format="json"
+        )
+
+    def _memberships(self):
+        return set(ListItem.objects.values_list("list_id", "type", "discogs_id"))
+
+    def test_set_mode_adds_and_removes(self):
+        l0, l1, l2 = self.lists
+        ListItem.objects.create(list=l0, type="release", discogs_id="1", title="")
+        ListItem.objects.create(list=l2, type="release", discogs_id="1", title="Old")
+        res = self._post([
+            {"type": "release", "id": "1", "title": "A - One", "list_ids": [l0.id, l1.id]},
+            {"type": "master", "id": "2", "title": "B - Two", "list_ids": [l2.id]},
+        ])
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual(len(body["added"]), 2)
+        self.assertEqual(body["removed"], [{"list_id": l2.id, "type": "release", "id": "1"}])
+        self.assertEqual(body["retitled"], 1)
+        self.assertEqual(
+            self._memberships(),
+            {(l0.id, "release", "1"), (l1.id, "release", "1"), (l2.id, "master", "2")},
+        )
+        self.assertEqual(ListItem.objects.get(list=l0).title, "A - One")
+
+    def test_add_mode_keeps_existing_memberships(self):
+        l0, l1, _ = self.lists
+        ListItem.objects.create(list=l0, type="release", discogs_id="1", title="T")
+        res = self._post([{"type": "release", "id": "1", "list_ids": [l1.id]}], mode="add")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self._memberships(), {(l0.id, "release", "1"), (l1.id, "release", "1")})
+
+    def test_rows_inserted_concurrently_are_not_reported_as_added(self):
+        l0, l1, _ = self.lists
+        bulk_create = ListItem.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # Another request adds the item to l0 between our read and our insert.
+            ListItem.objects.create(list=l0, type="release", discogs_id="1", title="Theirs")
+            return bulk_create(objs, **kwargs)
+
+        with patch.object(ListItem.objects, "bulk_create", side_effect=racing_bulk_create):
+            res = self._post([{"type": "release", "id": "1", "title": "Ours", "list_ids": [l0.id, l1.id]}])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["added"], [{"list_id": l1.id, "type": "release", "id": "1"}])
+        self.assertEqual(
+            list(LibraryChange.objects.filter(kind="list_item").values_list("key", flat=True)),
+            [f"{l1.id}:release:1"],
+        )
+
+    def test_title_longer_than_the_column_is_rejected(self):
+        res = self._post([{"type": "release", "id": "1", "title": "x" * 513, "list_ids": [self.lists[0].id]}])
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(ListItem.objects.exists())
+
+    def test_invalid_list_ids_write_nothing(self):
+        other = get_user_model().objects.create_user(username="o", email="o@example.com", password="pw")
+        foreign = List.objects.create(user=other, list_type=List.LIST_TYPE_RELEASE, name="F")
+        res = self._post([
+            {"type": "release", "id": "1", "list_ids": [self.lists[0].id]},
+            {"type": "release", "id": "2", "list_ids": [foreign.id]},
+        ])
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(ListItem.objects.exists())
+
+    def test_query_count_is_constant(self):
+        """Insert, delete and retitle each stay one query however many items are sent."""
+        l0, l1, l2 = self.lists
+
+        def scenario(ids):
+            for i in ids:
+                ListItem.objects.create(list=l0, type="release", discogs_id=str(i), title="")
+                ListItem.objects.create(list=l2, type="release", discogs_id=str(i), title="")
+            items = [
+                {"type": "release", "id": str(i), "title": f"T{i}", "list_ids": [l0.id, l1.id]}
+                for i in ids
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                res = self._post(items)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(len(res.json()["added"]), len(ids))
+            self.assertEqual(len(res.json()["removed"]), len(ids))
+            self.assertEqual(res.json()["retitled"], len(ids))
+            return len(queries)
+
+        self.client.get("/api/search/lists/")  # resolve the JWT user once, so both runs use the auth cache
+        self.assertEqual(scenario(range(2)), scenario(range(100, 300)))
+
+
+class ListDetailPaginationTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username="pagelistuser",
+            email="pagelistuser@example.com",
+            password="password123",
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+        self.list = List.objects.create(user=self.user, list_type=List.LIST_TYPE_RELEASE, name="Big")
+        ListItem.objects.bulk_create(
+            [ListItem(list=self.list, type="release", discogs_id=str(i), title=f"T{i}") for i in range(25)]
+        )
+        # Several items share one added_at so the id tiebreak is exercised.
+        ListItem.objects.filter(discogs_id__in=["3", "4", "5", "6"]).update(
+            added_at=ListItem.objects.get(discogs_id="3").added_at
+        )
+        self.url = f"/api/search/lists/{self.list.id}/"
+        self.expected = [
+            row[0]
+            for row in ListItem.objects.filter(list=self.list)
+            .order_by("-added_at", "-id")
+            .values_list("discogs_id")
+        ]
+
+    def test_cursor_walks_every_item_once_in_order(self):
+        seen = []
+        res = self.client.get(self.url, {"limit": 7})
+        while True:
+            self.assertEqual(res.status_code, 200)
+            body = res.json()
+            self.assertLessEqual(len(body["items"]), 7)
+            self.assertNotIn("total", body)
+            seen.extend(item["id"] for item in body["items"])
+            if not body["next_cursor"]:
+                break
+            res = self.client.get(self.url, {"limit": 7, "cursor": body["next_cursor"]})
+        self.assertEqual(seen, self.expected)
+
+    def test_total_only_on_request(self):
+        body = self.client.get(self.url, {"limit": 5, "include_total": "1"}).json()
+        self.assertEqual(body["total"], 25)
+        self.assertEqual(len(body["items"]), 5)
+
+    def test_page_query_count_does_not_depend_on_depth(self):
+        first = self.client.get(self.url, {"limit": 5}).json()
+        with CaptureQueriesContext(connection) as shallow:
+            self.client.get(self.url, {"limit": 5, "cursor": first["next_cursor"]})
+        cursor = first["next_cursor"]
+        for _ in range(3):
+            cursor = self.client.get(self.url, {"limit": 5, "cursor": cursor}).json()["next_cursor"]
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(self.url, {"limit": 5, "cursor": cursor})
+        self.assertEqual(len(shallow), len(deep))
+        self.assertNotIn("OFFSET", deep.captured_queries[-1]["sql"].upper())
+
+    def test_invalid_cursor_returns_400(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "garbage"}).status_code, 400)
+
+    def test_unpaginated_returns_everything(self):
+        body = self.client.get(self.url).json()
+        self.assertEqual([item["id"] for item in body["items"]], self.expected)
+        self.assertNotIn("next_cursor", body)
+
+
+class ListsOverviewTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username="overviewuser",
+            email="overviewuser@example.com",
+            password="password123",
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+
+    def _make_lists(self, count, items_per_list=3):
+        start = List.objects.filter(user=self.user).count()
+        for n in range(start, start + count):
+            lst = List.objects.create(user=self.user, list_type=List.LIST_TYPE_RELEASE, name=f"L{n}")
+            ListItem.objects.bulk_create(
+                [ListItem(list=lst, type="release", discogs_id=f"{n}-{i}") for i in range(items_per_list)]
+            )
+
+    def test_stats_and_preview(self):
+        self._make_lists(2, items_per_list=5)
+        List.objects.create(user=self.user, list_type=List.LIST_TYPE_RELEASE, name="Empty")
+        res = self.client.get("/api/search/lists/", {"stats": "1", "preview": "2"})
+        self.assertEqual(res.status_code, 200)
+        by_name = {row["name"]: row for row in res.json()["lists"]}
+        self.assertEqual(by_name["Empty"]["item_count"], 0)
+        self.assertIsNone(by_name["Empty"]["last_added_at"])
+        self.assertEqual(by_name["Empty"]["preview"], [])
+        self.assertEqual(by_name["L0"]["item_count"], 5)
+        expected = [
+            {"type": "release", "id": item_id}
+            for item_id in ListItem.objects.filter(list__name="L0")
+            .order_by("-added_at", "-id")
+            .values_list("discogs_id", flat=True)[:2]
+        ]
+        self.assertEqual(by_name["L0"]["preview"], expected)
+
+    def test_plain_listing_unchanged(self):
+        self._make_lists(1)
+        row = self.client.get("/api/search/lists/").json()["lists"][0]
+        self.assertNotIn("item_count", row)
+        self.assertNotIn("preview", row)
+
+    def test_query_count_does_not_grow_with_lists(self):
+        self._make_lists(1)
+        self.client.get("/api/search/lists/")  # resolve the JWT user once, so both runs use the auth cache
+        with CaptureQueriesContext(connection) as one:
+            self.client.get("/api/search/lists/", {"stats": "1", "preview": "4"})
+        self._make_lists(49)
+        with CaptureQueriesContext(connection) as fifty:
+            res = self.client.get("/api/search/lists/", {"stats": "1", "preview": "4"})
+        self.assertEqual(len(res.json()["lists"]), 50)
+        self.assertEqual(len(one), len(fifty))
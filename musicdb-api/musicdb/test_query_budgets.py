@@ -0,0 +1,222 @@
+"""
+Query and upstream-call budgets for the API endpoints.
+
+Every endpoint runs against one user per library size in SIZES (1, 100 and 10,000 rows of
+each kind) and must stay within a fixed number of DB queries and upstream HTTP calls, the same
+number at every size: a count that grows with the data is an N+1 regression. Upstream HTTP is
+faked at the requests.Session level, so every client (MusicBrainz, Discogs, Spotify) is counted.
+"""
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .models import (
+    ArtistSpotifyImageLink,
+    ConsumedAlbum,
+    ConsumedBackfillJob,
+    LibraryChange,
+    List,
+    ListItem,
+    ReleaseGroupImageLink,
+    TrackEspeciallyLiked,
+    TrackSpotifyLink,
+)
+from .services.consumed_backfill import BACKFILL_CHUNK_SIZE, run_backfill
+from .views.common import _encode_cursor
+
+SIZES = (1, 100, 10_000)
+PAGE = 100  # items per bulk request (a search results page)
+
+
+def _library_fixture(size):
+    """A user with `size` rows of every library kind; list "0" holds the list items."""
+    user = get_user_model().objects.create_user(
+        username=f"budget{size}", email=f"budget{size}@example.com", password="pw"
+    )
+    lists = [List.objects.create(user=user, list_type=List.LIST_TYPE_RELEASE, name=f"L{i}") for i in range(3)]
+    ids = [str(i) for i in range(1, size + 1)]
+    ConsumedAlbum.objects.bulk_create(
+        [ConsumedAlbum(user=user, type="release", discogs_id=i, title=f"Artist - Album {i}") for i in ids]
+    )
+    ListItem.objects.bulk_create([ListItem(list=lists[0], type="release", discogs_id=i, title=i) for i in ids])
+    TrackEspeciallyLiked.objects.bulk_create(
+        [TrackEspeciallyLiked(user=user, item_type="release", item_id="1", track_title=f"T{i}") for i in ids]
+    )
+    TrackSpotifyLink.objects.bulk_create(
+        [TrackSpotifyLink(user=user, release_id="r-1", track_title=f"T{i}", spotify_track_id=f"s{i}") for i in ids]
+    )
+    ArtistSpotifyImageLink.objects.bulk_create(
+        [ArtistSpotifyImageLink(user=user, musicbrainz_artist_id=f"mb-{i}", image_url="u") for i in ids]
+    )
+    ReleaseGroupImageLink.objects.bulk_create(
+        [ReleaseGroupImageLink(user=user, musicbrainz_release_group_id=f"rg-{i}", image_url="u") for i in ids]
+    )
+    LibraryChange.objects.bulk_create(
+        [LibraryChange(user=user, kind="consumed", key=f"release:{i}", data={}) for i in ids]
+    )
+    return SimpleNamespace(user=user, lists=lists, size=size)
+
+
+def _upstream_response(method, url, params=None, **kwargs):
+    """Plausible MusicBrainz payloads for searches and release lookups; 404 for anything else."""
+    if "musicbrainz.org" in url and (params or {}).get("query"):
+        body = {"releases": [{"id": f"rel-{i}", "title": f"Album {i}", "artist-credit": []} for i in range(PAGE)]}
+    elif "musicbrainz.org" in url and "/release/" in url:
+        body = {"id": "rel-1", "title": "Album", "artist-credit": [], "release-group": {"id": "rg-1"}, "media": []}
+    else:
+        return Mock(status_code=404, headers={}, content=b"{}", json=lambda: {})
+    return Mock(status_code=200, headers={}, content=b"", json=lambda: body)
+
+
+class QueryBudgetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = [_library_fixture(size) for size in SIZES]
+
+    def assertBudget(self, call, queries, upstream=0):
+        """
+        Run call(client, fixture) once per size; each run must succeed within `queries` DB
+        queries and `upstream` HTTP calls, and use the same number of each at every size.
+        """
+        counts = {}
+        for fixture in self.fixtures:
+            cache.clear()
+            client = APIClient()
+            client.force_authenticate(fixture.user)
+            with patch("requests.sessions.Session.request", side_effect=_upstream_response) as http:
+                with CaptureQueriesContext(connection) as ctx:
+                    res = call(client, fixture)
+            self.assertLess(res.status_code, 300, f"size {fixture.size}: {res.status_code}")
+            counts[fixture.size] = (len(ctx.captured_queries), http.call_count)
+        self.assertLessEqual(max(q for q, _ in counts.values()), queries, f"DB queries by size: {counts}")
+        self.assertLessEqual(max(u for _, u in counts.values()), upstream, f"upstream calls by size: {counts}")
+        self.assertEqual(len(set(counts.values())), 1, f"(queries, upstream calls) grow with size: {counts}")
+
+
+class ConsumedBudgetTests(QueryBudgetTestCase):
+    def test_consumed_flag(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/consumed/", {"type": "release", "id": "1"}), 1)
+
+    def test_mark_consumed(self):
+        self.assertBudget(
+            lambda c, f: c.post("/api/search/consumed/?type=release&id=1", {"consumed": True}, format="json"),
+            2,  # upsert + change log
+        )
+
+    def test_consumed_list(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/consumed-list/"), 1)
+
+    def test_consumed_titles(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/consumed-titles/"), 1)
+
+    def test_backfill_status_and_start(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/consumed-backfill/"), 1)
+        self.assertBudget(lambda c, f: c.post("/api/search/consumed-backfill/"), 9)
+
+
+class ListBudgetTests(QueryBudgetTestCase):
+    def test_lists_index_with_stats_and_previews(self):
+        # lists + previews window query + the previews' manual covers.
+        self.assertBudget(lambda c, f: c.get("/api/search/lists/", {"stats": "1", "preview": "5"}), 3)
+
+    def test_list_detail_page(self):
+        self.assertBudget(
+            lambda c, f: c.get(f"/api/search/lists/{f.lists[0].id}/", {"limit": "50", "include_total": "1"}), 4
+        )
+
+    def test_list_items_write(self):
+        self.assertBudget(
+            lambda c, f: c.post(
+                "/api/search/lists/items/",
+                {"type": "release", "id": "1", "title": "t", "list_ids": [lst.id for lst in f.lists[1:]]},
+                format="json",
+            ),
+            9,
+        )
+
+    def test_list_items_bulk_write(self):
+        def call(client, fixture):
+            entries = [
+                {"type": "release", "id": str(i), "list_ids": [fixture.lists[1].id]} for i in range(1, PAGE + 1)
+            ]
+            return client.post("/api/search/lists/items/bulk/", {"mode": "add", "items": entries}, format="json")
+
+        self.assertBudget(call, 7)
+
+    def test_list_membership_check(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/lists/items/check/", {"type": "release", "id": "1"}), 1)
+
+
+class LibraryBudgetTests(QueryBudgetTestCase):
+    def test_library_check_page(self):
+        items = [{"type": "release", "id": str(i)} for i in range(1, PAGE + 1)]
+        self.assertBudget(lambda c, f: c.post("/api/search/library/check/", {"items": items}, format="json"), 2)
+
+    def test_snapshot(self):
+        self.assertBudget(lambda c, f: c.get("/api/library/snapshot/"), 9)
+
+    def test_sync_page(self):
+        self.assertBudget(lambda c, f: c.get("/api/sync/", {"since": _encode_cursor([0, int(time.time())])}), 1)
+
+    def test_especially_liked_tracks(self):
+        self.assertBudget(
+            lambda c, f: c.get("/api/search/especially-liked-tracks/", {"item_type": "release", "item_id": "1"}), 1
+        )
+
+    def test_especially_liked_batch(self):
+        item_ids = ",".join(str(i) for i in range(1, PAGE + 1))
+        self.assertBudget(
+            lambda c, f: c.get(
+                "/api/search/especially-liked-tracks/batch/", {"item_type": "release", "item_ids": item_ids}
+            ),
+            1,
+        )
+
+    def test_manual_matches(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/manual-spotify-matches/", {"release_id": "r-1"}), 1)
+
+    def test_manual_matches_batch(self):
+        release_ids = ",".join(f"r-{i}" for i in range(1, 201))
+        self.assertBudget(
+            lambda c, f: c.get("/api/search/manual-spotify-matches/batch/", {"release_ids": release_ids}), 1
+        )
+
+    def test_manual_images(self):
+        self.assertBudget(
+            lambda c, f: c.get("/api/search/manual-spotify-artist-image/", {"musicbrainz_artist_id": "mb-1"}), 1
+        )
+        self.assertBudget(
+            lambda c, f: c.get("/api/search/manual-album-image/", {"musicbrainz_release_group_id": "rg-1"}), 1
+        )
+
+
+class UpstreamBudgetTests(QueryBudgetTestCase):
+    def test_annotated_search(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/", {"q": "album", "annotate": "1"}), 5, upstream=1)
+
+    def test_album_detail(self):
+        self.assertBudget(lambda c, f: c.get("/api/search/detail/", {"type": "album", "id": "rel-1"}), 1, upstream=2)
+
+
+class BackfillBudgetTests(QueryBudgetTestCase):
+    """The backfill is a batch job: its cost is budgeted per chunk of rows, not per request."""
+
+    @patch("musicdb.views.common.get_release", return_value=Mock(status_code=404))
+    def test_queries_per_chunk(self, mock_get_release):
+        for fixture in self.fixtures:
+            job = ConsumedBackfillJob.objects.create(user=fixture.user, status=ConsumedBackfillJob.STATUS_RUNNING)
+            mock_get_release.reset_mock()
+            with CaptureQueriesContext(connection) as ctx:
+                run_backfill(job.pk)
+            chunks = -(-fixture.size // BACKFILL_CHUNK_SIZE)
+            # job read, final (empty) chunk read, done save + per chunk: read rows, save checkpoint.
+            self.assertLessEqual(len(ctx.captured_queries), 3 + 2 * chunks, f"size {fixture.size}")
+            # Fixture titles are already complete, so no row needs a catalog lookup.
+            self.assertEqual(mock_get_release.call_count, 0)
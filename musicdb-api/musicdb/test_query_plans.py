@@ -0,0 +1,114 @@
+"""
+EXPLAIN-based checks that the hot endpoint queries are served by an index on SQLite and
+PostgreSQL. Tables here are tiny, so on PostgreSQL sequential scans are disabled for the
+test transaction; a plan that still has a Seq Scan has no usable index. The regular CI job runs
+on SQLite; the backend-postgres job runs this module against PostgreSQL.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from .models import (
+    ArtistSpotifyImageLink,
+    ConsumedAlbum,
+    LibraryChange,
+    List,
+    ListItem,
+    ReleaseGroupImageLink,
+    TrackEspeciallyLiked,
+    TrackSpotifyLink,
+)
+
+# SQLite reports an unindexed table read as a bare "SCAN <table>" line (no USING ... INDEX).
+_SQLITE_FULL_SCAN = re.compile(r"\bSCAN (\w+)$", re.MULTILINE)
+
+
+class SqliteFullScanPatternTests(SimpleTestCase):
+    def test_bare_scan_is_a_full_scan(self):
+        plan = "2 0 0 SEARCH musicdb_list USING INDEX list_user_idx (user_id=?)\n5 0 0 SCAN musicdb_listitem"
+        self.assertEqual(_SQLITE_FULL_SCAN.findall(plan), ["musicdb_listitem"])
+
+    def test_scan_using_an_index_is_not(self):
+        plan = "3 0 0 SCAN musicdb_listitem USING INDEX listitem_list_added_idx"
+        self.assertEqual(_SQLITE_FULL_SCAN.findall(plan), [])
+
+
+class HotQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="planuser", email="plan@example.com", password="pw")
+        cls.list = List.objects.create(user=cls.user, list_type=List.LIST_TYPE_RELEASE, name="Faves")
+        ListItem.objects.create(list=cls.list, type="release", discogs_id="1")
+        ConsumedAlbum.objects.create(user=cls.user, type="release", discogs_id="1")
+
+    def setUp(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest("EXPLAIN checks cover SQLite and PostgreSQL")
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == "sqlite":
+            scans = _SQLITE_FULL_SCAN.findall(plan)
+            self.assertEqual(scans, [], f"Full table scan in plan:\n{plan}")
+        else:
+            self.assertNotIn("Seq Scan", plan, f"Sequential scan in plan:\n{plan}")
+
+    def test_consumed_list_newest_first(self):
+        self.assertUsesIndex(
+            ConsumedAlbum.objects.filter(user=self.user, consumed=True).order_by("-id").values("type", "discogs_id")
+        )
+
+    def test_consumed_point_lookup(self):
+        self.assertUsesIndex(ConsumedAlbum.objects.filter(user=self.user, type="release", discogs_id="1"))
+
+    def test_list_membership_check(self):
+        self.assertUsesIndex(
+            ListItem.objects.filter(list__user=self.user, type="release", discogs_id="1").values_list("list_id")
+        )
+
+    def test_bulk_library_check(self):
+        self.assertUsesIndex(
+            ListItem.objects.filter(
+                list__user=self.user, type__in=["release", "master"], discogs_id__in=["1", "2", "3"]
+            ).values_list("list_id", "type", "discogs_id")
+        )
+
+    def test_lists_index(self):
+        self.assertUsesIndex(List.objects.filter(user=self.user).order_by("-updated_at"))
+
+    def test_list_detail_page(self):
+        self.assertUsesIndex(ListItem.objects.filter(list=self.list).order_by("-added_at", "-id")[:20])
+
+    def test_especially_liked_for_item(self):
+        self.assertUsesIndex(TrackEspeciallyLiked.objects.filter(user=self.user, item_type="release", item_id="1"))
+
+    def test_manual_matches_for_release(self):
+        self.assertUsesIndex(TrackSpotifyLink.objects.filter(user=self.user, release_id="r-1"))
+
+    def test_manual_matches_for_many_releases(self):
+        self.assertUsesIndex(
+            TrackSpotifyLink.objects.filter(user=self.user, release_id__in=["r-1", "r-2"]).order_by(
+                "release_id", "track_title"
+            )
+        )
+
+    def test_manual_album_image(self):
+        self.assertUsesIndex(
+            ReleaseGroupImageLink.objects.filter(user=self.user, musicbrainz_release_group_id="rg-1")
+        )
+
+    def test_manual_artist_image(self):
+        self.assertUsesIndex(ArtistSpotifyImageLink.objects.filter(user=self.user, musicbrainz_artist_id="mb-1"))
+
+    def test_sync_feed(self):
+        self.assertUsesIndex(LibraryChange.objects.filter(user=self.user, id__gt=0).order_by("id")[:500])
+
+    def test_no_default_ordering(self):
+        for model in (ConsumedAlbum, List, ListItem, TrackSpotifyLink, TrackEspeciallyLiked, ReleaseGroupImageLink):
+            with self.subTest(model=model.__name__):
+                self.assertNotIn("ORDER BY", str(model.objects.filter(pk=1).query))
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -122,3 +124,71 @@ class EspeciallyLikedEndpointsTests(TestCase):
         )
         self.assertEqual(res.status_code, 400)
 
+
+
+class EspeciallyLikedBatchEndpointsTests(TestCase):
+    URL = "/api/search/especially-liked-tracks/batch/"
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="batchuser", email="batch@example.com", password="pw")
+        self.other_user = User.objects.create_user(username="batchother", email="other@example.com", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _like(self, item_id, title, position="", user=None):
+        return TrackEspeciallyLiked.objects.create(
+            user=user or self.user, item_type="release", item_id=item_id, track_title=title, track_position=position
+        )
+
+    def test_get_groups_tracks_by_item_in_one_query(self):
+        self._like("a", "Two", "2")
+        self._like("a", "One", "1")
+        self._like("b", "Solo")
+        self._like("c", "Theirs", user=self.other_user)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.URL, {"item_type": "release", "item_ids": "a,b,c,a"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(
+            res.json()["items"],
+            {
+                "a": [{"track_title": "One", "track_position": "1"}, {"track_title": "Two", "track_position": "2"}],
+                "b": [{"track_title": "Solo", "track_position": ""}],
+                "c": [],
+            },
+        )
+
+    def test_get_validation(self):
+        self.assertEqual(self.client.get(self.URL, {"item_type": "release"}).status_code, 400)
+        self.assertEqual(self.client.get(self.URL, {"item_type": "vinyl", "item_ids": "a"}).status_code, 400)
+        too_many = ",".join(str(i) for i in range(201))
+        self.assertEqual(self.client.get(self.URL, {"item_type": "release", "item_ids": too_many}).status_code, 400)
+
+    def test_post_likes_and_unlikes_many_tracks(self):
+        self._like("a", "Old")
+        tracks = [
+            {"item_type": "release", "item_id": "a", "track_title": "Old", "especially_liked": False},
+            {"item_type": "release", "item_id": "a", "track_title": "New", "especially_liked": True},
+            {"item_type": "release", "item_id": "b", "track_title": "Other", "track_position": "3", "especially_liked": True},
+            {"item_type": "release", "item_id": "b", "track_title": "Gone", "especially_liked": False},
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(self.URL, {"tracks": tracks}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"ok": True, "liked": 2, "unliked": 1})
+        self.assertLessEqual(len(ctx.captured_queries), 6)  # savepoint, read, insert, delete, change log, release
+        self.assertEqual(
+            set(TrackEspeciallyLiked.objects.values_list("item_id", "track_title", "track_position")),
+            {("a", "New", ""), ("b", "Other", "3")},
+        )
+
+    def test_post_is_idempotent_and_validated(self):
+        tracks = [{"item_type": "release", "item_id": "a", "track_title": "T", "especially_liked": True}]
+        self.client.post(self.URL, {"tracks": tracks}, format="json")
+        res = self.client.post(self.URL, {"tracks": tracks}, format="json")
+        self.assertEqual(res.json(), {"ok": True, "liked": 0, "unliked": 0})
+        self.assertEqual(TrackEspeciallyLiked.objects.count(), 1)
+        bad = [{"item_type": "song", "item_id": "a", "track_title": "T"}]
+        self.assertEqual(self.client.post(self.URL, {"tracks": bad}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(self.URL, {"tracks": []}, format="json").status_code, 400)
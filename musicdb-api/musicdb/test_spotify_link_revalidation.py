@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .models import ArtistSpotifyImageLink, ReleaseGroupImageLink, TrackSpotifyLink
+from .services.spotify_link_revalidation import revalidate_spotify_links
+
+SERVICE = "musicdb.services.spotify_link_revalidation"
+
+
+class RevalidateSpotifyLinksTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="revalidate", email="revalidate@example.com", password="pw"
+        )
+
+    def _track_link(self, title, track_id):
+        return TrackSpotifyLink.objects.create(
+            user=self.user,
+            release_id="rel-1",
+            track_title=title,
+            spotify_track_id=track_id,
+            spotify_name="Old name",
+        )
+
+    def test_tracks_refreshed_in_one_batch_call(self):
+        links = [self._track_link(f"Track {i}", f"t{i}") for i in range(3)]
+        fresh = {
+            f"t{i}": {"id": f"t{i}", "uri": f"spotify:track:t{i}", "name": f"New {i}", "artists": [{"name": "A"}]}
+            for i in range(3)
+        }
+        fresh["t2"] = None
+        with patch(f"{SERVICE}.get_spotify_tracks", return_value=fresh) as mock_tracks:
+            results = revalidate_spotify_links(targets=["tracks"])
+        mock_tracks.assert_called_once()
+        self.assertEqual(results["tracks"], {"total": 3, "checked": 3, "updated": 2, "missing": 1})
+        links[0].refresh_from_db()
+        self.assertEqual(links[0].spotify_name, "New 0")
+        self.assertEqual(links[0].spotify_artists, [{"name": "A"}])
+        links[2].refresh_from_db()
+        self.assertEqual(links[2].spotify_name, "Old name")
+
+    def test_relinked_track_replaces_stored_id(self):
+        link = self._track_link("Track 1", "t-old")
+        relinked = {
+            "t-old": {
+                "id": "t-new",
+                "uri": "spotify:track:t-new",
+                "name": "Track 1",
+                "artists": [{"name": "A"}],
+                "linked_from": {"id": "t-old", "uri": "spotify:track:t-old"},
+            }
+        }
+        with patch(f"{SERVICE}.get_spotify_tracks", return_value=relinked):
+            results = revalidate_spotify_links(targets=["tracks"])
+        self.assertEqual(results["tracks"]["updated"], 1)
+        link.refresh_from_db()
+        self.assertEqual(link.spotify_track_id, "t-new")
+        self.assertEqual(link.spotify_uri, "spotify:track:t-new")
+
+    def test_resumes_after_checkpoint(self):
+        first = self._track_link("Track 1", "t1")
+        second = self._track_link("Track 2", "t2")
+        with patch(f"{SERVICE}.get_spotify_tracks", return_value={}) as mock_tracks:
+            checkpoint = {"tracks": first.pk}
+            revalidate_spotify_links(checkpoint=checkpoint, targets=["tracks"])
+        mock_tracks.assert_called_once_with(["t2"])
+        self.assertEqual(checkpoint["tracks"], second.pk)
+
+    def test_rotated_spotify_image_url_replaced_other_sources_kept(self):
+        rotated = ArtistSpotifyImageLink.objects.create(
+            user=self.user,
+            musicbrainz_artist_id="mb-a",
+            image_url="https://i.scdn.co/image/old",
+            spotify_artist_id="sa",
+        )
+        current = ReleaseGroupImageLink.objects.create(
+            user=self.user,
+            musicbrainz_release_group_id="rg-1",
+            image_url="https://i.scdn.co/image/current",
+            spotify_album_id="sal",
+        )
+        ReleaseGroupImageLink.objects.create(
+            user=self.user,
+            musicbrainz_release_group_id="rg-2",
+            image_url="https://img.discogs.com/x.jpg",
+        )
+        artists = {"sa": {"id": "sa", "images": [{"url": "https://i.scdn.co/image/new-large"}]}}
+        albums = {"sal": {"id": "sal", "images": [{"url": "https://i.scdn.co/image/current"}]}}
+        with patch(f"{SERVICE}.get_spotify_artists", return_value=artists), patch(
+            f"{SERVICE}.get_spotify_albums", return_value=albums
+        ) as mock_albums:
+            results = revalidate_spotify_links(targets=["artists", "albums"])
+        rotated.refresh_from_db()
+        self.assertEqual(rotated.image_url, "https://i.scdn.co/image/new-large")
+        current.refresh_from_db()
+        self.assertEqual(current.image_url, "https://i.scdn.co/image/current")
+        self.assertEqual(results["albums"]["total"], 1)
+        mock_albums.assert_called_once_with(["sal"])
+
+    def test_command_writes_checkpoint_on_failure_and_resumes(self):
+        first = self._track_link("Track 1", "t1")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "checkpoint.json")
+            with open(path, "w") as fh:
+                json.dump({"tracks": first.pk}, fh)
+            self._track_link("Track 2", "t2")
+            with patch(f"{SERVICE}.get_spotify_tracks", side_effect=ValueError("Spotify tracks lookup failed: 429")):
+                with self.assertRaises(CommandError):
+                    call_command("revalidate_spotify_links", checkpoint=path, only=["tracks"], stdout=StringIO())
+            with open(path) as fh:
+                self.assertEqual(json.load(fh), {"tracks": first.pk})
+
+            out = StringIO()
+            with patch(f"{SERVICE}.get_spotify_tracks", return_value={}) as mock_tracks:
+                call_command("revalidate_spotify_links", checkpoint=path, only=["tracks"], stdout=out)
+            mock_tracks.assert_called_once_with(["t2"])
+            self.assertFalse(os.path.exists(path))
+            self.assertIn("tracks: 2/2 checked", out.getvalue())
@@ -143,3 +143,32 @@ class ManualSpotifyMatchEndpointsTests(TestCase):
         self.assertTrue(
             TrackSpotifyLink.objects.filter(user=self.user, release_id="mb-shared-release").exists()
         )
+
+    def test_batch_matches_grouped_by_release(self):
+        other = get_user_model().objects.create_user(username="batchother", password="password123")
+        for user, release_id, title in [
+            (self.user, "rel-a", "Zebra"),
+            (self.user, "rel-a", "Apple"),
+            (self.user, "rel-b", "Middle"),
+            (other, "rel-b", "Not Mine"),
+            (self.user, "rel-c", "Unrequested"),
+        ]:
+            TrackSpotifyLink.objects.create(
+                user=user, release_id=release_id, track_title=title, spotify_track_id=f"sp-{title}"
+            )
+
+        res = self.client.get("/api/search/manual-spotify-matches/batch/", {"release_ids": "rel-b, rel-a,rel-x,rel-a"})
+        self.assertEqual(res.status_code, 200)
+        releases = res.json()["releases"]
+        self.assertEqual(list(releases), ["rel-b", "rel-a", "rel-x"])
+        self.assertEqual([m["track_title"] for m in releases["rel-a"]], ["Apple", "Zebra"])
+        self.assertEqual([m["track_title"] for m in releases["rel-b"]], ["Middle"])
+        self.assertEqual(releases["rel-b"][0]["spotify_track"]["id"], "sp-Middle")
+        self.assertEqual(releases["rel-x"], [])
+
+    def test_batch_matches_validation(self):
+        res = self.client.get("/api/search/manual-spotify-matches/batch/")
+        self.assertEqual(res.status_code, 400)
+        too_many = ",".join(f"rel-{i}" for i in range(201))
+        res = self.client.get("/api/search/manual-spotify-matches/batch/", {"release_ids": too_many})
+        self.assertEqual(res.status_code, 400)
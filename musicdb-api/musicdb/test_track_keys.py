@@ -0,0 +1,167 @@
+"""Hashed track keys: key derivation, model hooks, and the offline index benchmark."""
+
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from musicdb.models import TrackEspeciallyLiked, TrackSpotifyLink
+from musicdb.services.especially_liked import apply_especially_liked
+from musicdb.track_key_bench import TABLES, run_benchmark, synthetic_rows
+from musicdb.track_keys import TrackKeyCollision, track_identity_key
+
+User = get_user_model()
+
+
+class TrackIdentityKeyTests(SimpleTestCase):
+    def test_key_is_deterministic_signed_64_bit(self):
+        key = track_identity_key("rel-1", "Song")
+        self.assertEqual(key, track_identity_key("rel-1", "Song"))
+        self.assertGreaterEqual(key, -(2**63))
+        self.assertLess(key, 2**63)
+
+    def test_part_boundaries_are_significant(self):
+        self.assertNotEqual(track_identity_key("a", "b c"), track_identity_key("a b", "c"))
+        self.assertNotEqual(track_identity_key("ab", ""), track_identity_key("a", "b"))
+
+    def test_values_are_not_normalized(self):
+        self.assertNotEqual(track_identity_key("rel-1", "Song"), track_identity_key("rel-1", "song"))
+
+
+class TrackKeyModelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="keys", password="testpass123")
+
+    def test_save_fills_and_refreshes_track_key(self):
+        link = TrackSpotifyLink.objects.create(
+            user=self.user, release_id="rel-1", track_title="Song", spotify_track_id="sp1"
+        )
+        self.assertEqual(link.track_key, TrackSpotifyLink.key_for("rel-1", "Song"))
+        link.track_title = "Other Song"
+        link.save(update_fields=["track_title"])
+        link.refresh_from_db()
+        self.assertEqual(link.track_key, TrackSpotifyLink.key_for("rel-1", "Other Song"))
+
+    def test_bulk_create_fills_track_key(self):
+        TrackEspeciallyLiked.objects.bulk_create(
+            [
+                TrackEspeciallyLiked(
+                    user=self.user, item_type="release", item_id="1", track_position="A1", track_title="Song"
+                )
+            ]
+        )
+        row = TrackEspeciallyLiked.objects.get(user=self.user)
+        self.assertEqual(row.track_key, TrackEspeciallyLiked.key_for("release", "1", "A1", "Song"))
+
+    def test_track_key_is_unique_per_user(self):
+        TrackSpotifyLink.objects.create(user=self.user, release_id="rel-1", track_title="Song", spotify_track_id="a")
+        other = User.objects.create_user(username="other", password="testpass123")
+        TrackSpotifyLink.objects.create(user=other, release_id="rel-1", track_title="Song", spotify_track_id="b")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TrackSpotifyLink.objects.create(
+                user=self.user, release_id="rel-1", track_title="Song", spotify_track_id="c"
+            )
+
+    def test_update_refuses_identity_fields(self):
+        TrackSpotifyLink.objects.create(user=self.user, release_id="rel-1", track_title="Song")
+        with self.assertRaises(ValueError):
+            TrackSpotifyLink.objects.filter(user=self.user).update(track_title="Other Song")
+        TrackSpotifyLink.objects.filter(user=self.user).update(spotify_name="Song (Remastered)")
+
+    def test_bulk_update_refreshes_track_key(self):
+        link = TrackSpotifyLink.objects.create(user=self.user, release_id="rel-1", track_title="Song")
+        link.track_title = "Other Song"
+        TrackSpotifyLink.objects.bulk_update([link], ["track_title"])
+        link.refresh_from_db()
+        self.assertEqual(link.track_key, TrackSpotifyLink.key_for("rel-1", "Other Song"))
+
+    def test_upsert_cannot_overwrite_identity_fields(self):
+        with self.assertRaises(ValueError):
+            TrackSpotifyLink.objects.bulk_create(
+                [TrackSpotifyLink(user=self.user, release_id="rel-1", track_title="Song")],
+                update_conflicts=True,
+                unique_fields=["user", "track_key"],
+                update_fields=["track_title", "spotify_track_id"],
+            )
+
+
+@patch.object(TrackSpotifyLink, "key_for", return_value=42)
+@patch.object(TrackEspeciallyLiked, "key_for", return_value=42)
+class TrackKeyCollisionTests(TestCase):
+    """Every identity hashes to 42, so any two tracks collide."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="collide", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _match(self, track_title, track_id):
+        return self.client.post(
+            "/api/search/manual-spotify-match/",
+            {"release_id": "rel-1", "track_title": track_title, "spotify_track": {"id": track_id}},
+            format="json",
+        )
+
+    def test_manual_match_does_not_take_over_another_track(self, *_mocks):
+        self.assertEqual(self._match("Song", "sp1").status_code, 200)
+        self.assertEqual(self._match("Other Song", "sp2").status_code, 409)
+        link = TrackSpotifyLink.objects.get(user=self.user)
+        self.assertEqual((link.track_title, link.spotify_track_id), ("Song", "sp1"))
+
+    def test_unlink_does_not_delete_another_track(self, *_mocks):
+        self._match("Song", "sp1")
+        res = self.client.delete("/api/search/manual-spotify-match/?release_id=rel-1&track_title=Other%20Song")
+        self.assertEqual(res.status_code, 204)
+        self.assertTrue(TrackSpotifyLink.objects.filter(user=self.user, track_title="Song").exists())
+
+    def test_especially_liked_does_not_report_a_collision_as_liked(self, *_mocks):
+        TrackEspeciallyLiked.objects.create(user=self.user, item_type="release", item_id="1", track_title="Song")
+        res = self.client.post(
+            "/api/search/especially-liked-track/",
+            {"item_type": "release", "item_id": "1", "track_title": "Other Song", "especially_liked": True},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(
+            list(TrackEspeciallyLiked.objects.values_list("track_title", flat=True)), ["Song"]
+        )
+
+    def test_colliding_tracks_in_one_request_write_nothing(self, *_mocks):
+        with self.assertRaises(TrackKeyCollision):
+            apply_especially_liked(
+                self.user,
+                [
+                    {"item_type": "release", "item_id": "1", "track_title": t, "especially_liked": True}
+                    for t in ("Song", "Other Song")
+                ],
+            )
+        self.assertFalse(TrackEspeciallyLiked.objects.exists())
+
+
+class TrackKeyBenchmarkTests(SimpleTestCase):
+    def test_synthetic_rows_are_deterministic_and_distinct(self):
+        rows = synthetic_rows("trackespeciallyliked", 500, seed=2)
+        self.assertEqual(rows, synthetic_rows("trackespeciallyliked", 500, seed=2))
+        self.assertEqual(len(set(rows)), 500)
+
+    def test_run_benchmark_reports_both_designs(self):
+        results = run_benchmark(rows=2000, upserts=200)
+        self.assertEqual(
+            [(r["table"], r["design"]) for r in results],
+            [(table, design) for table, (_, designs) in TABLES.items() for design in designs],
+        )
+        by_design = {(r["table"], r["design"]): r for r in results}
+        for table in TABLES:
+            self.assertLess(by_design[(table, "hashed")]["index_bytes"], by_design[(table, "composite")]["index_bytes"])
+            self.assertGreater(by_design[(table, "hashed")]["upserts_per_s"], 0)
+
+    def test_management_command_prints_report(self):
+        out = StringIO()
+        call_command("bench_track_keys", rows=500, upserts=50, table=["trackspotifylink"], stdout=out)
+        output = out.getvalue()
+        self.assertIn("composite", output)
+        self.assertIn("hashed", output)
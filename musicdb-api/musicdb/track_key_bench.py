@@ -0,0 +1,165 @@
+"""
+Offline benchmark: wide composite unique indexes vs hashed track keys for track rows.
+
+For each track table, the same seeded synthetic rows are loaded into two in-memory SQLite
+databases. One has the old index set, a unique index on the raw identity columns plus the
+user FK index. The other has the new set, unique (user, track_key), which also serves the FK,
+plus the narrow lookup index. The report gives each design's index size and the time for a mixed insert/update
+upsert workload (one INSERT ... ON CONFLICT DO UPDATE per write, like the API). The hashed
+design also pays for computing the key.
+
+Run with ``python manage.py bench_track_keys`` (defaults to a million rows per table). It
+uses the stdlib sqlite3 module, not the configured database.
+"""
+import random
+import sqlite3
+import string
+import time
+
+from .track_keys import track_identity_key
+
+# table: (identity columns, {design: [(unique, index columns), ...]})
+TABLES = {
+    "trackspotifylink": (
+        ("release_id", "track_title"),
+        {
+            "composite": [(True, ("user_id", "release_id", "track_title")), (False, ("user_id",))],
+            "hashed": [(True, ("user_id", "track_key")), (False, ("user_id", "release_id"))],
+        },
+    ),
+    "trackespeciallyliked": (
+        ("item_type", "item_id", "track_position", "track_title"),
+        {
+            "composite": [
+                (True, ("user_id", "item_type", "item_id", "track_position", "track_title")),
+                (False, ("user_id",)),
+            ],
+            "hashed": [(True, ("user_id", "track_key")), (False, ("user_id", "item_type", "item_id"))],
+        },
+    ),
+}
+
+_WORDS = (
+    "love night heart dream fire river shadow light blue summer rain home road song time "
+    "moon star dance world girl stone wild gold ghost city electric part live remaster version"
+).split()
+
+
+def _release_id(rng):
+    hexdigits = "0123456789abcdef"
+    return "-".join("".join(rng.choice(hexdigits) for _ in range(n)) for n in (8, 4, 4, 4, 12))
+
+
+def _title(rng):
+    words = " ".join(rng.choice(_WORDS).capitalize() for _ in range(rng.randint(1, 7)))
+    if rng.random() < 0.15:
+        words += f" ({rng.randint(1990, 2024)} Remaster)"
+    return words
+
+
+def synthetic_rows(table, count, seed=0):
+    """Deterministic (user_id, *identity) tuples; about 20 tracks per album and 500 albums per user."""
+    rng = random.Random(seed)
+    rows = []
+    seen = set()
+    while len(rows) < count:
+        user_id = len(rows) // 10_000 + 1
+        album_id = _release_id(rng) if table == "trackspotifylink" else str(rng.randint(1, 30_000_000))
+        item_type = rng.choice(("release", "master"))
+        for position in range(1, 21):
+            title = _title(rng)
+            if table == "trackspotifylink":
+                row = (user_id, album_id, title)
+            else:
+                row = (user_id, item_type, album_id, f"{rng.choice(('', 'A', 'B'))}{position}", title)
+            if row not in seen:
+                seen.add(row)
+                rows.append(row)
+    return rows[:count]
+
+
+def _connect():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    return conn
+
+
+def _page_count(conn):
+    return conn.execute("PRAGMA page_count").fetchone()[0]
+
+
+def _bench_design(table, columns, indexes, design, rows, workload):
+    hashed = design == "hashed"
+    conn = _connect()
+    all_columns = ("user_id",) + columns + (("track_key",) if hashed else ())
+    conn.execute(
+        f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, "
+        + ", ".join(f"{c} INTEGER" if c in ("user_id", "track_key") else f"{c} TEXT" for c in all_columns)
+        + ", spotify_track_id TEXT)"
+    )
+    placeholders = ", ".join("?" for _ in all_columns)
+    insert = f"INSERT INTO {table} ({', '.join(all_columns)}, spotify_track_id) VALUES ({placeholders}, '')"
+
+    def values(row):
+        return row + (track_identity_key(*row[1:]),) if hashed else row
+
+    conn.execute("BEGIN")
+    conn.executemany(insert, (values(row) for row in rows))
+    conn.execute("COMMIT")
+
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    index_bytes = 0
+    started = time.perf_counter()
+    conflict_target = None
+    for i, (unique, index_columns) in enumerate(indexes):
+        before = _page_count(conn)
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        conn.execute(f"CREATE {kind} {table}_{design}_{i} ON {table} ({', '.join(index_columns)})")
+        index_bytes += (_page_count(conn) - before) * page_size
+        if unique:
+            conflict_target = ", ".join(index_columns)
+    build_s = time.perf_counter() - started
+
+    upsert = (
+        f"INSERT INTO {table} ({', '.join(all_columns)}, spotify_track_id) VALUES ({placeholders}, ?) "
+        f"ON CONFLICT ({conflict_target}) DO UPDATE SET spotify_track_id = excluded.spotify_track_id"
+    )
+    started = time.perf_counter()
+    conn.execute("BEGIN")
+    for n, row in enumerate(workload):
+        conn.execute(upsert, values(row) + (f"sp{n}",))
+    conn.execute("COMMIT")
+    upsert_s = time.perf_counter() - started
+    conn.close()
+    return {
+        "table": table,
+        "design": design,
+        "rows": len(rows),
+        "index_bytes": index_bytes,
+        "build_s": build_s,
+        "upserts": len(workload),
+        "upsert_s": upsert_s,
+        "upserts_per_s": len(workload) / upsert_s if upsert_s else 0.0,
+    }
+
+
+def run_benchmark(rows=1_000_000, upserts=50_000, seed=0, tables=None):
+    """One result dict per (table, design); tables defaults to every table in TABLES."""
+    results = []
+    for table in tables or TABLES:
+        columns, designs = TABLES[table]
+        data = synthetic_rows(table, rows, seed=seed)
+        rng = random.Random(seed + 1)
+        # Half updates of existing rows, half inserts of new tracks.
+        fresh = list(
+            {
+                row[:-1] + (row[-1] + " " + "".join(rng.choice(string.ascii_lowercase) for _ in range(8)),)
+                for row in rng.sample(data, min(len(data), upserts - upserts // 2))
+            }
+        )
+        workload = rng.sample(data, min(len(data), upserts // 2)) + fresh
+        rng.shuffle(workload)
+        for design, indexes in designs.items():
+            results.append(_bench_design(table, columns, indexes, design, data, workload))
+    return results
@@ -0,0 +1,99 @@
+"""
+Fixed-width keys for track identities (release + track title, etc.).
+
+Track rows used to be unique on their raw identity columns, including a 512-char title, which
+made wide B-tree indexes. They now store track_key, a signed 64-bit integer taken from the
+SHA-256 digest of the identity, and are unique on (user, track_key); the raw columns are kept
+for display and filtering. The win is index size (20-30% smaller in bench_track_keys), not
+write speed: hashing makes upserts somewhat slower.
+
+At 64 bits a collision among one user's tracks is negligible (about 1 in 10^10 for 50,000
+tracks), but it must not turn one track's write into an update of another's row. Upserts never
+overwrite the identity columns, and writers compare the stored identity with their own
+(check_stored_identity) and raise TrackKeyCollision on a mismatch. track_key is only kept in
+sync by save(), bulk_create() and bulk_update(); QuerySet.update() refuses identity columns
+unless it also sets track_key.
+
+The identity is the values exactly as stored (views strip and truncate them before writing), so
+rows that were distinct under the old constraint stay distinct. Keep track_identity_key()
+stable: migrations use it to fill existing rows.
+"""
+import hashlib
+
+from django.db import IntegrityError, models
+
+# Unit separator: cannot appear in the stored values, so ("a", "b c") and ("a b", "c") differ.
+_SEPARATOR = "\x1f"
+
+
+def track_identity_key(*parts):
+    """First 64 bits of the SHA-256 digest of the identity parts (in order), as a signed int."""
+    digest = hashlib.sha256(_SEPARATOR.join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class TrackKeyCollision(IntegrityError):
+    """Two different track identities share a track_key."""
+
+
+class TrackKeyQuerySet(models.QuerySet):
+    """Keeps track_key in sync on the bulk paths that bypass Model.save()."""
+
+    def _identity_fields(self, fields):
+        return set(fields or ()) & set(self.model.TRACK_KEY_FIELDS)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if kwargs.get("update_conflicts") and self._identity_fields(kwargs.get("update_fields")):
+            raise ValueError("bulk_create() cannot overwrite track identity fields on conflict.")
+        objs = list(objs)
+        for obj in objs:
+            obj.track_key = obj.compute_track_key()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if self._identity_fields(fields):
+            objs = list(objs)
+            for obj in objs:
+                obj.track_key = obj.compute_track_key()
+            fields = [*fields, "track_key"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        # bulk_update() goes through here with track_key alongside the identity fields.
+        if self._identity_fields(kwargs) and "track_key" not in kwargs:
+            raise ValueError("update() cannot change track identity fields; use save() or bulk_update().")
+        return super().update(**kwargs)
+
+
+class TrackKeyModel(models.Model):
+    """Abstract base for rows identified by a hashed track key; subclasses define TRACK_KEY_FIELDS."""
+
+    TRACK_KEY_FIELDS = ()
+
+    track_key = models.BigIntegerField(editable=False)
+
+    objects = TrackKeyQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def key_for(cls, *parts):
+        """track_key for identity values given in TRACK_KEY_FIELDS order."""
+        return track_identity_key(*parts)
+
+    def compute_track_key(self):
+        return self.key_for(*(getattr(self, name) for name in self.TRACK_KEY_FIELDS))
+
+    def check_stored_identity(self):
+        """Raise TrackKeyCollision if the stored row with this pk has a different identity."""
+        stored = type(self)._base_manager.filter(pk=self.pk).values_list(*self.TRACK_KEY_FIELDS).get()
+        if stored != tuple(getattr(self, name) for name in self.TRACK_KEY_FIELDS):
+            raise TrackKeyCollision(f"track_key {self.track_key} already belongs to {stored!r}")
+
+    def save(self, *args, **kwargs):
+        self.track_key = self.compute_track_key()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "track_key" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "track_key"]
+        super().save(*args, **kwargs)
@@ -12,14 +12,18 @@ from .views import (
     DiscogsReleaseImagesView,
     DiscogsReleaseSearchView,
     EspeciallyLikedTrackView,
+    EspeciallyLikedTracksBatchView,
     EspeciallyLikedTracksView,
+    LibraryCheckView,
     ListDetailView,
+    ListItemsBulkView,
     ListItemsCheckView,
     ListItemsView,
     ListsView,
     ManualAlbumImageView,
     ManualSpotifyArtistImageView,
     ManualSpotifyMatchView,
+    ManualSpotifyMatchesBatchView,
     ManualSpotifyMatchesView,
     SearchAPIView,
     SpotifyArtistImagesView,
@@ -38,8 +42,15 @@ urlpatterns = [
     path("lists/", ListsView.as_view(), name="lists"),
     path("lists/<int:list_id>/", ListDetailView.as_view(), name="list-detail"),
     path("lists/items/", ListItemsView.as_view(), name="list-items"),
+    path("lists/items/bulk/", ListItemsBulkView.as_view(), name="list-items-bulk"),
     path("lists/items/check/", ListItemsCheckView.as_view(), name="list-items-check"),
+    path("library/check/", LibraryCheckView.as_view(), name="library-check"),
     path("manual-spotify-matches/", ManualSpotifyMatchesView.as_view(), name="manual-spotify-matches"),
+    path(
+        "manual-spotify-matches/batch/",
+        ManualSpotifyMatchesBatchView.as_view(),
+        name="manual-spotify-matches-batch",
+    ),
     path("manual-spotify-match/", ManualSpotifyMatchView.as_view(), name="manual-spotify-match"),
     path(
         "manual-spotify-artist-image/",
@@ -57,6 +68,11 @@ urlpatterns = [
     path("discogs-release-images/", DiscogsReleaseImagesView.as_view(), name="discogs-release-images"),
     path("especially-liked-tracks/", EspeciallyLikedTracksView.as_view(), name="especially-liked-tracks"),
     path("especially-liked-track/", EspeciallyLikedTrackView.as_view(), name="especially-liked-track"),
+    path(
+        "especially-liked-tracks/batch/",
+        EspeciallyLikedTracksBatchView.as_view(),
+        name="especially-liked-tracks-batch",
+    ),
     path("artist-overview/", ArtistOverviewView.as_view(), name="artist-overview"),
     path("album-overview/", AlbumOverviewView.as_view(), name="album-overview"),
 ]
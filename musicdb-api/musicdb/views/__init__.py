@@ -1,6 +1,7 @@
 from .artist_overview_views import AlbumOverviewView, ArtistOverviewView
-from .liked_views import EspeciallyLikedTrackView, EspeciallyLikedTracksView
-from .list_views import ListDetailView, ListItemsCheckView, ListItemsView, ListsView
+from .liked_views import EspeciallyLikedTrackView, EspeciallyLikedTracksBatchView, EspeciallyLikedTracksView
+from .library_views import LibraryCheckView, LibrarySnapshotView, LibrarySyncView
+from .list_views import ListDetailView, ListItemsBulkView, ListItemsCheckView, ListItemsView, ListsView
 from .search_views import (
     ConsumedAlbumView,
     ConsumedBackfillView,
@@ -15,6 +16,7 @@ from .spotify_views import (
     ManualAlbumImageView,
     ManualSpotifyArtistImageView,
     ManualSpotifyMatchView,
+    ManualSpotifyMatchesBatchView,
     ManualSpotifyMatchesView,
     SpotifyAlbumImagesView,
     SpotifyAlbumSearchView,
@@ -31,8 +33,13 @@ __all__ = [
     "ConsumedTitlesView",
     "DetailAPIView",
     "EspeciallyLikedTrackView",
+    "EspeciallyLikedTracksBatchView",
     "EspeciallyLikedTracksView",
+    "LibraryCheckView",
+    "LibrarySnapshotView",
+    "LibrarySyncView",
     "ListDetailView",
+    "ListItemsBulkView",
     "ListItemsCheckView",
     "ListItemsView",
     "ListsView",
@@ -43,6 +50,7 @@ __all__ = [
     "ManualAlbumImageView",
     "ManualSpotifyArtistImageView",
     "ManualSpotifyMatchView",
+    "ManualSpotifyMatchesBatchView",
     "ManualSpotifyMatchesView",
     "SpotifyAlbumImagesView",
     "SpotifyAlbumSearchView",
@@ -1,6 +1,10 @@
+import base64
+import binascii
+import json
 import logging
 from urllib.parse import urlparse
 
+import requests
 from django.conf import settings
 from rest_framework import status
 from rest_framework.response import Response
@@ -59,6 +63,23 @@ def _parse_optional_int(value):
         return None
 
 
+def _encode_cursor(values):
+    """Opaque keyset cursor for a list of JSON-serializable sort-key values."""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, length):
+    """Sort-key values from _encode_cursor(); raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return values
+
+
 def _validate_choice(value, allowed, field_name):
     if value in allowed:
         return None
@@ -73,24 +94,43 @@ def _validate_required(value_map):
     return _bad_request(f"Missing required: {', '.join(missing)}")
 
 
+class CatalogUnavailable(Exception):
+    """The catalog could not answer right now (rate limit, server error, network); retry later."""
+
+
+def _catalog_display_title(resource_type, resource_id):
+    """
+    'Artist - Album' for a release or master, or "" when the catalog has no title for it.
+    Raises CatalogUnavailable for 429s, 5xx responses and network errors.
+    """
+    fetch = {"release": get_release, "master": get_master}.get(resource_type)
+    try:
+        catalog_id = int(resource_id)
+    except (TypeError, ValueError):
+        return ""
+    if fetch is None:
+        return ""
+    try:
+        resp = fetch(catalog_id)
+    except requests.exceptions.RequestException as e:
+        raise CatalogUnavailable(str(e)) from e
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise CatalogUnavailable(f"Catalog returned {resp.status_code} for {resource_type} {resource_id}")
+    if resp.status_code != 200:
+        return ""
+    data = resp.json()
+    artists = data.get("artists") or []
+    album_title = (data.get("title") or "").strip()
+    if artists and album_title:
+        artist_str = ", ".join(a.get("name", "") for a in artists).strip()
+        return f"{artist_str} - {album_title}"
+    return album_title
+
+
 def _fetch_display_title_from_catalog(resource_type, resource_id):
-    """Fetch 'Artist - Album' from configured catalog source for a release or master."""
+    """Fetch 'Artist - Album' from configured catalog source for a release or master ("" on any error)."""
     try:
-        if resource_type == "release":
-            resp = get_release(int(resource_id))
-        elif resource_type == "master":
-            resp = get_master(int(resource_id))
-        else:
-            return ""
-        if resp.status_code != 200:
-            return ""
-        data = resp.json()
-        artists = data.get("artists") or []
-        album_title = (data.get("title") or "").strip()
-        if artists and album_title:
-            artist_str = ", ".join(a.get("name", "") for a in artists).strip()
-            return f"{artist_str} - {album_title}"
-        return album_title
+        return _catalog_display_title(resource_type, resource_id)
     except Exception:
         return ""
 
@@ -122,13 +162,15 @@ def _normalize_mb_release(data):
             rec = track.get("recording") or {}
             length = track.get("length") or rec.get("length")
             duration = _format_duration_from_mb_length(length)
-            tracklist.append(
-                {
-                    "title": (rec.get("title") or track.get("title") or "").strip(),
-                    "duration": duration,
-                    "position": track.get("position") or str(len(tracklist) + 1),
-                }
-            )
+            entry = {
+                "title": (rec.get("title") or track.get("title") or "").strip(),
+                "duration": duration,
+                "position": track.get("position") or str(len(tracklist) + 1),
+            }
+            isrcs = [i for i in (rec.get("isrcs") or []) if isinstance(i, str) and i.strip()]
+            if isrcs:
+                entry["isrc"] = isrcs[0].strip().upper()
+            tracklist.append(entry)
     out = {
         "title": title,
         "artists": artists,
@@ -0,0 +1,132 @@
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.decorators import method_decorator
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import ConsumedAlbum, ListItem
+from ..serializers import LibraryCheckSerializer
+from ..services.library_changes import changes_since, latest_change_id, position_expired, sync_position
+from ..services.library_snapshot import build_library_snapshot
+from .common import (
+    _bad_request,
+    _decode_cursor,
+    _encode_cursor,
+    _parse_optional_int,
+    _validation_error_response,
+)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class LibraryCheckView(APIView):
+    """
+    POST {"items": [{"type", "id"}, ...]} (up to 500) — consumed flag and list memberships for
+    many catalog items at once, e.g. a whole search results page. Answered with one IN query
+    on consumed albums and one on list items, whatever the number of items.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ser = LibraryCheckSerializer(data=request.data)
+        if not ser.is_valid():
+            return _validation_error_response(ser)
+        refs = list(dict.fromkeys((item["type"], item["id"]) for item in ser.validated_data["items"]))
+        types = {t for t, _ in refs}
+        ids = {i for _, i in refs}
+
+        consumed = set(
+            ConsumedAlbum.objects.filter(
+                user=request.user, consumed=True, type__in=types, discogs_id__in=ids
+            ).values_list("type", "discogs_id")
+        )
+        memberships = {}
+        for list_id, item_type, item_id in ListItem.objects.filter(
+            list__user=request.user, type__in=types, discogs_id__in=ids
+        ).values_list("list_id", "type", "discogs_id"):
+            memberships.setdefault((item_type, item_id), []).append(list_id)
+
+        return Response(
+            {
+                "items": [
+                    {
+                        "type": item_type,
+                        "id": item_id,
+                        "consumed": (item_type, item_id) in consumed,
+                        "list_ids": sorted(memberships.get((item_type, item_id), [])),
+                    }
+                    for item_type, item_id in refs
+                ]
+            }
+        )
+
+
+class LibrarySyncView(APIView):
+    """
+    GET /api/sync/?since=<cursor> — library changes (consumed albums, lists, list items,
+    especially-liked tracks, manual matches and images) since the cursor, newest state per entity:
+    {"changes": [{"kind", "key", "op": "upsert"|"delete", "data"}], "cursor", "has_more"}.
+    Keep calling with the returned cursor while has_more. Without since, or when the cursor is
+    older than the change log's retention, the response is {"reset": true, "changes": [],
+    "cursor"}: take the cursor first, then do a full load.
+    """
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_LIMIT = 500
+    MAX_LIMIT = 1000
+
+    def get(self, request):
+        since = (request.query_params.get("since") or "").strip()
+        if not since:
+            return self._reset(request)
+        try:
+            since_id, unread_since = _decode_cursor(since, 2)
+            if not isinstance(since_id, int) or not isinstance(unread_since, int):
+                raise ValueError("Invalid cursor")
+        except ValueError:
+            return _bad_request("Invalid cursor")
+        if position_expired(unread_since):
+            return self._reset(request, detail="Cursor expired; do a full load.")
+        limit = _parse_optional_int(request.query_params.get("limit")) or self.DEFAULT_LIMIT
+        limit = min(self.MAX_LIMIT, max(1, limit))
+        changes, last_id, unread_since, has_more = changes_since(request.user.id, since_id, limit)
+        return Response(
+            {
+                "reset": False,
+                "changes": changes,
+                "cursor": _encode_cursor([last_id, unread_since]),
+                "has_more": has_more,
+            }
+        )
+
+    def _reset(self, request, **extra):
+        return Response(
+            {
+                "reset": True,
+                "changes": [],
+                "cursor": _encode_cursor(list(sync_position(request.user.id))),
+                "has_more": False,
+                **extra,
+            }
+        )
+
+
+class LibrarySnapshotView(APIView):
+    """
+    GET /api/library/snapshot/ — the whole library in one columnar payload for app start-up
+    (see services.library_snapshot), plus a sync cursor for GET /api/sync/?since= afterwards.
+    The ETag is the user's library version: If-None-Match with the current ETag gets a 304
+    after a single library query.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        version = latest_change_id(request.user.id)
+        etag = f'"library-{request.user.id}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        snapshot = build_library_snapshot(request.user.id)
+        snapshot["version"] = version
+        snapshot["cursor"] = _encode_cursor(list(sync_position(request.user.id)))
+        return Response(snapshot, headers=headers)
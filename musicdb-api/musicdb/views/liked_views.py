@@ -1,10 +1,19 @@
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ..models import TrackEspeciallyLiked
-from ..serializers import EspeciallyLikedTrackWriteSerializer
-from .common import _validate_choice, _validate_required, _validation_error_response
+from ..serializers import EspeciallyLikedBatchWriteSerializer, EspeciallyLikedTrackWriteSerializer
+from ..services.especially_liked import apply_especially_liked, liked_tracks_by_item
+from ..track_keys import TrackKeyCollision
+from .common import _bad_request, _validate_choice, _validate_required, _validation_error_response
+
+
+def _track_key_conflict():
+    return Response(
+        {"error": "Another track on your account has the same track key"}, status=status.HTTP_409_CONFLICT
+    )
 
 
 class EspeciallyLikedTracksView(APIView):
@@ -19,7 +28,9 @@ class EspeciallyLikedTracksView(APIView):
         type_error = _validate_choice(item_type, ("release", "master", "album"), "item_type")
         if type_error:
             return type_error
-        rows = TrackEspeciallyLiked.objects.filter(user=request.user, item_type=item_type, item_id=item_id)
+        rows = TrackEspeciallyLiked.objects.filter(
+            user=request.user, item_type=item_type, item_id=item_id
+        ).order_by("track_position", "track_title")
         tracks = [{"track_title": row.track_title, "track_position": row.track_position} for row in rows]
         return Response({"tracks": tracks})
 
@@ -31,21 +42,45 @@ class EspeciallyLikedTrackView(APIView):
         ser = EspeciallyLikedTrackWriteSerializer(data=request.data)
         if not ser.is_valid():
             return _validation_error_response(ser)
-        item_type = ser.validated_data["item_type"]
-        item_id = ser.validated_data["item_id"]
-        track_title = ser.validated_data["track_title"]
-        track_position = str(ser.validated_data.get("track_position") or "").strip()
-        especially_liked = ser.validated_data["especially_liked"]
-
-        query = {
-            "user": request.user,
-            "item_type": item_type,
-            "item_id": item_id,
-            "track_position": track_position[:32],
-            "track_title": track_title[:512],
-        }
-        if especially_liked:
-            TrackEspeciallyLiked.objects.update_or_create(**query, defaults={})
-        else:
-            TrackEspeciallyLiked.objects.filter(**query).delete()
-        return Response({"ok": True, "especially_liked": especially_liked})
+        try:
+            apply_especially_liked(request.user, [ser.validated_data])
+        except TrackKeyCollision:
+            return _track_key_conflict()
+        return Response({"ok": True, "especially_liked": ser.validated_data["especially_liked"]})
+
+
+class EspeciallyLikedTracksBatchView(APIView):
+    """
+    GET ?item_type=&item_ids=a,b,c (up to 200) — liked tracks for many albums in one query:
+    {"items": {item_id: [{"track_title", "track_position"}, ...]}}, every requested id present.
+    POST {"tracks": [{"item_type", "item_id", "track_title", "track_position", "especially_liked"}]}
+    (up to 500) — like/unlike many tracks in one transaction.
+    """
+    permission_classes = [IsAuthenticated]
+
+    MAX_ITEMS = 200
+
+    def get(self, request):
+        item_type = (request.GET.get("item_type") or "").strip().lower()
+        item_ids = list(
+            dict.fromkeys(i.strip() for i in (request.GET.get("item_ids") or "").split(",") if i.strip())
+        )
+        required_error = _validate_required({"item_type": item_type, "item_ids": item_ids})
+        if required_error:
+            return required_error
+        type_error = _validate_choice(item_type, ("release", "master", "album"), "item_type")
+        if type_error:
+            return type_error
+        if len(item_ids) > self.MAX_ITEMS:
+            return _bad_request(f"At most {self.MAX_ITEMS} item_ids per request")
+        return Response({"items": liked_tracks_by_item(request.user, item_type, item_ids)})
+
+    def post(self, request):
+        ser = EspeciallyLikedBatchWriteSerializer(data=request.data)
+        if not ser.is_valid():
+            return _validation_error_response(ser)
+        try:
+            result = apply_especially_liked(request.user, ser.validated_data["tracks"])
+        except TrackKeyCollision:
+            return _track_key_conflict()
+        return Response({"ok": True, **result})
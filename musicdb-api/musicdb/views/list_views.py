@@ -1,14 +1,24 @@
+from django.conf import settings
+from django.db.models import Count, F, Max, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ..models import List, ListItem
-from ..serializers import ListCreateSerializer, ListItemsWriteSerializer
+from ..serializers import ListCreateSerializer, ListItemsBulkWriteSerializer, ListItemsWriteSerializer
+from ..services.image_overrides import ImageOverrideMap
+from ..services.library_changes import list_change, record_library_change
+from ..services.list_membership import InvalidListIds, apply_list_memberships
 from .common import (
     _bad_request,
+    _decode_cursor,
+    _encode_cursor,
     _fetch_display_title_from_catalog,
     _internal_error_response,
+    _parse_optional_int,
     logger,
     _validate_choice,
     _validate_required,
@@ -16,25 +26,70 @@ from .common import (
 )
 
 
+def _list_previews(list_ids, size):
+    """{list_id: [{type, id}, ...]} — each list's `size` newest items, in one window query."""
+    rows = (
+        ListItem.objects.filter(list_id__in=list_ids)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F("list_id"),
+                order_by=[F("added_at").desc(), F("id").desc()],
+            )
+        )
+        .filter(rank__lte=size)
+        .order_by("list_id", "rank")
+        .values_list("list_id", "type", "discogs_id")
+    )
+    previews = {}
+    for list_id, item_type, item_id in rows:
+        previews.setdefault(list_id, []).append({"type": item_type, "id": item_id})
+    return previews
+
+
 class ListsView(APIView):
+    """
+    GET — the user's lists (optionally ?list_type=release|person).
+    ?stats=1 adds item_count and last_added_at per list (aggregated in the same query).
+    ?preview=N (max 12) adds each list's N newest items as preview: [{type, id}] (one window query),
+    with the user's manual images on the items that have one.
+    POST — create a list.
+    """
     permission_classes = [IsAuthenticated]
 
+    MAX_PREVIEW = 12
+
     def get(self, request):
         try:
             qs = List.objects.filter(user=request.user).order_by("-updated_at")
             list_type = (request.query_params.get("list_type") or "").strip().lower()
             if list_type in ("release", "person"):
                 qs = qs.filter(list_type=list_type)
-            lists_data = [
-                {
+            with_stats = request.query_params.get("stats") in ("1", "true")
+            if with_stats:
+                qs = qs.annotate(item_count=Count("items"), last_added_at=Max("items__added_at"))
+            preview_size = _parse_optional_int(request.query_params.get("preview")) or 0
+            preview_size = min(self.MAX_PREVIEW, max(0, preview_size))
+            lists_data = []
+            for lst in qs:
+                row = {
                     "id": lst.id,
                     "list_type": lst.list_type,
                     "name": lst.name,
                     "created_at": lst.created_at.isoformat() if lst.created_at else None,
                     "updated_at": lst.updated_at.isoformat() if lst.updated_at else None,
                 }
-                for lst in qs
-            ]
+                if with_stats:
+                    row["item_count"] = lst.item_count
+                    row["last_added_at"] = lst.last_added_at.isoformat() if lst.last_added_at else None
+                lists_data.append(row)
+            if preview_size and lists_data:
+                previews = _list_previews([row["id"] for row in lists_data], preview_size)
+                ImageOverrideMap.for_request(request).apply_to_items(
+                    [item for items in previews.values() for item in items]
+                )
+                for row in lists_data:
+                    row["preview"] = previews.get(row["id"], [])
             return Response({"lists": lists_data})
         except Exception as e:
             logger.exception("Failed to load lists for user %s", request.user.id)
@@ -50,6 +105,7 @@ class ListsView(APIView):
             if List.objects.filter(user=request.user, list_type=list_type, name=name).exists():
                 return _bad_request("A list with this name already exists for this type")
             list_obj = List.objects.create(user=request.user, list_type=list_type, name=name)
+            record_library_change(list_change(list_obj))
             return Response(
                 {
                     "id": list_obj.id,
@@ -78,11 +134,11 @@ class ListItemsView(APIView):
             list_ids = ser.validated_data["list_ids"]
             title = str(ser.validated_data.get("title") or "").strip()
 
-            selected_list_ids_set = set(list_ids)
-            user_release_lists = List.objects.filter(user=request.user, list_type=List.LIST_TYPE_RELEASE)
-            if selected_list_ids_set:
-                valid_list_ids = set(user_release_lists.values_list("id", flat=True))
-                invalid_ids = selected_list_ids_set - valid_list_ids
+            if list_ids:
+                owned = List.objects.filter(
+                    user=request.user, list_type=List.LIST_TYPE_RELEASE, id__in=list_ids
+                ).values_list("id", flat=True)
+                invalid_ids = set(list_ids) - set(owned)
                 if invalid_ids:
                     return _bad_request(
                         f"One or more lists not found or are not album lists: {invalid_ids}"
@@ -94,48 +150,12 @@ class ListItemsView(APIView):
                 else:
                     title = _fetch_display_title_from_catalog(resource_type, resource_id)
 
-            current_list_items = ListItem.objects.filter(
-                list__user=request.user,
-                list__list_type=List.LIST_TYPE_RELEASE,
-                type=resource_type,
-                discogs_id=str(resource_id),
-            ).select_related("list")
-            current_list_ids_set = {item.list_id for item in current_list_items}
-            lists_to_add = selected_list_ids_set - current_list_ids_set
-            lists_to_remove = current_list_ids_set - selected_list_ids_set
-            added_to = []
-            removed_from = []
-
-            if lists_to_add:
-                for list_obj in user_release_lists.filter(id__in=lists_to_add):
-                    item, created = ListItem.objects.get_or_create(
-                        list=list_obj,
-                        type=resource_type,
-                        discogs_id=str(resource_id),
-                        defaults={"title": title},
-                    )
-                    if created:
-                        added_to.append(list_obj.id)
-                    elif not item.title and title:
-                        item.title = title
-                        item.save()
-
-            if lists_to_remove:
-                items_to_delete = current_list_items.filter(list_id__in=lists_to_remove)
-                removed_from = list(items_to_delete.values_list("list_id", flat=True))
-                items_to_delete.delete()
-
-            if selected_list_ids_set:
-                items_to_update = ListItem.objects.filter(
-                    list__user=request.user,
-                    list_id__in=selected_list_ids_set,
-                    type=resource_type,
-                    discogs_id=str(resource_id),
-                )
-                for item in items_to_update:
-                    if not item.title and title:
-                        item.title = title
-                        item.save()
+            result = apply_list_memberships(
+                request.user,
+                [{"type": resource_type, "id": resource_id, "title": title, "list_ids": list_ids}],
+            )
+            added_to = [list_id for list_id, _type, _id in result["added"]]
+            removed_from = [list_id for list_id, _type, _id in result["removed"]]
 
             message_parts = []
             if added_to:
@@ -152,6 +172,37 @@ class ListItemsView(APIView):
             return _internal_error_response("Failed to update lists", e)
 
 
+class ListItemsBulkView(APIView):
+    """
+    POST — apply album-list membership for many items at once:
+    {"mode": "set" | "add", "items": [{"type", "id", "title", "list_ids"}, ...]}.
+    "set" makes each item's lists exactly its list_ids; "add" only adds. Titles are taken as
+    given (no catalog lookups), so a whole search page can be added in one request.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ser = ListItemsBulkWriteSerializer(data=request.data)
+        if not ser.is_valid():
+            return _validation_error_response(ser)
+        try:
+            result = apply_list_memberships(
+                request.user, ser.validated_data["items"], mode=ser.validated_data["mode"]
+            )
+        except InvalidListIds as e:
+            return _bad_request(str(e))
+        except Exception as e:
+            logger.exception("Failed to bulk update lists for user %s", request.user.id)
+            return _internal_error_response("Failed to update lists", e)
+        return Response(
+            {
+                "added": [{"list_id": l, "type": t, "id": i} for l, t, i in result["added"]],
+                "removed": [{"list_id": l, "type": t, "id": i} for l, t, i in result["removed"]],
+                "retitled": result["retitled"],
+            }
+        )
+
+
 class ListItemsCheckView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -166,21 +217,63 @@ class ListItemsCheckView(APIView):
             return type_error
         list_ids = ListItem.objects.filter(
             list__user=request.user, type=resource_type, discogs_id=str(resource_id)
-        ).values_list("list_id", flat=True)
+        ).order_by("list_id").values_list("list_id", flat=True)
         return Response({"list_ids": list(list_ids)})
 
 
 class ListDetailView(APIView):
+    """
+    GET — a list and its items, newest first, with the user's manual images on the items that have one.
+    Optional keyset pagination: ?limit= (max 200) and ?cursor= (the previous page's next_cursor);
+    each page is one index range scan on (list, added_at, id), however deep. ?include_total=1
+    adds the item count. Without limit/cursor every item is returned.
+    """
     permission_classes = [IsAuthenticated]
 
+    MAX_LIMIT = 200
+
     def get(self, request, list_id):
         list_obj = List.objects.filter(user=request.user, id=list_id).first()
         if not list_obj:
             return Response({"error": "List not found"}, status=status.HTTP_404_NOT_FOUND)
-        items = [
-            {"type": item.type, "id": item.discogs_id, "title": item.title or f"{item.type}-{item.discogs_id}"}
-            for item in list_obj.items.all()
+
+        qs = ListItem.objects.filter(list=list_obj).order_by("-added_at", "-id")
+        paginate = "limit" in request.query_params or "cursor" in request.query_params
+        payload = {"id": list_obj.id, "list_type": list_obj.list_type, "name": list_obj.name}
+        if request.query_params.get("include_total") in ("1", "true"):
+            payload["total"] = qs.count()
+
+        if paginate:
+            cursor = (request.query_params.get("cursor") or "").strip()
+            limit = _parse_optional_int(request.query_params.get("limit"))
+            if limit is None:
+                limit = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 20
+            limit = min(self.MAX_LIMIT, max(1, limit))
+            if cursor:
+                try:
+                    added_at_raw, last_id = _decode_cursor(cursor, 2)
+                    added_at = parse_datetime(added_at_raw)
+                    if added_at is None or not isinstance(last_id, int):
+                        raise ValueError("Invalid cursor")
+                except (TypeError, ValueError):
+                    return _bad_request("Invalid cursor")
+                qs = qs.filter(Q(added_at__lt=added_at) | Q(added_at=added_at, id__lt=last_id))
+            rows = list(qs.values("id", "type", "discogs_id", "title", "added_at")[: limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            payload["next_cursor"] = (
+                _encode_cursor([rows[-1]["added_at"].isoformat(), rows[-1]["id"]]) if has_more else None
+            )
+        else:
+            rows = qs.values("type", "discogs_id", "title")
+
+        payload["items"] = [
+            {
+                "type": row["type"],
+                "id": row["discogs_id"],
+                "title": row["title"] or f"{row['type']}-{row['discogs_id']}",
+            }
+            for row in rows
         ]
-        return Response(
-            {"id": list_obj.id, "list_type": list_obj.list_type, "name": list_obj.name, "items": items}
-        )
+        ImageOverrideMap.for_request(request).apply_to_items(payload["items"])
+        return Response(payload)
@@ -1,5 +1,6 @@
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -7,13 +8,19 @@ from rest_framework.views import APIView
 from spotify.client import artist_image_url_for_musicbrainz_name
 
 from .. import musicbrainz_client as mb
-from ..models import ArtistSpotifyImageLink, ConsumedAlbum, ReleaseGroupImageLink
+from ..models import ConsumedAlbum, ConsumedBackfillJob
+from ..services.background import run_in_background
+from ..services.consumed_backfill import backfill_status, start_backfill
+from ..services.consumed_titles import enrich_consumed_title
+from ..services.image_overrides import ImageOverrideMap
+from ..services.library_changes import consumed_change, record_library_change
+from ..services.library_state import annotate_search_results
+from ..services.upserts import upsert
 from .discogs_artist_image import discogs_artist_image_url
 from .common import (
     _bad_request,
     build_artist_album_list_from_browse,
     build_artist_album_list_from_release_groups,
-    _fetch_display_title_from_catalog,
     _normalize_mb_artist,
     _normalize_mb_recording,
     _normalize_mb_release,
@@ -30,25 +37,18 @@ def _release_group_id_from_release_data(release_data, fallback_id=""):
     return (rg.get("id") or "").strip() or (fallback_id or "").strip()
 
 
-def _apply_manual_album_image(user, release_group_id, normalized):
+def _apply_manual_album_image(overrides, release_group_id, normalized):
     normalized["release_group_id"] = release_group_id or None
-    if not release_group_id:
-        normalized["manual_album_image"] = False
-        return normalized
-    link = ReleaseGroupImageLink.objects.filter(
-        user=user,
-        musicbrainz_release_group_id=release_group_id,
-    ).first()
-    if link:
-        normalized["thumb"] = link.image_url
-        normalized["images"] = [{"uri": link.image_url}]
-        normalized["manual_album_image"] = True
-    else:
-        normalized["manual_album_image"] = False
+    overrides.apply_album_images([normalized], id_key="release_group_id", mark_missing=True)
     return normalized
 
 
 class SearchAPIView(APIView):
+    """
+    GET ?q=&type=artist|album|song — MusicBrainz search.
+    Artist and album results carry the user's manual images (thumb, images and the manual_* flag).
+    ?annotate=1 adds each result's library flags (consumed, in_list, manual_cover) for the user.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -81,6 +81,13 @@ class SearchAPIView(APIView):
         )
         if response.status_code != 200:
             return _upstream_error("MusicBrainz", response.status_code)
+        overrides = ImageOverrideMap.for_request(request)
+        if search_type == "artist":
+            overrides.apply_artist_images(results)
+        elif search_type == "album":
+            overrides.apply_album_images(results, id_key="release_group_id")
+        if request.GET.get("annotate") in ("1", "true"):
+            annotate_search_results(request.user.id, results)
         return Response({"results": results})
 
 
@@ -119,16 +126,15 @@ class ConsumedAlbumView(APIView):
         except Exception:
             consumed = True
             title = ""
-        if consumed:
-            fetched = _fetch_display_title_from_catalog(resource_type, resource_id)
-            if fetched:
-                title = fetched
-        record, _ = ConsumedAlbum.objects.update_or_create(
-            user=request.user,
-            type=resource_type,
-            discogs_id=str(resource_id),
-            defaults={"consumed": consumed, "title": title},
+        record = upsert(
+            ConsumedAlbum,
+            {"user": request.user, "type": resource_type, "discogs_id": str(resource_id)},
+            {"consumed": consumed, "title": title},
         )
+        record_library_change(consumed_change(record))
+        if consumed:
+            # Catalog title lookup is a slow upstream call; patch the row after responding.
+            run_in_background(enrich_consumed_title, record.pk)
         return Response({"consumed": record.consumed})
 
     def put(self, request):
@@ -156,7 +162,9 @@ class ConsumedListView(APIView):
 
     def get(self, request):
         records = list(
-            ConsumedAlbum.objects.filter(user=request.user, consumed=True).values("type", "discogs_id", "title")
+            ConsumedAlbum.objects.filter(user=request.user, consumed=True)
+            .order_by("-id")
+            .values("type", "discogs_id", "title")
         )
         results = []
         for r in records:
@@ -168,17 +176,19 @@ class ConsumedListView(APIView):
 
 
 class ConsumedBackfillView(APIView):
+    """
+    POST — start (or resume) filling consumed albums' titles from the catalog in the background.
+    GET — progress of the user's backfill: status, total, processed, updated, failed.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        updated = 0
-        for rec in ConsumedAlbum.objects.filter(user=request.user, consumed=True):
-            fetched = _fetch_display_title_from_catalog(rec.type, rec.discogs_id)
-            if fetched and (not (rec.title or "").strip() or " - " not in (rec.title or "")):
-                rec.title = fetched
-                rec.save(update_fields=["title"])
-                updated += 1
-        return Response({"updated": updated})
+        job = ConsumedBackfillJob.objects.filter(user=request.user).first()
+        return Response(backfill_status(job))
+
+    def post(self, request):
+        job = start_backfill(request.user)
+        return Response(backfill_status(job), status=status.HTTP_202_ACCEPTED)
 
 
 class DetailAPIView(APIView):
@@ -203,14 +213,22 @@ class DetailAPIView(APIView):
             if rg_browse.status_code == 200:
                 albums = build_artist_album_list_from_release_groups(rg_browse.json())
             normalized = _normalize_mb_artist(artist_data, albums=albums)
-            if not normalized.get("thumb"):
+            overrides = ImageOverrideMap.for_request(request)
+            # One query for the artist's and its members' images, one for the album covers; a
+            # manual image makes the Spotify/Discogs fallbacks unnecessary.
+            manual_url = overrides.artist_images(
+                [resource_id] + [m["id"] for m in normalized["members"]]
+            ).get(resource_id)
+            overrides.apply_artist_images(normalized["members"])
+            overrides.apply_album_images(normalized["albums"])
+            if not normalized.get("thumb") and not manual_url:
                 spotify_url = artist_image_url_for_musicbrainz_name(
                     normalized.get("title") or (artist_data.get("name") or "")
                 )
                 if spotify_url:
                     normalized["thumb"] = spotify_url
                     normalized["images"] = [{"uri": spotify_url}]
-            if not normalized.get("thumb"):
+            if not normalized.get("thumb") and not manual_url:
                 discogs_url = discogs_artist_image_url(
                     normalized.get("title") or (artist_data.get("name") or ""),
                     artist_data,
@@ -218,13 +236,9 @@ class DetailAPIView(APIView):
                 if discogs_url:
                     normalized["thumb"] = discogs_url
                     normalized["images"] = [{"uri": discogs_url}]
-            link = ArtistSpotifyImageLink.objects.filter(
-                user=request.user,
-                musicbrainz_artist_id=resource_id,
-            ).first()
-            if link:
-                normalized["thumb"] = link.image_url
-                normalized["images"] = [{"uri": link.image_url}]
+            if manual_url:
+                normalized["thumb"] = manual_url
+                normalized["images"] = [{"uri": manual_url}]
                 normalized["manual_spotify_artist_image"] = True
             else:
                 normalized["manual_spotify_artist_image"] = False
@@ -251,7 +265,7 @@ class DetailAPIView(APIView):
                     return _upstream_error("MusicBrainz", response.status_code)
             normalized = _normalize_mb_release(release_data)
             normalized = _apply_manual_album_image(
-                request.user, release_group_id, normalized
+                ImageOverrideMap.for_request(request), release_group_id, normalized
             )
             return Response(normalized)
         response = mb.get_recording(resource_id)
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -16,9 +17,29 @@ from ..serializers import (
     ManualSpotifyArtistImageSerializer,
     ManualSpotifyMatchSerializer,
 )
+from ..services.library_changes import (
+    album_image_change,
+    artist_image_change,
+    record_library_change,
+    track_link_change,
+)
+from ..services.upserts import upsert
+from ..track_keys import TrackKeyCollision
 from .common import _bad_request, _validate_required, _validation_error_response
 
 
+def _manual_match_payload(link):
+    return {
+        "track_title": link.track_title,
+        "spotify_track": {
+            "id": link.spotify_track_id,
+            "uri": link.spotify_uri,
+            "name": link.spotify_name,
+            "artists": link.spotify_artists or [],
+        },
+    }
+
+
 class ManualSpotifyMatchesView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -27,20 +48,36 @@ class ManualSpotifyMatchesView(APIView):
         required_error = _validate_required({"release_id": release_id})
         if required_error:
             return required_error
-        links = TrackSpotifyLink.objects.filter(user=request.user, release_id=release_id)
-        matches = [
-            {
-                "track_title": link.track_title,
-                "spotify_track": {
-                    "id": link.spotify_track_id,
-                    "uri": link.spotify_uri,
-                    "name": link.spotify_name,
-                    "artists": link.spotify_artists or [],
-                },
-            }
-            for link in links
-        ]
-        return Response({"matches": matches})
+        links = TrackSpotifyLink.objects.filter(user=request.user, release_id=release_id).order_by("track_title")
+        return Response({"matches": [_manual_match_payload(link) for link in links]})
+
+
+class ManualSpotifyMatchesBatchView(APIView):
+    """
+    GET ?release_ids=a,b,c (up to 200) — manual matches for many releases (a playlist or list)
+    in one query: {"releases": {release_id: [match, ...]}}, every requested id present and each
+    release's matches ordered by track title, as in ManualSpotifyMatchesView.
+    """
+    permission_classes = [IsAuthenticated]
+
+    MAX_RELEASES = 200
+
+    def get(self, request):
+        release_ids = list(
+            dict.fromkeys(i.strip() for i in (request.GET.get("release_ids") or "").split(",") if i.strip())
+        )
+        required_error = _validate_required({"release_ids": release_ids})
+        if required_error:
+            return required_error
+        if len(release_ids) > self.MAX_RELEASES:
+            return _bad_request(f"At most {self.MAX_RELEASES} release_ids per request")
+        releases = {release_id: [] for release_id in release_ids}
+        links = TrackSpotifyLink.objects.filter(user=request.user, release_id__in=release_ids).order_by(
+            "release_id", "track_title"
+        )
+        for link in links:
+            releases[link.release_id].append(_manual_match_payload(link))
+        return Response({"releases": releases})
 
 
 class ManualSpotifyMatchView(APIView):
@@ -65,17 +102,26 @@ class ManualSpotifyMatchView(APIView):
             if isinstance(a, dict)
         ]
 
-        link, _ = TrackSpotifyLink.objects.update_or_create(
-            user=request.user,
-            release_id=release_id,
-            track_title=track_title,
-            defaults={
-                "spotify_track_id": track_id,
-                "spotify_uri": uri[:128] if uri else "",
-                "spotify_name": name[:512] if name else "",
-                "spotify_artists": artists,
-            },
-        )
+        try:
+            with transaction.atomic():
+                link = upsert(
+                    TrackSpotifyLink,
+                    {"user": request.user, "track_key": TrackSpotifyLink.key_for(release_id, track_title)},
+                    {
+                        "spotify_track_id": track_id,
+                        "spotify_uri": uri[:128] if uri else "",
+                        "spotify_name": name[:512] if name else "",
+                        "spotify_artists": artists,
+                    },
+                    create_values={"release_id": release_id, "track_title": track_title},
+                )
+                link.check_stored_identity()
+        except TrackKeyCollision:
+            return Response(
+                {"error": "Another track on your account has the same track key"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        record_library_change(track_link_change(link))
         return Response(
             {
                 "track_title": link.track_title,
@@ -97,11 +143,16 @@ class ManualSpotifyMatchView(APIView):
                 {"error": "Query parameters release_id and track_title are required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        TrackSpotifyLink.objects.filter(
+        deleted, _ = TrackSpotifyLink.objects.filter(
             user=request.user,
+            track_key=TrackSpotifyLink.key_for(release_id, track_title),
+            # A colliding key must not delete another track's link.
             release_id=release_id,
             track_title=track_title,
         ).delete()
+        if deleted:
+            link = TrackSpotifyLink(user=request.user, release_id=release_id, track_title=track_title)
+            record_library_change(track_link_change(link, deleted=True))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -228,15 +279,16 @@ class ManualSpotifyArtistImageView(APIView):
         sid = (ser.validated_data.get("spotify_artist_id") or "").strip()
         did = (ser.validated_data.get("discogs_artist_id") or "").strip()
 
-        link, _ = ArtistSpotifyImageLink.objects.update_or_create(
-            user=request.user,
-            musicbrainz_artist_id=mbid,
-            defaults={
+        link = upsert(
+            ArtistSpotifyImageLink,
+            {"user": request.user, "musicbrainz_artist_id": mbid},
+            {
                 "image_url": image_url,
                 "spotify_artist_id": sid[:64] if sid else "",
                 "discogs_artist_id": did[:64] if did else "",
             },
         )
+        record_library_change(artist_image_change(link))
         return Response(
             {
                 "manual_match": True,
@@ -256,6 +308,8 @@ class ManualSpotifyArtistImageView(APIView):
         ).delete()
         if deleted == 0:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        link = ArtistSpotifyImageLink(user=request.user, musicbrainz_artist_id=mbid)
+        record_library_change(artist_image_change(link, deleted=True))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -382,15 +436,16 @@ class ManualAlbumImageView(APIView):
         sid = (ser.validated_data.get("spotify_album_id") or "").strip()
         did = (ser.validated_data.get("discogs_release_id") or "").strip()
 
-        link, _ = ReleaseGroupImageLink.objects.update_or_create(
-            user=request.user,
-            musicbrainz_release_group_id=rgid,
-            defaults={
+        link = upsert(
+            ReleaseGroupImageLink,
+            {"user": request.user, "musicbrainz_release_group_id": rgid},
+            {
                 "image_url": image_url,
                 "spotify_album_id": sid[:64] if sid else "",
                 "discogs_release_id": did[:64] if did else "",
             },
         )
+        record_library_change(album_image_change(link))
         return Response(
             {
                 "manual_match": True,
@@ -410,4 +465,6 @@ class ManualAlbumImageView(APIView):
         ).delete()
         if deleted == 0:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        link = ReleaseGroupImageLink(user=request.user, musicbrainz_release_group_id=rgid)
+        record_library_change(album_image_change(link, deleted=True))
         return Response(status=status.HTTP_204_NO_CONTENT)
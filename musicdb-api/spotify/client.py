@@ -286,6 +286,38 @@ def search_track(query, artist=None, album=None, limit=5):
     return data.get("tracks", {}).get("items", [])
 
 
+_ISRC_RE = re.compile(r"^[A-Z]{2}[A-Z0-9]{3}\d{7}$")
+
+
+def _normalize_isrc(raw):
+    """Uppercase ISRC without hyphens/spaces (e.g. 'us-rc1-76-00001' → 'USRC17600001'), or '' if invalid."""
+    s = re.sub(r"[\s-]", "", str(raw or "").strip()).upper()
+    return s if _ISRC_RE.match(s) else ""
+
+
+def search_track_by_isrc(isrc):
+    """
+    Exact Spotify lookup by ISRC (search q=isrc:XXXX). Returns the first track object or None.
+
+    Raises ValueError like search_track when Spotify answers with an error status, so
+    callers can report it per track; returns None for invalid ISRCs or no hit.
+    """
+    code = _normalize_isrc(isrc)
+    if not code:
+        return None
+    access_token = _get_access_token()
+    response = requests.get(
+        "https://api.spotify.com/v1/search",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={"q": f"isrc:{code}", "type": "track", "limit": 1},
+        timeout=10,
+    )
+    if response.status_code != 200:
+        raise ValueError(f"Spotify ISRC search failed: {response.status_code}")
+    items = (response.json() or {}).get("tracks", {}).get("items") or []
+    return items[0] if items else None
+
+
 def find_best_match(discogs_title, discogs_artists, spotify_results):
     """
     Find the best matching Spotify track from results.
@@ -540,3 +572,56 @@ def get_spotify_album(spotify_album_id):
     if response.status_code != 200:
         return None
     return response.json()
+
+
+# Max IDs per request for Spotify's multi-ID lookup endpoints
+SPOTIFY_BATCH_LIMITS = {"tracks": 50, "artists": 50, "albums": 20}
+
+
+def _get_several(kind, ids, params=None):
+    """
+    GET /v1/{kind}?ids=... (plus any extra params) in chunks of SPOTIFY_BATCH_LIMITS[kind].
+    Returns {requested_id: object or None}; Spotify answers null for unknown IDs.
+    Raises ValueError on credential or HTTP errors so batch jobs can stop and resume.
+    """
+    unique_ids = list(dict.fromkeys(i.strip() for i in ids if i and i.strip()))
+    if not unique_ids:
+        return {}
+    access_token = _get_access_token()
+    size = SPOTIFY_BATCH_LIMITS[kind]
+    out = {}
+    for start in range(0, len(unique_ids), size):
+        chunk = unique_ids[start:start + size]
+        response = requests.get(
+            f"https://api.spotify.com/v1/{kind}",
+            headers={"Authorization": f"Bearer {access_token}"},
+            params={**(params or {}), "ids": ",".join(chunk)},
+            timeout=10,
+        )
+        if response.status_code != 200:
+            raise ValueError(f"Spotify {kind} lookup failed: {response.status_code}")
+        objects = (response.json() or {}).get(kind) or []
+        for requested_id, obj in zip(chunk, objects):
+            out[requested_id] = obj
+    return out
+
+
+def get_spotify_tracks(track_ids, market=None):
+    """
+    GET /v1/tracks?ids=&market= (50 per call). Returns {track_id: track or None}.
+
+    The market (default settings.SPOTIFY_MARKET) turns on track relinking: a track that is not
+    playable there comes back as its playable substitute, with the requested ID in linked_from.
+    """
+    market = market or getattr(settings, "SPOTIFY_MARKET", "US")
+    return _get_several("tracks", track_ids, params={"market": market})
+
+
+def get_spotify_artists(artist_ids):
+    """GET /v1/artists?ids= (50 per call). Returns {artist_id: artist or None}."""
+    return _get_several("artists", artist_ids)
+
+
+def get_spotify_albums(album_ids):
+    """GET /v1/albums?ids= (20 per call). Returns {album_id: album or None}."""
+    return _get_several("albums", album_ids)
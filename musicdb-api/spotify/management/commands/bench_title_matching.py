@@ -0,0 +1,34 @@
+"""
+python manage.py bench_title_matching [--size N] [--repeat R] [--seed S]
+
+Offline latency/throughput report for the Spotify title-matching helpers.
+Fails if any helper output drifts from the pinned corpus in spotify.title_match_bench.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from spotify.title_match_bench import run_benchmarks, verify_corpus
+
+
+class Command(BaseCommand):
+    help = "Benchmark Spotify title-matching helpers against the offline title corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=5000, help="Synthetic titles to generate")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per helper (best is reported)")
+        parser.add_argument("--seed", type=int, default=0, help="Synthetic corpus seed")
+
+    def handle(self, *args, **options):
+        mismatches = verify_corpus()
+        for name, title, expected, actual in mismatches:
+            self.stderr.write(f"{name}({title!r}): expected {expected!r}, got {actual!r}")
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} helper output(s) differ from the pinned corpus")
+        self.stdout.write("Corpus check: OK")
+
+        rows = run_benchmarks(size=options["size"], repeat=options["repeat"], seed=options["seed"])
+        self.stdout.write(f"{'helper':<28}{'calls':>8}{'total ms':>12}{'µs/call':>12}{'calls/s':>12}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['name']:<28}{row['calls']:>8}{row['total_s'] * 1000:>12.2f}"
+                f"{row['per_call_us']:>12.2f}{row['calls_per_s']:>12.0f}"
+            )
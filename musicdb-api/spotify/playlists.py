@@ -0,0 +1,344 @@
+"""
+Spotify playlist fetching for the user-token playlist views, with track lists cached per
+(user, playlist_id, snapshot_id).
+
+Spotify changes a playlist's snapshot_id whenever its contents change, so a cached track list
+is valid for as long as its snapshot is current. The playlist listing records the latest
+snapshot of every playlist it sees; opening an unchanged playlist afterwards is answered from
+cache without any Spotify requests.
+
+429s are retried after Spotify's Retry-After, but the waits come out of one backoff budget
+per API request (backoff_budget()), kept well below gunicorn's 30 s worker timeout so the
+client still gets a 502 instead of a killed worker.
+"""
+import base64
+import binascii
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+SPOTIFY_API_BASE = "https://api.spotify.com/v1"
+
+# Track lists are immutable per snapshot; the TTL only bounds how long stale snapshots linger.
+DEFAULT_PLAYLIST_CACHE_TTL = 60 * 60 * 24
+
+PLAYLIST_META_FIELDS = "id,name,owner(id,display_name),description,images,snapshot_id"
+PLAYLIST_TRACK_FIELDS = "items(track(id,name,artists,album(name),uri,duration_ms,preview_url)),next,total"
+
+# Spotify's maximum page size for playlist items, and how many pages are requested at once.
+TRACK_PAGE_SIZE = 100
+TRACK_PAGE_WORKERS = 4
+
+# 429 handling: honour Retry-After (seconds), give up after MAX_RETRIES or once the waits would
+# exceed MAX_BACKOFF_SECONDS in total.
+MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER = 1
+MAX_BACKOFF_SECONDS = 10
+
+
+class SpotifyAPIError(Exception):
+    """Non-200 response from the Spotify Web API."""
+
+    def __init__(self, status_code, details=""):
+        super().__init__(f"Spotify API error: {status_code}")
+        self.status_code = status_code
+        self.details = details
+
+
+def _cache_ttl():
+    return getattr(settings, "SPOTIFY_PLAYLIST_CACHE_TTL", DEFAULT_PLAYLIST_CACHE_TTL)
+
+
+def _snapshots_key(user_id):
+    return f"spotify:playlist_snapshots:{user_id}"
+
+
+def _tracks_key(user_id, playlist_id, snapshot_id):
+    return f"spotify:playlist_tracks:{user_id}:{playlist_id}:{snapshot_id}"
+
+
+class _BackoffBudget:
+    """Seconds of 429 backoff left; shared by the threads fetching pages for one request."""
+
+    def __init__(self, seconds=MAX_BACKOFF_SECONDS):
+        self.remaining = seconds
+        self._lock = threading.Lock()
+
+    def take(self, seconds):
+        """Reserve `seconds` of waiting; False (and nothing reserved) when they do not fit."""
+        with self._lock:
+            if seconds > self.remaining:
+                return False
+            self.remaining -= seconds
+            return True
+
+
+_current_budget = contextvars.ContextVar("spotify_backoff_budget", default=None)
+
+
+@contextmanager
+def _using_budget(budget):
+    token = _current_budget.set(budget)
+    try:
+        yield
+    finally:
+        _current_budget.reset(token)
+
+
+def backoff_budget(seconds=MAX_BACKOFF_SECONDS):
+    """Share one backoff budget across every Spotify call made in the block."""
+    return _using_budget(_BackoffBudget(seconds))
+
+
+def _retry_after_seconds(response):
+    try:
+        return max(0, int(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)))
+    except (AttributeError, TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def _get(url, spotify_token, params=None, budget=None):
+    """
+    GET a Spotify endpoint, sleeping through 429s as Spotify's Retry-After asks. Waits come out
+    of `budget`, else the active backoff_budget(), else a budget for this call alone.
+    """
+    budget = budget or _current_budget.get() or _BackoffBudget()
+    for attempt in range(MAX_RETRIES + 1):
+        response = requests.get(
+            url,
+            headers={"Authorization": f"Bearer {spotify_token}"},
+            params=params,
+            timeout=10,
+        )
+        if response.status_code != 429:
+            break
+        wait = _retry_after_seconds(response)
+        if attempt == MAX_RETRIES or not budget.take(wait):
+            break
+        time.sleep(wait)
+    if response.status_code != 200:
+        raise SpotifyAPIError(response.status_code, response.text)
+    return response.json()
+
+
+def _owner_name(owner):
+    owner = owner or {}
+    return owner.get("display_name") or owner.get("id")
+
+
+def normalize_playlist(playlist):
+    """Shape one item of /v1/me/playlists for the frontend."""
+    return {
+        "id": playlist.get("id"),
+        "name": playlist.get("name"),
+        "owner": _owner_name(playlist.get("owner")),
+        "collaborative": playlist.get("collaborative", False),
+        "public": playlist.get("public", False),
+        "tracks_count": (playlist.get("tracks") or {}).get("total", 0),
+        "images": playlist.get("images", []),
+        "snapshot_id": playlist.get("snapshot_id"),
+    }
+
+
+def normalize_playlist_track(track):
+    """Shape a playlist item's track; None for removed/unavailable tracks."""
+    if not track or not track.get("id"):
+        return None
+    return {
+        "id": track.get("id"),
+        "name": track.get("name"),
+        "artists": [{"name": artist.get("name")} for artist in track.get("artists", [])],
+        "album": (track.get("album") or {}).get("name"),
+        "uri": track.get("uri"),
+        "duration_ms": track.get("duration_ms"),
+        "preview_url": track.get("preview_url"),
+    }
+
+
+def fetch_playlists(spotify_token):
+    """All of the user's playlists (following `next`), normalized."""
+    playlists = []
+    url = f"{SPOTIFY_API_BASE}/me/playlists"
+    while url:
+        data = _get(url, spotify_token)
+        playlists.extend(normalize_playlist(p) for p in data.get("items", []))
+        url = data.get("next")
+    return playlists
+
+
+def fetch_playlist_meta(spotify_token, playlist_id):
+    """Playlist header fields (no track items) including the current snapshot_id."""
+    data = _get(
+        f"{SPOTIFY_API_BASE}/playlists/{playlist_id}",
+        spotify_token,
+        params={"fields": PLAYLIST_META_FIELDS},
+    )
+    return {
+        "id": data.get("id"),
+        "name": data.get("name"),
+        "owner": _owner_name(data.get("owner")),
+        "description": data.get("description"),
+        "images": data.get("images", []),
+        "snapshot_id": data.get("snapshot_id"),
+    }
+
+
+def _page_tracks(data):
+    tracks = []
+    for item in data.get("items", []):
+        track = normalize_playlist_track((item or {}).get("track"))
+        if track:
+            tracks.append(track)
+    return tracks
+
+
+def fetch_playlist_tracks(spotify_token, playlist_id):
+    """
+    Every track in the playlist, in playlist order; removed tracks are skipped.
+
+    The first page reports `total`, so the remaining offsets are fetched concurrently
+    (TRACK_PAGE_WORKERS at a time) and stitched back in order. Responses without a
+    `total` fall back to following `next`.
+    """
+    url = f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/tracks"
+    # Pool threads do not see the caller's context, so the budget is passed explicitly.
+    budget = _current_budget.get() or _BackoffBudget()
+
+    def fetch_page(offset):
+        return _get(
+            url,
+            spotify_token,
+            params={"fields": PLAYLIST_TRACK_FIELDS, "offset": offset, "limit": TRACK_PAGE_SIZE},
+            budget=budget,
+        )
+
+    first = fetch_page(0)
+    tracks = _page_tracks(first)
+    total = first.get("total")
+    if not isinstance(total, int):
+        next_url = first.get("next")
+        while next_url:
+            data = _get(next_url, spotify_token, budget=budget)
+            tracks.extend(_page_tracks(data))
+            next_url = data.get("next")
+        return tracks
+
+    offsets = range(TRACK_PAGE_SIZE, total, TRACK_PAGE_SIZE)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=min(TRACK_PAGE_WORKERS, len(offsets))) as pool:
+            # map() yields in submission order, so pages come back in playlist order.
+            for data in pool.map(fetch_page, offsets):
+                tracks.extend(_page_tracks(data))
+    return tracks
+
+
+def encode_cursor(offset):
+    """Opaque cursor for the playlist item offset to resume from."""
+    return base64.urlsafe_b64encode(f"o:{int(offset)}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Offset from encode_cursor(); raises ValueError for anything else."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    prefix, _, value = raw.partition(":")
+    if prefix != "o" or not value.isdigit():
+        raise ValueError("Invalid cursor")
+    return int(value)
+
+
+def fetch_playlist_track_window(spotify_token, playlist_id, offset, limit):
+    """
+    One window of playlist items starting at `offset` (limit <= TRACK_PAGE_SIZE).
+    Returns (tracks, total, next_offset); next_offset is None past the end.
+    Removed tracks are skipped, so a window can hold fewer than `limit` tracks.
+    """
+    data = _get(
+        f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/tracks",
+        spotify_token,
+        params={"fields": PLAYLIST_TRACK_FIELDS, "offset": offset, "limit": limit},
+    )
+    total = data.get("total")
+    if not isinstance(total, int):
+        total = offset + len(data.get("items", []))
+    next_offset = offset + limit if offset + limit < total else None
+    return _page_tracks(data), total, next_offset
+
+
+def iter_playlist_track_pages(spotify_token, playlist_id):
+    """
+    Yield normalized tracks one upstream page at a time, in playlist order.
+
+    Pages are requested sequentially so only one page is held at a time; use this when the
+    caller streams tracks out instead of collecting the whole playlist. Every page draws on the
+    backoff budget active when the first page is requested.
+    """
+    budget = _current_budget.get() or _BackoffBudget()
+    offset = 0
+    while offset is not None:
+        with _using_budget(budget):
+            tracks, _total, offset = fetch_playlist_track_window(
+                spotify_token, playlist_id, offset, TRACK_PAGE_SIZE
+            )
+        yield tracks
+
+
+def remember_snapshots(user_id, playlists):
+    """Record the latest snapshot_id per playlist, as seen in the user's playlist listing."""
+    snapshots = {p["id"]: p["snapshot_id"] for p in playlists if p.get("id") and p.get("snapshot_id")}
+    cache.set(_snapshots_key(user_id), snapshots, timeout=_cache_ttl())
+
+
+def known_snapshot(user_id, playlist_id):
+    """snapshot_id of the playlist as of the user's last playlist listing, or None."""
+    return (cache.get(_snapshots_key(user_id)) or {}).get(playlist_id)
+
+
+def get_cached_playlist(user_id, playlist_id, snapshot_id):
+    """Cached playlist payload (meta + tracks) for this snapshot, or None."""
+    if not snapshot_id:
+        return None
+    return cache.get(_tracks_key(user_id, playlist_id, snapshot_id))
+
+
+def cache_playlist(user_id, playlist_id, payload):
+    """Store a playlist payload under its snapshot. Payloads without a snapshot are not cached."""
+    snapshot_id = payload.get("snapshot_id")
+    if snapshot_id:
+        cache.set(_tracks_key(user_id, playlist_id, snapshot_id), payload, timeout=_cache_ttl())
+
+
+def get_playlist_with_tracks(user_id, spotify_token, playlist_id, snapshot_id=None):
+    """
+    Playlist meta plus tracks, served from cache when the snapshot is unchanged.
+
+    snapshot_id: the client's view of the current snapshot (from the playlist listing). When
+    omitted, the snapshot recorded by the last listing is used. A cache hit on that snapshot
+    costs no Spotify requests; otherwise the playlist meta is fetched to learn the live
+    snapshot, and track pages are only fetched if that snapshot is not cached either. After a
+    track fetch the snapshot is read again: if the playlist was edited in between, the tracks
+    may not match the first snapshot, so the payload is returned but not cached.
+    Raises SpotifyAPIError / requests.RequestException.
+    """
+    snapshot_id = snapshot_id or known_snapshot(user_id, playlist_id)
+    cached = get_cached_playlist(user_id, playlist_id, snapshot_id)
+    if cached is not None:
+        return cached
+
+    meta = fetch_playlist_meta(spotify_token, playlist_id)
+    cached = get_cached_playlist(user_id, playlist_id, meta.get("snapshot_id"))
+    if cached is not None:
+        return cached
+
+    payload = {**meta, "tracks": fetch_playlist_tracks(spotify_token, playlist_id)}
+    if fetch_playlist_meta(spotify_token, playlist_id).get("snapshot_id") == meta.get("snapshot_id"):
+        cache_playlist(user_id, playlist_id, payload)
+    return payload
@@ -0,0 +1,112 @@
+"""Tests for Spotify playlist paging helpers (HTTP mocked)."""
+
+import threading
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+from spotify import playlists
+from spotify.playlists import SpotifyAPIError, decode_cursor, encode_cursor, fetch_playlist_tracks, fetch_playlists
+
+
+def _page(offset, count, total):
+    return {
+        "items": [
+            {"track": {"id": f"t{i}", "name": f"Track {i}", "artists": [], "album": {"name": "A"}}}
+            for i in range(offset, min(offset + count, total))
+        ],
+        "next": None,
+        "total": total,
+    }
+
+
+class FetchPlaylistTracksTests(SimpleTestCase):
+    @patch("spotify.playlists.requests.get")
+    def test_remaining_offsets_fetched_and_stitched_in_order(self, mock_get):
+        total = 1050
+        seen_offsets = []
+        lock = threading.Lock()
+
+        def get_side_effect(url, params=None, **kwargs):
+            with lock:
+                seen_offsets.append(params["offset"])
+            return Mock(status_code=200, json=lambda: _page(params["offset"], params["limit"], total))
+
+        mock_get.side_effect = get_side_effect
+        tracks = fetch_playlist_tracks("tok", "pl")
+
+        self.assertEqual([t["id"] for t in tracks], [f"t{i}" for i in range(total)])
+        self.assertEqual(sorted(seen_offsets), list(range(0, total, 100)))
+        self.assertEqual(seen_offsets[0], 0)
+
+    @patch("spotify.playlists.requests.get")
+    def test_single_page_playlist_makes_one_request(self, mock_get):
+        mock_get.return_value = Mock(status_code=200, json=lambda: _page(0, 100, 3))
+        self.assertEqual(len(fetch_playlist_tracks("tok", "pl")), 3)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("spotify.playlists.time.sleep")
+    @patch("spotify.playlists.requests.get")
+    def test_429_waits_for_retry_after_then_succeeds(self, mock_get, mock_sleep):
+        throttled = Mock(status_code=429, headers={"Retry-After": "2"}, text="slow down")
+        ok = Mock(status_code=200, json=lambda: _page(0, 100, 1))
+        mock_get.side_effect = [throttled, ok]
+        self.assertEqual(len(fetch_playlist_tracks("tok", "pl")), 1)
+        mock_sleep.assert_called_once_with(2)
+
+    @patch("spotify.playlists.time.sleep")
+    @patch("spotify.playlists.requests.get")
+    def test_429_with_long_retry_after_raises(self, mock_get, mock_sleep):
+        mock_get.return_value = Mock(
+            status_code=429, headers={"Retry-After": str(playlists.MAX_BACKOFF_SECONDS + 1)}, text=""
+        )
+        with self.assertRaises(SpotifyAPIError) as ctx:
+            fetch_playlist_tracks("tok", "pl")
+        self.assertEqual(ctx.exception.status_code, 429)
+        mock_sleep.assert_not_called()
+
+    @patch("spotify.playlists.time.sleep")
+    @patch("spotify.playlists.requests.get")
+    def test_429_waits_share_one_budget_per_request(self, mock_get, mock_sleep):
+        wait = playlists.MAX_BACKOFF_SECONDS // 2 + 1
+        throttled = Mock(status_code=429, headers={"Retry-After": str(wait)}, text="")
+        ok = Mock(status_code=200, json=lambda: {"items": [], "next": None})
+        mock_get.side_effect = [throttled, ok, throttled]
+        with playlists.backoff_budget():
+            fetch_playlists("tok")
+            with self.assertRaises(SpotifyAPIError) as ctx:
+                fetch_playlists("tok")
+        self.assertEqual(ctx.exception.status_code, 429)
+        mock_sleep.assert_called_once_with(wait)
+
+    @patch("spotify.playlists.requests.get")
+    def test_error_on_later_page_raises(self, mock_get):
+        def get_side_effect(url, params=None, **kwargs):
+            if params["offset"] == 200:
+                return Mock(status_code=500, text="boom")
+            return Mock(status_code=200, json=lambda: _page(params["offset"], 100, 300))
+
+        mock_get.side_effect = get_side_effect
+        with self.assertRaises(SpotifyAPIError):
+            fetch_playlist_tracks("tok", "pl")
+
+    @patch("spotify.playlists.requests.get")
+    def test_missing_total_falls_back_to_next_links(self, mock_get):
+        first = {"items": [{"track": {"id": "a", "artists": []}}], "next": "https://next"}
+        second = {"items": [{"track": {"id": "b", "artists": []}}], "next": None}
+        mock_get.side_effect = [
+            Mock(status_code=200, json=lambda: first),
+            Mock(status_code=200, json=lambda: second),
+        ]
+        self.assertEqual([t["id"] for t in fetch_playlist_tracks("tok", "pl")], ["a", "b"])
+
+
+class PlaylistCursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        for offset in (0, 100, 9900):
+            self.assertEqual(decode_cursor(encode_cursor(offset)), offset)
+
+    def test_rejects_garbage(self):
+        for cursor in ("", "!!!", "eDox", encode_cursor(5)[:-1] + "A"):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
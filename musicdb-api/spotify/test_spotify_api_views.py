@@ -1,8 +1,10 @@
 """Tests for Spotify match/search and playlists API views (HTTP mocked)."""
 
+import json
 from unittest.mock import Mock, patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -48,6 +50,78 @@ class MatchTracksAPITests(TestCase):
         self.assertEqual(matches[0]["spotify_track"]["id"], "t1")
         mock_search.assert_called()
 
+    @patch("spotify.views.search_track")
+    @patch("spotify.views.search_track_by_isrc")
+    def test_isrc_hit_skips_fuzzy_search(self, mock_isrc, mock_search):
+        mock_isrc.return_value = {"name": "Song", "id": "isrc-hit"}
+
+        res = self.client.post(
+            "/api/spotify/match-tracks/",
+            {"tracks": [{"title": "Song", "artists": ["Band"], "isrc": "USRC17600001"}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["matches"][0]["spotify_track"]["id"], "isrc-hit")
+        mock_isrc.assert_called_once_with("USRC17600001")
+        mock_search.assert_not_called()
+
+    @patch("spotify.views.search_track")
+    @patch("spotify.views.find_best_match")
+    @patch("spotify.views.search_track_by_isrc")
+    def test_isrc_miss_falls_back_to_fuzzy_search(self, mock_isrc, mock_find, mock_search):
+        mock_isrc.return_value = None
+        mock_search.return_value = [{"name": "Song", "artists": [{"name": "Band"}], "id": "t1"}]
+        mock_find.return_value = {"name": "Song", "id": "t1"}
+
+        res = self.client.post(
+            "/api/spotify/match-tracks/",
+            {"tracks": [{"title": "Song", "artists": ["Band"], "isrc": "USRC17600001"}]},
+            format="json",
+        )
+        self.assertEqual(res.json()["matches"][0]["spotify_track"]["id"], "t1")
+        mock_search.assert_called_once()
+
+    @patch("spotify.views.search_track")
+    @patch("spotify.views.find_best_match")
+    @patch("spotify.views.search_track_by_isrc")
+    def test_isrc_lookup_error_falls_back_to_fuzzy_search(self, mock_isrc, mock_find, mock_search):
+        mock_isrc.side_effect = ValueError("Spotify ISRC search failed: 429")
+        mock_search.return_value = [{"name": "Song", "artists": [{"name": "Band"}], "id": "t1"}]
+        mock_find.return_value = {"name": "Song", "id": "t1"}
+
+        res = self.client.post(
+            "/api/spotify/match-tracks/",
+            {"tracks": [{"title": "Song", "artists": ["Band"], "isrc": "USRC17600001"}]},
+            format="json",
+        )
+        match = res.json()["matches"][0]
+        self.assertEqual(match["spotify_track"]["id"], "t1")
+        self.assertNotIn("error", match)
+        mock_search.assert_called_once()
+
+    @patch("spotify.views.search_track")
+    @patch("spotify.views.search_track_by_isrc")
+    def test_non_string_isrc_is_coerced(self, mock_isrc, mock_search):
+        mock_isrc.return_value = {"name": "Song", "id": "isrc-hit"}
+        res = self.client.post(
+            "/api/spotify/match-tracks/",
+            {"tracks": [{"title": "Song", "artists": ["Band"], "isrc": 12345}]},
+            format="json",
+        )
+        self.assertEqual(res.json()["matches"][0]["spotify_track"]["id"], "isrc-hit")
+        mock_isrc.assert_called_once_with("12345")
+
+    @patch("spotify.views.search_track")
+    @patch("spotify.views.search_track_by_isrc")
+    def test_tracks_without_isrc_never_call_isrc_lookup(self, mock_isrc, mock_search):
+        mock_search.return_value = []
+        self.client.post(
+            "/api/spotify/match-tracks/",
+            {"tracks": [{"title": "Song", "artists": []}]},
+            format="json",
+        )
+        mock_isrc.assert_not_called()
+
 
 class SpotifySearchViewTests(TestCase):
     def setUp(self):
@@ -98,6 +172,7 @@ class SpotifyPlaylistsViewTests(TestCase):
             username="plu", email="pl@example.com", password="pw"
         )
         self.client = APIClient()
+        cache.clear()
 
     def test_missing_token_returns_400_when_force_authenticated(self):
         """JWT is satisfied via force_authenticate; view still requires Bearer token string for Spotify."""
@@ -132,6 +207,14 @@ class SpotifyPlaylistsViewTests(TestCase):
         self.assertEqual(len(playlists), 1)
         self.assertEqual(playlists[0]["id"], "pl1")
 
+    @patch("spotify.views.requests.get")
+    def test_playlists_upstream_error_returns_502(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        mock_get.return_value = Mock(status_code=401, text="expired")
+        res = self.client.get("/api/spotify/playlists/", HTTP_AUTHORIZATION="Bearer spotify-fake-token")
+        self.assertEqual(res.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertEqual(res.json()["details"], "expired")
+
 
 class SpotifyPlaylistTracksViewTests(TestCase):
     def setUp(self):
@@ -139,6 +222,7 @@ class SpotifyPlaylistTracksViewTests(TestCase):
             username="pltu", email="plt@example.com", password="pw"
         )
         self.client = APIClient()
+        cache.clear()
 
     def test_missing_token_returns_400(self):
         self.client.force_authenticate(user=self.user)
@@ -189,3 +273,219 @@ class SpotifyPlaylistTracksViewTests(TestCase):
         self.assertEqual(body["id"], "abc")
         self.assertEqual(len(body.get("tracks", [])), 1)
         self.assertEqual(body["tracks"][0]["name"], "Track 1")
+
+    def _mock_spotify(self, mock_get, snapshot_id="snap1"):
+        playlist_meta = {
+            "id": "abc",
+            "name": "PL",
+            "owner": {"display_name": "O"},
+            "description": "",
+            "images": [],
+            "snapshot_id": snapshot_id,
+        }
+        listing = {
+            "items": [{"id": "abc", "name": "PL", "owner": {"id": "o"}, "snapshot_id": snapshot_id}],
+            "next": None,
+        }
+        tracks_page = {
+            "items": [
+                {"track": {"id": "tr1", "name": "Track 1", "artists": [{"name": "A"}], "album": {"name": "X"}}},
+                {"track": None},
+            ],
+            "next": None,
+        }
+
+        def get_side_effect(url, **kwargs):
+            if url.endswith("/me/playlists"):
+                return Mock(status_code=200, json=lambda: listing)
+            if url.endswith("/tracks"):
+                return Mock(status_code=200, json=lambda: tracks_page)
+            return Mock(status_code=200, json=lambda: playlist_meta)
+
+        mock_get.side_effect = get_side_effect
+
+    def _track_page_calls(self, mock_get):
+        return [c for c in mock_get.call_args_list if str(c.args[0]).endswith("/tracks")]
+
+    def _get_tracks(self, query=""):
+        return self.client.get(
+            f"/api/spotify/playlists/abc/tracks/{query}",
+            HTTP_AUTHORIZATION="Bearer spotify-fake-token",
+        )
+
+    @patch("spotify.views.requests.get")
+    def test_unchanged_snapshot_served_from_cache_without_track_fetches(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        self._mock_spotify(mock_get)
+        first = self._get_tracks()
+        self.assertEqual(first.json()["snapshot_id"], "snap1")
+        self.assertEqual(len(self._track_page_calls(mock_get)), 1)
+
+        second = self._get_tracks()
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json()["tracks"], first.json()["tracks"])
+        self.assertEqual(len(self._track_page_calls(mock_get)), 1)
+
+    @patch("spotify.views.requests.get")
+    def test_snapshot_from_listing_skips_all_upstream_calls(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        self._mock_spotify(mock_get)
+        self._get_tracks()
+        self.client.get("/api/spotify/playlists/", HTTP_AUTHORIZATION="Bearer spotify-fake-token")
+        mock_get.reset_mock()
+
+        self.assertEqual(self._get_tracks().status_code, status.HTTP_200_OK)
+        self.assertEqual(self._get_tracks("?snapshot_id=snap1").status_code, status.HTTP_200_OK)
+        mock_get.assert_not_called()
+
+    @patch("spotify.views.requests.get")
+    def test_changed_snapshot_refetches_tracks(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        self._mock_spotify(mock_get, snapshot_id="snap1")
+        self._get_tracks()
+        self._mock_spotify(mock_get, snapshot_id="snap2")
+        res = self._get_tracks("?snapshot_id=snap2")
+        self.assertEqual(res.json()["snapshot_id"], "snap2")
+        self.assertEqual(len(self._track_page_calls(mock_get)), 2)
+
+    @patch("spotify.views.requests.get")
+    def test_playlist_edited_during_fetch_is_not_cached(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        self._mock_spotify(mock_get, snapshot_id="snap1")
+        fetch = mock_get.side_effect
+        meta_snapshots = iter(["snap1", "snap2"])
+
+        def edited_between_requests(url, **kwargs):
+            res = fetch(url, **kwargs)
+            if "/playlists/abc" in url and not url.endswith("/tracks"):
+                body = {**res.json(), "snapshot_id": next(meta_snapshots, "snap2")}
+                return Mock(status_code=200, json=lambda: body)
+            return res
+
+        mock_get.side_effect = edited_between_requests
+        self.assertEqual(self._get_tracks().status_code, status.HTTP_200_OK)
+        self._get_tracks("?snapshot_id=snap1")
+        self.assertEqual(len(self._track_page_calls(mock_get)), 2)
+
+    @patch("spotify.views.requests.get")
+    def test_cache_is_per_user(self, mock_get):
+        self.client.force_authenticate(user=self.user)
+        self._mock_spotify(mock_get)
+        self._get_tracks("?snapshot_id=snap1")
+        other = get_user_model().objects.create_user(username="pltu2", email="p2@example.com", password="pw")
+        self.client.force_authenticate(user=other)
+        self._get_tracks("?snapshot_id=snap1")
+        self.assertEqual(len(self._track_page_calls(mock_get)), 2)
+
+
+def _numbered_tracks_page(offset, limit, total):
+    return {
+        "items": [
+            {"track": {"id": f"t{i}", "name": f"Track {i}", "artists": [], "album": {"name": "A"}}}
+            for i in range(offset, min(offset + limit, total))
+        ],
+        "next": None,
+        "total": total,
+    }
+
+
+class SpotifyPlaylistTracksWindowTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="plwu", email="plw@example.com", password="pw"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def _get(self, query):
+        return self.client.get(
+            f"/api/spotify/playlists/abc/tracks/{query}",
+            HTTP_AUTHORIZATION="Bearer spotify-fake-token",
+        )
+
+    @patch("spotify.views.requests.get")
+    def test_cursor_walks_playlist_in_windows(self, mock_get):
+        mock_get.side_effect = lambda url, params=None, **kw: Mock(
+            status_code=200,
+            json=lambda: _numbered_tracks_page(params["offset"], params["limit"], 5),
+        )
+        ids = []
+        res = self._get("?limit=2")
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            body = res.json()
+            self.assertEqual(body["total"], 5)
+            ids.extend(t["id"] for t in body["tracks"])
+            if not body["next_cursor"]:
+                break
+            res = self._get(f"?limit=2&cursor={body['next_cursor']}")
+        self.assertEqual(ids, ["t0", "t1", "t2", "t3", "t4"])
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("spotify.views.requests.get")
+    def test_limit_is_clamped_to_spotify_page_size(self, mock_get):
+        mock_get.return_value = Mock(status_code=200, json=lambda: _numbered_tracks_page(0, 100, 1))
+        self._get("?limit=5000")
+        self.assertEqual(mock_get.call_args.kwargs["params"]["limit"], 100)
+
+    @patch("spotify.views.requests.get")
+    def test_invalid_cursor_returns_400(self, mock_get):
+        res = self._get("?cursor=not-a-cursor")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_get.assert_not_called()
+
+
+class SpotifyPlaylistTracksStreamViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="plsu", email="pls@example.com", password="pw"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self):
+        return self.client.get(
+            "/api/spotify/playlists/abc/tracks/stream/",
+            HTTP_AUTHORIZATION="Bearer spotify-fake-token",
+        )
+
+    @patch("spotify.views.requests.get")
+    def test_streams_header_then_one_track_per_line(self, mock_get):
+        def get_side_effect(url, params=None, **kwargs):
+            if url.endswith("/tracks"):
+                return Mock(
+                    status_code=200,
+                    json=lambda: _numbered_tracks_page(params["offset"], params["limit"], 150),
+                )
+            return Mock(status_code=200, json=lambda: {"id": "abc", "name": "PL", "snapshot_id": "s1"})
+
+        mock_get.side_effect = get_side_effect
+        res = self._get()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(lines[0]["name"], "PL")
+        self.assertEqual(lines[0]["snapshot_id"], "s1")
+        self.assertEqual([t["id"] for t in lines[1:]], [f"t{i}" for i in range(150)])
+
+    @patch("spotify.views.requests.get")
+    def test_upstream_error_before_streaming_returns_502(self, mock_get):
+        mock_get.return_value = Mock(status_code=404, text="not found")
+        res = self._get()
+        self.assertEqual(res.status_code, status.HTTP_502_BAD_GATEWAY)
+
+    @patch("spotify.views.requests.get")
+    def test_upstream_error_mid_stream_ends_with_error_line(self, mock_get):
+        def get_side_effect(url, params=None, **kwargs):
+            if url.endswith("/tracks"):
+                if params["offset"] > 0:
+                    return Mock(status_code=500, text="boom")
+                return Mock(status_code=200, json=lambda: _numbered_tracks_page(0, 100, 250))
+            return Mock(status_code=200, json=lambda: {"id": "abc", "name": "PL"})
+
+        mock_get.side_effect = get_side_effect
+        res = self._get()
+        lines = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(len(lines), 102)
+        self.assertIn("error", lines[-1])
@@ -3,12 +3,14 @@
 from unittest.mock import Mock, patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import SpotifyUserToken
+from .user_tokens import cache_access_token
 
 
 class SpotifyStoreRefreshTokenTests(TestCase):
@@ -20,6 +22,7 @@ class SpotifyStoreRefreshTokenTests(TestCase):
         refresh = RefreshToken.for_user(self.user)
         self.client = APIClient()
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+        cache.clear()
 
     def test_store_refresh_token(self):
         res = self.client.post(
@@ -66,6 +69,7 @@ class SpotifyRefreshAccessTokenTests(TestCase):
         refresh = RefreshToken.for_user(self.user)
         self.client = APIClient()
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(refresh.access_token)}")
+        cache.clear()
 
     def test_no_stored_token_returns_404(self):
         res = self.client.post("/api/spotify/refresh/")
@@ -125,3 +129,57 @@ class SpotifyRefreshAccessTokenTests(TestCase):
         client = APIClient()
         res = client.post("/api/spotify/refresh/")
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(SPOTIFY_CLIENT_ID="cid", SPOTIFY_CLIENT_SECRET="secret")
+    @patch("spotify.views.requests.post")
+    def test_minted_token_is_cached_per_user(self, mock_post):
+        SpotifyUserToken.objects.create(user=self.user, refresh_token="stored-rt")
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=lambda: {"access_token": "fresh-at", "expires_in": 3600},
+        )
+        self.client.post("/api/spotify/refresh/")
+        res = self.client.post("/api/spotify/refresh/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["access_token"], "fresh-at")
+        self.assertLessEqual(res.json()["expires_in"], 3600)
+        self.assertEqual(mock_post.call_count, 1)
+
+    @override_settings(SPOTIFY_CLIENT_ID="cid", SPOTIFY_CLIENT_SECRET="secret")
+    @patch("spotify.views.requests.post")
+    def test_short_lived_token_is_not_cached(self, mock_post):
+        SpotifyUserToken.objects.create(user=self.user, refresh_token="stored-rt")
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=lambda: {"access_token": "fresh-at", "expires_in": 30},
+        )
+        self.client.post("/api/spotify/refresh/")
+        self.client.post("/api/spotify/refresh/")
+        self.assertEqual(mock_post.call_count, 2)
+
+    @override_settings(SPOTIFY_CLIENT_ID="cid", SPOTIFY_CLIENT_SECRET="secret")
+    @patch("spotify.views.requests.post")
+    def test_storing_new_refresh_token_invalidates_cache(self, mock_post):
+        SpotifyUserToken.objects.create(user=self.user, refresh_token="stored-rt")
+        cache_access_token(self.user.id, "old-account-at", 3600)
+        self.client.post("/api/spotify/store-refresh-token/", {"refresh_token": "new-rt"}, format="json")
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=lambda: {"access_token": "new-account-at", "expires_in": 3600},
+        )
+        res = self.client.post("/api/spotify/refresh/")
+        self.assertEqual(res.json()["access_token"], "new-account-at")
+        self.assertEqual(mock_post.call_args.kwargs["data"]["refresh_token"], "new-rt")
+
+    @override_settings(SPOTIFY_CLIENT_ID="cid", SPOTIFY_CLIENT_SECRET="secret")
+    @patch("spotify.user_tokens.time.sleep")
+    @patch("spotify.views.requests.post")
+    def test_waits_for_in_flight_refresh_instead_of_posting(self, mock_post, mock_sleep):
+        SpotifyUserToken.objects.create(user=self.user, refresh_token="stored-rt")
+        cache.add(f"spotify:user_access_token_lock:{self.user.id}", 1)
+        # The other request finishes its refresh while this one is polling.
+        mock_sleep.side_effect = lambda _s: cache_access_token(self.user.id, "other-at", 3600)
+        res = self.client.post("/api/spotify/refresh/")
+        self.assertEqual(res.json()["access_token"], "other-at")
+        mock_post.assert_not_called()
+
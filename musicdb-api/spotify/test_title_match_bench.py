@@ -0,0 +1,46 @@
+"""Correctness and smoke tests for the offline title-matching benchmark."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from spotify.title_match_bench import (
+    EXPECTED,
+    HELPERS,
+    REAL_WORLD_TITLES,
+    run_benchmarks,
+    synthetic_titles,
+    verify_corpus,
+)
+
+
+class TitleMatchCorpusTests(SimpleTestCase):
+    def test_helpers_match_pinned_outputs(self):
+        self.assertEqual(verify_corpus(), [])
+
+    def test_every_real_world_title_is_pinned(self):
+        self.assertEqual(set(EXPECTED), set(REAL_WORLD_TITLES))
+        for outputs in EXPECTED.values():
+            self.assertEqual(len(outputs), len(HELPERS))
+
+    def test_synthetic_corpus_is_deterministic(self):
+        self.assertEqual(synthetic_titles(50, seed=3), synthetic_titles(50, seed=3))
+        self.assertNotEqual(synthetic_titles(50, seed=3), synthetic_titles(50, seed=4))
+
+
+class TitleMatchBenchmarkTests(SimpleTestCase):
+    def test_run_benchmarks_reports_every_helper(self):
+        rows = run_benchmarks(size=20, repeat=1)
+        names = [row["name"] for row in rows]
+        self.assertEqual(names, list(HELPERS) + ["find_best_match"])
+        for row in rows:
+            self.assertEqual(row["calls"], 20 + len(REAL_WORLD_TITLES))
+            self.assertGreater(row["calls_per_s"], 0)
+
+    def test_management_command_prints_report(self):
+        out = StringIO()
+        call_command("bench_title_matching", size=10, repeat=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn("Corpus check: OK", output)
+        self.assertIn("find_best_match", output)
@@ -8,12 +8,16 @@ from django.test import TestCase
 from spotify.client import (
     _normalize_artist,
     _normalize_artist_name_for_exact_match,
+    _normalize_isrc,
     _normalize_title_for_match,
     _normalize_title_quotes,
     _trailing_part_designation,
     _title_base_for_search,
     artist_image_url_for_musicbrainz_name,
     find_best_match,
+    get_spotify_albums,
+    get_spotify_tracks,
+    search_track_by_isrc,
 )
 
 
@@ -67,6 +71,83 @@ class ArtistImageUrlForMusicBrainzNameTests(TestCase):
         self.assertEqual(a, b)
 
 
+class SearchTrackByIsrcTests(TestCase):
+    """Exact ISRC lookup used before fuzzy title matching."""
+
+    def test_normalize_isrc(self):
+        self.assertEqual(_normalize_isrc("us-rc1-76-00001"), "USRC17600001")
+        self.assertEqual(_normalize_isrc(" USRC17600001 "), "USRC17600001")
+        self.assertEqual(_normalize_isrc("not-an-isrc"), "")
+        self.assertEqual(_normalize_isrc(None), "")
+
+    @patch("spotify.client.requests.get")
+    @patch("spotify.client._get_access_token", return_value="tok")
+    def test_queries_isrc_filter_and_returns_first_track(self, _mock_token, mock_get):
+        mock_get.return_value = Mock(
+            status_code=200,
+            json=lambda: {"tracks": {"items": [{"id": "t1", "name": "Song"}]}},
+        )
+        track = search_track_by_isrc("usrc17600001")
+        self.assertEqual(track["id"], "t1")
+        _, kwargs = mock_get.call_args
+        self.assertEqual(kwargs["params"]["q"], "isrc:USRC17600001")
+        self.assertEqual(kwargs["params"]["limit"], 1)
+
+    @patch("spotify.client.requests.get")
+    @patch("spotify.client._get_access_token", return_value="tok")
+    def test_no_hit_returns_none(self, _mock_token, mock_get):
+        mock_get.return_value = Mock(status_code=200, json=lambda: {"tracks": {"items": []}})
+        self.assertIsNone(search_track_by_isrc("USRC17600001"))
+
+    @patch("spotify.client.requests.get")
+    def test_invalid_isrc_skips_request(self, mock_get):
+        self.assertIsNone(search_track_by_isrc("bogus"))
+        mock_get.assert_not_called()
+
+
+class SpotifyMultiIdLookupTests(TestCase):
+    """Batch /v1/tracks, /v1/albums lookups used to revalidate stored links."""
+
+    @patch("spotify.client.requests.get")
+    @patch("spotify.client._get_access_token", return_value="tok")
+    def test_tracks_chunked_by_fifty(self, _mock_token, mock_get):
+        def fake_get(url, params=None, **kwargs):
+            ids = params["ids"].split(",")
+            return Mock(status_code=200, json=lambda: {"tracks": [{"id": i} for i in ids]})
+
+        mock_get.side_effect = fake_get
+        ids = [f"t{i}" for i in range(120)]
+        out = get_spotify_tracks(ids + ["t0", ""])
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(len(out), 120)
+        self.assertEqual(out["t119"], {"id": "t119"})
+
+    @patch("spotify.client.requests.get")
+    @patch("spotify.client._get_access_token", return_value="tok")
+    def test_tracks_request_a_market_for_relinking(self, _mock_token, mock_get):
+        mock_get.return_value = Mock(status_code=200, json=lambda: {"tracks": [{"id": "t2"}]})
+        with self.settings(SPOTIFY_MARKET="GB"):
+            get_spotify_tracks(["t1"])
+        self.assertEqual(mock_get.call_args.kwargs["params"]["market"], "GB")
+        get_spotify_albums(["a1"])
+        self.assertNotIn("market", mock_get.call_args.kwargs["params"])
+
+    @patch("spotify.client.requests.get")
+    @patch("spotify.client._get_access_token", return_value="tok")
+    def test_albums_chunked_by_twenty_and_null_kept(self, _mock_token, mock_get):
+        mock_get.return_value = Mock(status_code=200, json=lambda: {"albums": [None] * 20})
+        out = get_spotify_albums([f"a{i}" for i in range(21)])
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertIsNone(out["a0"])
+
+    @patch("spotify.client.requests.get")
+    @patch("spotify.client._get_access_token", return_value="tok")
+    def test_http_error_raises(self, _mock_token, mock_get):
+        mock_get.return_value = Mock(status_code=429)
+        with self.assertRaises(ValueError):
+            get_spotify_tracks(["t1"])
+
+
 class NormalizeArtistTests(TestCase):
     """Test artist name normalization (strips Discogs disambiguation)."""
 
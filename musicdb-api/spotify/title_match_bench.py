@@ -0,0 +1,495 @@
+"""
+Offline benchmark corpus for the Spotify title-matching helpers in spotify.client.
+
+The corpus mixes real-world catalog/Spotify titles (part designations, Roman
+numerals, typographic quotes, NBSP/ZWJ, long classical titles) with a seeded
+synthetic generator. EXPECTED pins the helpers' current outputs for the
+real-world titles so a faster implementation cannot silently change matching.
+
+Run with ``python manage.py bench_title_matching`` (no network needed); the
+correctness check also runs as part of the test suite.
+"""
+import random
+import time
+
+from .client import (
+    _normalize_roman_range,
+    _normalize_title_for_match,
+    _title_base_for_search,
+    _trailing_part_designation,
+    find_best_match,
+)
+
+REAL_WORLD_TITLES = (
+    "Shine On You Crazy Diamond, Parts I-V",
+    "Shine On You Crazy Diamond, Parts VI-IX",
+    "Shine On You Crazy Diamond (Pts. 1-5)",
+    "Shine On You Crazy Diamond, (Pts. 6-9)",
+    "Secret Stair Pt. 1",
+    "Secret Stair, Part 1",
+    "Secret Stair #2",
+    "Secret Stair (Part 2)",
+    "Echoes, Part I",
+    "Atom Heart Mother: Father's Shout (Part II)",
+    "Sheep (2)",
+    "Song (1-5)",
+    "I Don’t Live Today",
+    "Donʼt Let Me Down",
+    "Foxy\u00a0Lady",
+    "Purple\u2009Haze",
+    "Little\u2003Wing",
+    "Castles Made\u200bOf Sand",
+    "Up From The\u200d Skies",
+    "\ufeffBold As Love",
+    "Voodoo Child (Slight Return)",
+    "Symphony No. 9 in D minor, Op. 125 “Choral”: IV. Presto – Allegro assai",
+    "Piano Concerto No. 2 in C minor, Op. 18: I. Moderato",
+    "The Well-Tempered Clavier, Book I: Prelude and Fugue No. 1 in C major, BWV 846",
+    "Goldberg Variations, BWV 988: Variatio 30. a 1 Clav. Quodlibet",
+    "Der Ring des Nibelungen: Die Walküre, Act III: Ride of the Valkyries",
+    "Requiem in D minor, K. 626: III. Sequentia: No. 1, Dies irae",
+    "Dark Side Of The Moon — Parts I–V",
+    "Supper's Ready: i. Lover's Leap / ii. The Guaranteed Eternal Sanctuary Man",
+    "Close to the Edge: I. The Solid Time of Change",
+    "Regular Song Title",
+    "Song With Numbers 123",
+    "Song (feat. Artist)",
+    "Song (Remix)",
+    "Song Pt. 1 Pt. 2",
+    "Song PT. 1",
+    "",
+)
+
+# Helper name -> callable under test. Names are used in reports and EXPECTED.
+HELPERS = {
+    "normalize_title_for_match": _normalize_title_for_match,
+    "normalize_roman_range": _normalize_roman_range,
+    "trailing_part_designation": _trailing_part_designation,
+    "title_base_for_search": _title_base_for_search,
+}
+
+# Pinned outputs for REAL_WORLD_TITLES, in HELPERS order:
+# (normalize_title_for_match, normalize_roman_range, trailing_part_designation, title_base_for_search)
+EXPECTED = {
+    "Shine On You Crazy Diamond, Parts I-V": (
+        "shine on you crazy diamond 1-5",
+        "Shine On You Crazy Diamond, 1-5",
+        "1-5",
+        "Shine On You Crazy Diamond",
+    ),
+    "Shine On You Crazy Diamond, Parts VI-IX": (
+        "shine on you crazy diamond 6-9",
+        "Shine On You Crazy Diamond, 6-9",
+        "6-9",
+        "Shine On You Crazy Diamond",
+    ),
+    "Shine On You Crazy Diamond (Pts. 1-5)": (
+        "shine on you crazy diamond 1-5",
+        "Shine On You Crazy Diamond (Pts. 1-5)",
+        "1-5",
+        "Shine On You Crazy Diamond (Pts. 1-5)",
+    ),
+    "Shine On You Crazy Diamond, (Pts. 6-9)": (
+        "shine on you crazy diamond 6-9",
+        "Shine On You Crazy Diamond, (Pts. 6-9)",
+        "6-9",
+        "Shine On You Crazy Diamond, (Pts. 6-9)",
+    ),
+    "Secret Stair Pt. 1": (
+        "secret stair 1",
+        "Secret Stair Pt. 1",
+        "1",
+        "Secret Stair",
+    ),
+    "Secret Stair, Part 1": (
+        "secret stair 1",
+        "Secret Stair, Part 1",
+        "1",
+        "Secret Stair",
+    ),
+    "Secret Stair #2": (
+        "secret stair 2",
+        "Secret Stair #2",
+        "2",
+        "Secret Stair",
+    ),
+    "Secret Stair (Part 2)": (
+        "secret stair 2",
+        "Secret Stair (Part 2)",
+        "2",
+        "Secret Stair",
+    ),
+    "Echoes, Part I": (
+        "echoes 1",
+        "Echoes, 1",
+        "1",
+        "Echoes",
+    ),
+    "Atom Heart Mother: Father's Shout (Part II)": (
+        "atom heart mother: father's shout 2",
+        "Atom Heart Mother: Father's Shout (2)",
+        None,
+        "Atom Heart Mother: Father's Shout (Part II)",
+    ),
+    "Sheep (2)": (
+        "sheep 2",
+        "Sheep (2)",
+        "2",
+        "Sheep (2)",
+    ),
+    "Song (1-5)": (
+        "song 1-5",
+        "Song (1-5)",
+        "1-5",
+        "Song (1-5)",
+    ),
+    "I Don’t Live Today": (
+        "i don't live today",
+        "I Don’t Live Today",
+        None,
+        "I Don’t Live Today",
+    ),
+    "Donʼt Let Me Down": (
+        "don't let me down",
+        "Donʼt Let Me Down",
+        None,
+        "Donʼt Let Me Down",
+    ),
+    "Foxy\xa0Lady": (
+        "foxy lady",
+        "Foxy\xa0Lady",
+        None,
+        "Foxy\xa0Lady",
+    ),
+    "Purple\u2009Haze": (
+        "purple haze",
+        "Purple\u2009Haze",
+        None,
+        "Purple\u2009Haze",
+    ),
+    "Little\u2003Wing": (
+        "little wing",
+        "Little\u2003Wing",
+        None,
+        "Little\u2003Wing",
+    ),
+    "Castles Made\u200bOf Sand": (
+        "castles madeof sand",
+        "Castles Made\u200bOf Sand",
+        None,
+        "Castles Made\u200bOf Sand",
+    ),
+    "Up From The\u200d Skies": (
+        "up from the skies",
+        "Up From The\u200d Skies",
+        None,
+        "Up From The\u200d Skies",
+    ),
+    "\ufeffBold As Love": (
+        "bold as love",
+        "\ufeffBold As Love",
+        None,
+        "\ufeffBold As Love",
+    ),
+    "Voodoo Child (Slight Return)": (
+        "voodoo child (slight return)",
+        "Voodoo Child (Slight Return)",
+        None,
+        "Voodoo Child (Slight Return)",
+    ),
+    "Symphony No. 9 in D minor, Op. 125 “Choral”: IV. Presto – Allegro assai": (
+        "symphony no. 9 in d minor op. 125 “choral”: iv. presto - allegro assai",
+        "Symphony No. 9 in D minor, Op. 125 “Choral”: IV. Presto – Allegro assai",
+        None,
+        "Symphony No. 9 in D minor, Op. 125 “Choral”: IV. Presto – Allegro assai",
+    ),
+    "Piano Concerto No. 2 in C minor, Op. 18: I. Moderato": (
+        "piano concerto no. 2 in c minor op. 18: i. moderato",
+        "Piano Concerto No. 2 in C minor, Op. 18: I. Moderato",
+        None,
+        "Piano Concerto No. 2 in C minor, Op. 18: I. Moderato",
+    ),
+    "The Well-Tempered Clavier, Book I: Prelude and Fugue No. 1 in C major, BWV 846": (
+        "the well-tempered clavier book i: prelude and fugue no. 1 in c major bwv 846",
+        "The Well-Tempered Clavier, Book I: Prelude and Fugue No. 1 in C major, BWV 846",
+        None,
+        "The Well-Tempered Clavier, Book I: Prelude and Fugue No. 1 in C major, BWV 846",
+    ),
+    "Goldberg Variations, BWV 988: Variatio 30. a 1 Clav. Quodlibet": (
+        "goldberg variations bwv 988: variatio 30. a 1 clav. quodlibet",
+        "Goldberg Variations, BWV 988: Variatio 30. a 1 Clav. Quodlibet",
+        None,
+        "Goldberg Variations, BWV 988: Variatio 30. a 1 Clav. Quodlibet",
+    ),
+    "Der Ring des Nibelungen: Die Walküre, Act III: Ride of the Valkyries": (
+        "der ring des nibelungen: die walküre act iii: ride of the valkyries",
+        "Der Ring des Nibelungen: Die Walküre, Act III: Ride of the Valkyries",
+        None,
+        "Der Ring des Nibelungen: Die Walküre, Act III: Ride of the Valkyries",
+    ),
+    "Requiem in D minor, K. 626: III. Sequentia: No. 1, Dies irae": (
+        "requiem in d minor k. 626: iii. sequentia: no. 1 dies irae",
+        "Requiem in D minor, K. 626: III. Sequentia: No. 1, Dies irae",
+        None,
+        "Requiem in D minor, K. 626: III. Sequentia: No. 1, Dies irae",
+    ),
+    "Dark Side Of The Moon — Parts I–V": (
+        "dark side of the moon - 1-5",
+        "Dark Side Of The Moon — 1-5",
+        "1-5",
+        "Dark Side Of The Moon —",
+    ),
+    "Supper's Ready: i. Lover's Leap / ii. The Guaranteed Eternal Sanctuary Man": (
+        "supper's ready: i. lover's leap / ii. the guaranteed eternal sanctuary man",
+        "Supper's Ready: i. Lover's Leap / ii. The Guaranteed Eternal Sanctuary Man",
+        None,
+        "Supper's Ready: i. Lover's Leap / ii. The Guaranteed Eternal Sanctuary Man",
+    ),
+    "Close to the Edge: I. The Solid Time of Change": (
+        "close to the edge: i. the solid time of change",
+        "Close to the Edge: I. The Solid Time of Change",
+        None,
+        "Close to the Edge: I. The Solid Time of Change",
+    ),
+    "Regular Song Title": (
+        "regular song title",
+        "Regular Song Title",
+        None,
+        "Regular Song Title",
+    ),
+    "Song With Numbers 123": (
+        "song with numbers 123",
+        "Song With Numbers 123",
+        None,
+        "Song With Numbers 123",
+    ),
+    "Song (feat. Artist)": (
+        "song (feat. artist)",
+        "Song (feat. Artist)",
+        None,
+        "Song (feat. Artist)",
+    ),
+    "Song (Remix)": (
+        "song (remix)",
+        "Song (Remix)",
+        None,
+        "Song (Remix)",
+    ),
+    "Song Pt. 1 Pt. 2": (
+        "song 1 2",
+        "Song Pt. 1 Pt. 2",
+        "2",
+        "Song Pt. 1",
+    ),
+    "Song PT. 1": (
+        "song 1",
+        "Song PT. 1",
+        "1",
+        "Song",
+    ),
+    "": (
+        "",
+        "",
+        None,
+        "",
+    ),
+}
+
+# (catalog title, catalog artists, Spotify candidates, expected matched id or None)
+FIND_BEST_MATCH_CASES = (
+    (
+        "Secret Stair Pt. 1",
+        ["Artist Name"],
+        [
+            {"name": "Secret Stair #1", "artists": [{"name": "Artist Name"}], "id": "s1"},
+            {"name": "Secret Stair #2", "artists": [{"name": "Artist Name"}], "id": "s2"},
+        ],
+        "s1",
+    ),
+    (
+        "Shine On You Crazy Diamond, Parts VI-IX",
+        ["Pink Floyd"],
+        [
+            {"name": "Shine On You Crazy Diamond, (Pts. 1-5)", "artists": [{"name": "Pink Floyd"}], "id": "p15"},
+            {"name": "Shine On You Crazy Diamond, (Pts. 6-9)", "artists": [{"name": "Pink Floyd"}], "id": "p69"},
+        ],
+        "p69",
+    ),
+    (
+        "I Don’t Live Today",
+        ["Jimi Hendrix"],
+        [
+            {"name": "I Don't Live Today", "artists": [{"name": "Jimi Hendrix"}], "id": "idlt"},
+            {"name": "Other Song", "artists": [{"name": "Jimi Hendrix"}], "id": "other"},
+        ],
+        "idlt",
+    ),
+    (
+        "Foxy\u00a0Lady",
+        ["The Jimi Hendrix Experience"],
+        [{"name": "Foxy Lady", "artists": [{"name": "Jimi Hendrix"}], "id": "foxy"}],
+        "foxy",
+    ),
+    (
+        "Secret Stair Pt. 1",
+        ["Artist"],
+        [{"name": "Secret Stair Pt. 2", "artists": [{"name": "Artist"}], "id": "wrong"}],
+        None,
+    ),
+    (
+        "Piano Concerto No. 2 in C minor, Op. 18: I. Moderato",
+        ["Sergei Rachmaninoff", "Vladimir Ashkenazy"],
+        [
+            {
+                "name": "Piano Concerto No. 2 in C Minor, Op. 18: I. Moderato",
+                "artists": [{"name": "Sergei Rachmaninoff"}, {"name": "Vladimir Ashkenazy"}],
+                "id": "rach",
+            },
+            {
+                "name": "Piano Concerto No. 2 in C Minor, Op. 18: II. Adagio sostenuto",
+                "artists": [{"name": "Sergei Rachmaninoff"}],
+                "id": "rach2",
+            },
+        ],
+        "rach",
+    ),
+)
+
+_SYNTHETIC_BASES = (
+    "Secret Stair",
+    "Shine On You Crazy Diamond",
+    "Echoes",
+    "Atom Heart Mother",
+    "Don't Stop Me Now",
+    "Foxy Lady",
+    "The Great Gig in the Sky",
+    "Us and Them",
+)
+_SYNTHETIC_SUFFIXES = (
+    "",
+    " Pt. {n}",
+    " Pt {n}",
+    " #{n}",
+    ", Part {n}",
+    " Part {n}",
+    " (Part {n})",
+    " (Pt. {n})",
+    " (Pts. {n}-{m})",
+    " (Pts. {n}–{m})",
+    ", Parts {rn}-{rm}",
+    ", Part {rn}",
+    " ({n})",
+    " (feat. Someone)",
+    " (Remix)",
+    " – Live",
+)
+_ROMANS = ("I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X")
+_KEYS = ("C major", "D minor", "E-flat major", "F-sharp minor", "B-flat major")
+_MOVEMENTS = ("Allegro con brio", "Adagio molto e cantabile", "Scherzo: Presto", "Finale: Allegro assai")
+
+
+def _decorate(title, rng):
+    """Sprinkle the Unicode variants seen in MusicBrainz/Spotify data onto a plain title."""
+    roll = rng.random()
+    if roll < 0.15:
+        return title.replace(" ", "\u00a0", 1)
+    if roll < 0.25:
+        return title.replace("'", "’")
+    if roll < 0.3:
+        return title.replace(" ", "\u200d ", 1)
+    if roll < 0.35:
+        return "\ufeff" + title
+    return title
+
+
+def _classical_title(rng):
+    return (
+        f"Symphony No. {rng.randint(1, 9)} in {rng.choice(_KEYS)}, Op. {rng.randint(10, 130)} "
+        f"“Nickname”: {rng.choice(_ROMANS[:4])}. {rng.choice(_MOVEMENTS)}"
+    )
+
+
+def synthetic_titles(count, seed=0):
+    """Deterministic synthetic corpus of *count* titles (same seed → same titles)."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            out.append(_decorate(_classical_title(rng), rng))
+            continue
+        n = rng.randint(1, 8)
+        m = n + rng.randint(1, 4)
+        suffix = rng.choice(_SYNTHETIC_SUFFIXES).format(
+            n=n, m=m, rn=_ROMANS[n - 1], rm=_ROMANS[min(m, 10) - 1]
+        )
+        out.append(_decorate(rng.choice(_SYNTHETIC_BASES) + suffix, rng))
+    return out
+
+
+def _synthetic_match_inputs(titles, seed=0):
+    """(title, artists, candidates) triples; each title gets ~10 Spotify-style candidates."""
+    rng = random.Random(seed)
+    pool = [{"name": t, "artists": [{"name": "Artist"}], "id": str(i)} for i, t in enumerate(titles)]
+    inputs = []
+    for title in titles:
+        candidates = rng.sample(pool, min(10, len(pool)))
+        inputs.append((title, ["Artist"], candidates))
+    return inputs
+
+
+def verify_corpus():
+    """
+    Compare helper outputs with EXPECTED and FIND_BEST_MATCH_CASES.
+    Returns a list of (helper, input, expected, actual) mismatches; empty means unchanged.
+    """
+    mismatches = []
+    for title in REAL_WORLD_TITLES:
+        expected = EXPECTED.get(title)
+        if expected is None:
+            mismatches.append(("EXPECTED", title, "<pinned outputs>", None))
+            continue
+        for (name, func), want in zip(HELPERS.items(), expected):
+            got = func(title)
+            if got != want:
+                mismatches.append((name, title, want, got))
+    for title, artists, candidates, want_id in FIND_BEST_MATCH_CASES:
+        match = find_best_match(title, artists, candidates)
+        got_id = match.get("id") if match else None
+        if got_id != want_id:
+            mismatches.append(("find_best_match", title, want_id, got_id))
+    return mismatches
+
+
+def bench(func, inputs, repeat=3):
+    """
+    Time func(*args) over every args tuple in *inputs*; best of *repeat* runs.
+    Returns dict with calls, total_s, per_call_us and calls_per_s.
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for args in inputs:
+            func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    calls = len(inputs)
+    return {
+        "calls": calls,
+        "total_s": best,
+        "per_call_us": (best / calls * 1e6) if calls else 0.0,
+        "calls_per_s": (calls / best) if best else 0.0,
+    }
+
+
+def run_benchmarks(size=2000, repeat=3, seed=0):
+    """Benchmark every helper plus find_best_match over real-world + synthetic titles."""
+    titles = list(REAL_WORLD_TITLES) + synthetic_titles(size, seed=seed)
+    single = [(t,) for t in titles]
+    rows = []
+    for name, func in HELPERS.items():
+        rows.append({"name": name, **bench(func, single, repeat=repeat)})
+    rows.append(
+        {"name": "find_best_match", **bench(find_best_match, _synthetic_match_inputs(titles, seed), repeat=repeat)}
+    )
+    return rows
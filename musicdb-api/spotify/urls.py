@@ -4,6 +4,7 @@ from .views import (
     MatchTracksAPIView,
     SpotifyCallbackAPIView,
     SpotifyPlaylistsView,
+    SpotifyPlaylistTracksStreamView,
     SpotifyPlaylistTracksView,
     SpotifyRefreshAccessTokenView,
     SpotifySearchView,
@@ -16,6 +17,11 @@ urlpatterns = [
     path("callback/", SpotifyCallbackAPIView.as_view(), name="spotify_callback"),
     path("playlists/", SpotifyPlaylistsView.as_view(), name="spotify_playlists"),
     path("playlists/<str:playlist_id>/tracks/", SpotifyPlaylistTracksView.as_view(), name="spotify_playlist_tracks"),
+    path(
+        "playlists/<str:playlist_id>/tracks/stream/",
+        SpotifyPlaylistTracksStreamView.as_view(),
+        name="spotify_playlist_tracks_stream",
+    ),
     path("store-refresh-token/", SpotifyStoreRefreshTokenView.as_view(), name="spotify_store_refresh_token"),
     path("refresh/", SpotifyRefreshAccessTokenView.as_view(), name="spotify_refresh"),
 ]
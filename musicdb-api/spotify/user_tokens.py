@@ -0,0 +1,76 @@
+"""
+Per-user cache for Spotify access tokens minted from the stored refresh token.
+
+Every tab/device asks /api/spotify/refresh/ for a token; caching the last minted token until
+shortly before it expires means only one of them actually talks to accounts.spotify.com.
+Concurrent refreshes for the same user are serialized with a short cache lock.
+"""
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+# Stop handing out a cached token this long before Spotify expires it.
+EXPIRY_MARGIN = 60
+# Longest a refresh may hold the per-user lock, and how long other requests wait on it.
+REFRESH_LOCK_TIMEOUT = 15
+REFRESH_LOCK_WAIT = 5
+REFRESH_LOCK_POLL = 0.1
+
+
+def _access_token_key(user_id):
+    return f"spotify:user_access_token:{user_id}"
+
+
+def _lock_key(user_id):
+    return f"spotify:user_access_token_lock:{user_id}"
+
+
+def get_cached_access_token(user_id):
+    """{"access_token", "expires_in"} with the remaining lifetime, or None if nothing usable is cached."""
+    entry = cache.get(_access_token_key(user_id))
+    if not entry:
+        return None
+    expires_in = int(entry["expires_at"] - time.time())
+    if expires_in <= EXPIRY_MARGIN:
+        return None
+    return {"access_token": entry["access_token"], "expires_in": expires_in}
+
+
+def cache_access_token(user_id, access_token, expires_in):
+    """Remember a freshly minted token until EXPIRY_MARGIN seconds before it expires."""
+    timeout = int(expires_in) - EXPIRY_MARGIN
+    if timeout <= 0:
+        return
+    cache.set(
+        _access_token_key(user_id),
+        {"access_token": access_token, "expires_at": time.time() + int(expires_in)},
+        timeout=timeout,
+    )
+
+
+def invalidate_access_token(user_id):
+    """Drop the cached token (refresh token replaced or revoked)."""
+    cache.delete(_access_token_key(user_id))
+
+
+@contextmanager
+def refresh_lock(user_id):
+    """
+    Serialize refreshes per user. If another request holds the lock, wait (bounded) until it
+    caches a token or releases the lock; callers should re-check the cache after entering.
+    Yields True if this request holds the lock.
+    """
+    key = _lock_key(user_id)
+    acquired = cache.add(key, 1, timeout=REFRESH_LOCK_TIMEOUT)
+    deadline = time.monotonic() + REFRESH_LOCK_WAIT
+    while not acquired and time.monotonic() < deadline:
+        if get_cached_access_token(user_id):
+            break
+        time.sleep(REFRESH_LOCK_POLL)
+        acquired = cache.add(key, 1, timeout=REFRESH_LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(key)
@@ -1,9 +1,10 @@
 import base64
+import json
 import logging
 
 import requests
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -12,8 +13,27 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
-from .client import search_track, find_best_match
+from .client import search_track, search_track_by_isrc, find_best_match
 from .models import SpotifyUserToken
+from .playlists import (
+    TRACK_PAGE_SIZE,
+    SpotifyAPIError,
+    backoff_budget,
+    decode_cursor,
+    encode_cursor,
+    fetch_playlist_meta,
+    fetch_playlist_track_window,
+    fetch_playlists,
+    get_playlist_with_tracks,
+    iter_playlist_track_pages,
+    remember_snapshots,
+)
+from .user_tokens import (
+    cache_access_token,
+    get_cached_access_token,
+    invalidate_access_token,
+    refresh_lock,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -51,9 +71,19 @@ class MatchTracksAPIView(APIView):
                     continue
                 
                 try:
-                    # Search Spotify for this track - get multiple results to find best match
-                    spotify_results = search_track(query=title, artist=artist, limit=10)
-                    spotify_track = find_best_match(title, artists, spotify_results)
+                    # Recordings with an ISRC resolve deterministically in one call; fuzzy search is the fallback
+                    spotify_track = None
+                    isrc = str(track.get("isrc") or "").strip()
+                    if isrc:
+                        try:
+                            spotify_track = search_track_by_isrc(isrc)
+                        except Exception:
+                            # Rate limit / upstream error on the exact lookup: fuzzy search still runs
+                            logger.warning("Spotify ISRC lookup failed for %s", isrc, exc_info=True)
+                    if spotify_track is None:
+                        # Search Spotify for this track - get multiple results to find best match
+                        spotify_results = search_track(query=title, artist=artist, limit=10)
+                        spotify_track = find_best_match(title, artists, spotify_results)
                     # If no match (e.g. catalog artist "The Jimi Hendrix Experience" returns no Spotify results),
                     # retry search without artist so we get candidates and can match by title
                     if spotify_track is None and artist:
@@ -203,51 +233,33 @@ class SpotifyPlaylistsView(APIView):
             )
 
         try:
-            # Fetch playlists from Spotify API
-            playlists = []
-            url = "https://api.spotify.com/v1/me/playlists"
-            
-            while url:
-                response = requests.get(
-                    url,
-                    headers={"Authorization": f"Bearer {spotify_token}"},
-                    timeout=10,
-                )
-                
-                if response.status_code != 200:
-                    return Response(
-                        {"error": f"Spotify API error: {response.status_code}", "details": response.text},
-                        status=status.HTTP_502_BAD_GATEWAY,
-                    )
-                
-                data = response.json()
-                for playlist in data.get("items", []):
-                    playlists.append({
-                        "id": playlist.get("id"),
-                        "name": playlist.get("name"),
-                        "owner": playlist.get("owner", {}).get("display_name") or playlist.get("owner", {}).get("id"),
-                        "collaborative": playlist.get("collaborative", False),
-                        "public": playlist.get("public", False),
-                        "tracks_count": playlist.get("tracks", {}).get("total", 0),
-                        "images": playlist.get("images", []),
-                    })
-                
-                url = data.get("next")  # Pagination
-            
-            return Response({"playlists": playlists})
-            
+            with backoff_budget():
+                playlists = fetch_playlists(spotify_token)
+        except SpotifyAPIError as e:
+            return Response(
+                {"error": str(e), "details": e.details},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except requests.exceptions.RequestException as e:
             return Response(
                 {"error": f"Failed to fetch playlists: {str(e)}"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
 
+        # Lets the tracks view tell unchanged playlists apart without asking Spotify.
+        remember_snapshots(request.user.id, playlists)
+        return Response({"playlists": playlists})
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class SpotifyPlaylistTracksView(APIView):
     """
     GET /api/spotify/playlists/<playlist_id>/tracks/ — get tracks for a Spotify playlist.
     Requires Spotify access token in Authorization header.
+    Optional ?snapshot_id= (from the playlist listing): track lists are cached per snapshot,
+    so an unchanged playlist is served without re-paging its tracks.
+    Optional ?cursor=&limit= (limit max 100): return one window of tracks instead of the whole
+    playlist, as {id, tracks, total, next_cursor}; pass next_cursor back until it is null.
     """
     permission_classes = [IsAuthenticated]
 
@@ -259,72 +271,114 @@ class SpotifyPlaylistTracksView(APIView):
                 {"error": "Missing Spotify access token in Authorization header"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if "cursor" in request.query_params or "limit" in request.query_params:
+            return self._get_window(request, spotify_token, playlist_id)
 
         try:
-            # First get playlist info
-            playlist_response = requests.get(
-                f"https://api.spotify.com/v1/playlists/{playlist_id}",
-                headers={"Authorization": f"Bearer {spotify_token}"},
-                timeout=10,
-            )
-            
-            if playlist_response.status_code != 200:
-                return Response(
-                    {"error": f"Spotify API error: {playlist_response.status_code}", "details": playlist_response.text},
-                    status=status.HTTP_502_BAD_GATEWAY,
+            with backoff_budget():
+                payload = get_playlist_with_tracks(
+                    request.user.id,
+                    spotify_token,
+                    playlist_id,
+                    snapshot_id=request.query_params.get("snapshot_id", "").strip() or None,
                 )
-            
-            playlist_data = playlist_response.json()
-            
-            # Fetch tracks
-            tracks = []
-            url = f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks"
-            
-            while url:
-                response = requests.get(
-                    url,
-                    headers={"Authorization": f"Bearer {spotify_token}"},
-                    params={"fields": "items(track(id,name,artists,album,uri,duration_ms,preview_url))"},
-                    timeout=10,
+        except SpotifyAPIError as e:
+            return Response(
+                {"error": str(e), "details": e.details},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        except requests.exceptions.RequestException as e:
+            return Response(
+                {"error": f"Failed to fetch playlist tracks: {str(e)}"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        return Response(payload)
+
+    def _get_window(self, request, spotify_token, playlist_id):
+        cursor = request.query_params.get("cursor", "").strip()
+        try:
+            offset = decode_cursor(cursor) if cursor else 0
+            limit = int(request.query_params.get("limit") or TRACK_PAGE_SIZE)
+        except ValueError:
+            return Response(
+                {"error": "Invalid cursor or limit"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = min(TRACK_PAGE_SIZE, max(1, limit))
+
+        try:
+            with backoff_budget():
+                tracks, total, next_offset = fetch_playlist_track_window(
+                    spotify_token, playlist_id, offset, limit
                 )
-                
-                if response.status_code != 200:
-                    return Response(
-                        {"error": f"Spotify API error: {response.status_code}", "details": response.text},
-                        status=status.HTTP_502_BAD_GATEWAY,
-                    )
-                
-                data = response.json()
-                for item in data.get("items", []):
-                    track = item.get("track")
-                    if track and track.get("id"):  # Skip null tracks (removed tracks)
-                        tracks.append({
-                            "id": track.get("id"),
-                            "name": track.get("name"),
-                            "artists": [{"name": artist.get("name")} for artist in track.get("artists", [])],
-                            "album": track.get("album", {}).get("name"),
-                            "uri": track.get("uri"),
-                            "duration_ms": track.get("duration_ms"),
-                            "preview_url": track.get("preview_url"),
-                        })
-                
-                url = data.get("next")  # Pagination
-            
-            return Response({
-                "id": playlist_data.get("id"),
-                "name": playlist_data.get("name"),
-                "owner": playlist_data.get("owner", {}).get("display_name") or playlist_data.get("owner", {}).get("id"),
-                "description": playlist_data.get("description"),
-                "images": playlist_data.get("images", []),
-                "tracks": tracks,
-            })
-            
+        except SpotifyAPIError as e:
+            return Response(
+                {"error": str(e), "details": e.details},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        except requests.exceptions.RequestException as e:
+            return Response(
+                {"error": f"Failed to fetch playlist tracks: {str(e)}"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        return Response({
+            "id": playlist_id,
+            "tracks": tracks,
+            "total": total,
+            "next_cursor": encode_cursor(next_offset) if next_offset is not None else None,
+        })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class SpotifyPlaylistTracksStreamView(APIView):
+    """
+    GET /api/spotify/playlists/<playlist_id>/tracks/stream/ — playlist tracks as NDJSON.
+    Requires Spotify access token in Authorization header.
+    First line is the playlist header (id, name, owner, description, images, snapshot_id),
+    then one normalized track per line, written as each Spotify page arrives. An upstream
+    failure after the response has started ends the stream with an {"error": ...} line.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, playlist_id):
+        spotify_token = request.headers.get("Authorization", "").replace("Bearer ", "").strip()
+        if not spotify_token:
+            return Response(
+                {"error": "Missing Spotify access token in Authorization header"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Fetch the header and first page up front so upstream errors still get a real status.
+        pages = iter_playlist_track_pages(spotify_token, playlist_id)
+        try:
+            with backoff_budget():
+                meta = fetch_playlist_meta(spotify_token, playlist_id)
+                first_page = next(pages)
+        except SpotifyAPIError as e:
+            return Response(
+                {"error": str(e), "details": e.details},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except requests.exceptions.RequestException as e:
             return Response(
                 {"error": f"Failed to fetch playlist tracks: {str(e)}"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
 
+        def lines():
+            yield json.dumps(meta) + "\n"
+            for track in first_page:
+                yield json.dumps(track) + "\n"
+            try:
+                for page in pages:
+                    for track in page:
+                        yield json.dumps(track) + "\n"
+            except (SpotifyAPIError, requests.exceptions.RequestException) as e:
+                logger.warning("Playlist %s stream aborted: %s", playlist_id, e)
+                yield json.dumps({"error": f"Failed to fetch playlist tracks: {str(e)}"}) + "\n"
+
+        return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
 
 @method_decorator(csrf_exempt, name="dispatch")
 class SpotifyStoreRefreshTokenView(APIView):
@@ -343,16 +397,26 @@ class SpotifyStoreRefreshTokenView(APIView):
             user=request.user,
             defaults={"refresh_token": refresh_token},
         )
+        # A new refresh token may belong to a different Spotify account.
+        invalidate_access_token(request.user.id)
         return Response({"stored": True})
 
 
 @method_decorator(csrf_exempt, name="dispatch")
 class SpotifyRefreshAccessTokenView(APIView):
-    """POST — use stored refresh token to get a fresh Spotify access token."""
+    """
+    POST — use stored refresh token to get a fresh Spotify access token.
+    Minted tokens are cached per user until shortly before they expire, so repeated calls
+    (other tabs/devices) return instantly; concurrent refreshes for one user are deduplicated.
+    """
 
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        cached = get_cached_access_token(request.user.id)
+        if cached:
+            return Response(cached)
+
         try:
             token_obj = SpotifyUserToken.objects.get(user=request.user)
         except SpotifyUserToken.DoesNotExist:
@@ -369,6 +433,14 @@ class SpotifyRefreshAccessTokenView(APIView):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
 
+        with refresh_lock(request.user.id):
+            # Another request may have minted a token while we waited for the lock.
+            cached = get_cached_access_token(request.user.id)
+            if cached:
+                return Response(cached)
+            return self._refresh(request.user.id, token_obj, client_id, client_secret)
+
+    def _refresh(self, user_id, token_obj, client_id, client_secret):
         credentials = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
         try:
             resp = requests.post(
@@ -394,6 +466,7 @@ class SpotifyRefreshAccessTokenView(APIView):
             logger.error("Spotify refresh failed: %s %s", resp.status_code, resp.text[:200])
             if resp.status_code in (400, 401):
                 token_obj.delete()
+                invalidate_access_token(user_id)
             return Response(
                 {"error": "Spotify token refresh failed"},
                 status=status.HTTP_502_BAD_GATEWAY,
@@ -411,7 +484,9 @@ class SpotifyRefreshAccessTokenView(APIView):
             token_obj.refresh_token = data["refresh_token"]
             token_obj.save(update_fields=["refresh_token", "updated_at"])
 
+        expires_in = data.get("expires_in", 3600)
+        cache_access_token(user_id, access_token, expires_in)
         return Response({
             "access_token": access_token,
-            "expires_in": data.get("expires_in", 3600),
+            "expires_in": expires_in,
         })